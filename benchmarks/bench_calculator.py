@@ -0,0 +1,64 @@
+"""Throughput of the cost engine: calculate(), evaluate_batch() and the /api/calculate endpoint.
+
+    python benchmarks/bench_calculator.py [--seconds 2]
+
+Uses the built-in default models, so it needs no network.
+"""
+from pathlib import Path
+import argparse
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import models
+from calculator import Scenario, calculate
+from catalog import build_catalog, evaluate_batch
+
+def scenarios(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [Scenario(input_tokens=rng.randint(100, 100000), output_tokens=rng.randint(10, 8000),
+                     daily_users=rng.randint(1, 100000), requests_per_user=rng.uniform(0.5, 50),
+                     iterations=rng.randint(1, 5), cache_hit_rate=rng.random(),
+                     scale=rng.choice(["startup", "growth", "scale", "enterprise"]),
+                     complexity=rng.choice(["low", "medium", "high"])) for _ in range(count)]
+
+def rate(run, seconds: float) -> float:
+    """Calls of `run` per second, repeated for at least `seconds`."""
+    run()  # Warm up
+    calls, start = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        run()
+        calls += 1
+    return calls / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=2.0, help="time spent on each measurement")
+    seconds = parser.parse_args().seconds
+
+    specs = models.get_default_models()
+    catalog = build_catalog(specs)
+    ids = list(specs)
+    sample = scenarios(1000)
+    pairs = [(specs[ids[i % len(ids)]], s) for i, s in enumerate(sample)]
+    print(f"calculate()             {rate(lambda: [calculate(m, s) for m, s in pairs], seconds) * len(pairs):>14,.0f} breakdowns/s")
+    for size in (1000, 100000):
+        batch = scenarios(size, seed=size)
+        rows = [i % len(catalog) for i in range(size)]
+        per_second = rate(lambda: evaluate_batch(catalog, rows, batch), seconds) * size
+        print(f"evaluate_batch({size:>6}) {per_second:>14,.0f} breakdowns/s")
+
+    # The endpoint in-process, so this measures parsing, validation and serialization rather than the network
+    models.MODELS_CACHE_PATH = Path(tempfile.mkdtemp()) / "models.json"
+    models._set_models(specs, time.time())
+    from starlette.testclient import TestClient
+    import main as app_module
+    client = TestClient(app_module.app)
+    body = {"model": ids[0], "input_tokens": 2000, "output_tokens": 500, "daily_users": 1000, "cache_hit_rate": 0.3}
+    print(f"POST /api/calculate     {rate(lambda: client.post('/api/calculate', json=body), seconds):>14,.0f} requests/s")
+
+if __name__ == "__main__":
+    main()
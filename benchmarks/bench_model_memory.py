@@ -0,0 +1,82 @@
+"""Per-model memory of the catalog: the original ModelSpec against the current slotted one.
+
+    python benchmarks/bench_model_memory.py [--models 5000] [--providers 8]
+
+Parses synthetic LiteLLM-shaped entries, so it needs no network.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+import argparse
+import json
+import sys
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import parse_litellm_pricing
+
+PROVIDERS = ["openai", "anthropic", "vertex_ai-language-models", "bedrock", "together_ai",
+             "fireworks_ai", "mistral", "deepinfra", "groq", "cohere_chat", "perplexity", "azure"]
+
+@dataclass
+class LegacyModelSpec:
+    """ModelSpec as it was before slots and provider interning."""
+    name: str
+    provider: str
+    context_window: int
+    max_output: int
+    price_input: float
+    price_output: float
+
+def legacy_parse(data: dict) -> dict:
+    """The original LiteLLM parsing: one freshly cleaned provider string per model."""
+    models = {}
+    for name, info in data.items():
+        provider = info.get("litellm_provider", "").replace("_", " ").replace("-", " ").title()
+        models[name] = LegacyModelSpec(
+            name=info.get("litellm_model", name), provider=provider,
+            context_window=info.get("max_input_tokens") or info.get("max_tokens", 4096),
+            max_output=info.get("max_output_tokens") or 4096,
+            price_input=round(info.get("input_cost_per_token", 0) * 1_000_000, 4),
+            price_output=round(info.get("output_cost_per_token", 0) * 1_000_000, 4))
+    return models
+
+def feed(count: int, providers: int) -> dict:
+    """A LiteLLM pricing document, decoded from JSON text like the real feed."""
+    return json.loads(json.dumps({
+        f"model-{i}": {"litellm_provider": PROVIDERS[i % providers], "max_input_tokens": 128000 + i,
+                       "max_output_tokens": 4096 + i, "input_cost_per_token": (i % 97 + 1) * 1e-07,
+                       "output_cost_per_token": (i % 89 + 1) * 3e-07}
+        for i in range(count)}))
+
+def traced(parse, data: dict) -> tuple:
+    """Bytes still allocated by `parse(data)` once it returns, and the parsed models."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    models = parse(data)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, models
+
+def instance_size(spec) -> int:
+    """Shallow size of one spec, counting its attribute dict if it has one."""
+    return sys.getsizeof(spec) + (sys.getsizeof(vars(spec)) if hasattr(spec, "__dict__") else 0)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", type=int, default=5000, help="catalog entries to parse")
+    parser.add_argument("--providers", type=int, default=8, choices=range(1, len(PROVIDERS) + 1),
+                        metavar=f"1-{len(PROVIDERS)}", help="distinct providers across the entries")
+    args = parser.parse_args()
+
+    data = feed(args.models, args.providers)
+    parse_litellm_pricing(feed(args.providers, args.providers))  # Warm the provider name cache
+    for label, parse in (("before (dataclass)", legacy_parse), ("after (slots, interned)", parse_litellm_pricing)):
+        total, models = traced(parse, data)
+        spec = next(iter(models.values()))
+        providers = len({id(m.provider) for m in models.values()})
+        print(f"{label:<24} {instance_size(spec):>5} bytes/instance {total / len(models):>8,.1f} traced bytes/model"
+              f" {providers:>6,} provider strings")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Break-even points where one linear cost overtakes another, solved in closed form for all pairs at once."""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import math
+import numpy as np
+from calculator import Scenario
+from catalog import ModelCatalog, cost_per_request
+from platforms import get_all_platforms
+
+CROSSOVER_LIMIT = 100  # Rows returned by default
+CROSSOVER_MAX_MODELS = 1000  # Models compared at once (~500K pairs)
+
+@dataclass(frozen=True, eq=False)
+class CrossoverTable:
+    """Pairs (a, b) whose costs cross at `at`; below it `cheaper_below` costs less, above it `cheaper_above`."""
+    variable: str  # What `at` measures, e.g. "monthly_requests"
+    names: List[str]
+    a: np.ndarray  # Indexes into names
+    b: np.ndarray
+    at: np.ndarray  # Ascending
+    cheaper_above: np.ndarray  # Index of the cheaper item past the crossover
+
+    def __len__(self) -> int:
+        return len(self.at)
+
+    def query(self, involving: Optional[str] = None, low: float = -math.inf, high: float = math.inf) -> "CrossoverTable":
+        """Rows involving one item and/or crossing within [low, high]."""
+        mask = (self.at >= low) & (self.at <= high)
+        if involving is not None:
+            try:
+                index = self.names.index(involving)
+            except ValueError:
+                raise ValueError(f"Unknown item: {involving}") from None
+            mask &= (self.a == index) | (self.b == index)
+        return CrossoverTable(self.variable, self.names, self.a[mask], self.b[mask], self.at[mask],
+                              self.cheaper_above[mask])
+
+    def rows(self, limit: Optional[int] = None) -> List[dict]:
+        out = []
+        for a, b, at, above in zip(self.a[:limit].tolist(), self.b[:limit].tolist(), self.at[:limit].tolist(),
+                                   self.cheaper_above[:limit].tolist()):
+            out.append({"a": self.names[a], "b": self.names[b], self.variable: at,
+                         "cheaper_below": self.names[b if above == a else a], "cheaper_above": self.names[above]})
+        return out
+
+def pairs(n: int, groups: Optional[np.ndarray] = None, same_group: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """Index pairs i < j, optionally only those whose groups are equal (or differ, with same_group=False)."""
+    a, b = np.triu_indices(n, 1)
+    if groups is None:
+        return a, b
+    keep = (groups[a] == groups[b]) == same_group
+    return a[keep], b[keep]
+
+def crossovers(variable: str, names: List[str], intercept: np.ndarray, slope: np.ndarray,
+               a: np.ndarray, b: np.ndarray, low: float = 0.0, high: float = math.inf) -> CrossoverTable:
+    """Where the lines intercept + slope * x cross for each pair (a, b), kept if strictly inside (low, high).
+
+    x* = (intercept_b - intercept_a) / (slope_a - slope_b); parallel lines never cross.
+    """
+    rise = intercept[b] - intercept[a]
+    run = slope[a] - slope[b]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        at = rise / run
+    keep = (run != 0) & (at > low) & (at < high)
+    a, b, at = a[keep], b[keep], at[keep]
+    order = np.argsort(at, kind="stable")
+    a, b, at = a[order], b[order], at[order]
+    cheaper_above = np.where(slope[a] < slope[b], a, b)
+    return CrossoverTable(variable, names, a, b, at, cheaper_above)
+
+@lru_cache(maxsize=64)
+def platform_crossovers(keys: Optional[Tuple[str, ...]] = None) -> CrossoverTable:
+    """Monthly request volume where each pair of platforms in the same category swap places.
+
+    Platform cost is estimated_monthly_base + estimated_per_request x volume.
+    `keys` limits the comparison to a chosen set of platforms.
+    """
+    options = [(category, key, p) for category, platforms in get_all_platforms().items() for key, p in platforms.items()
+               if keys is None or key in keys]
+    if keys is not None and len(options) != len(set(keys)):
+        known = {key for _, key, _ in options}
+        raise ValueError(f"Unknown platforms: {', '.join(sorted(set(keys) - known))}")
+    categories = {category: i for i, category in enumerate(dict.fromkeys(c for c, _, _ in options))}
+    groups = np.array([categories[c] for c, _, _ in options])
+    base = np.array([p.estimated_monthly_base for _, _, p in options], np.float64)
+    per_request = np.array([p.estimated_per_request for _, _, p in options], np.float64)
+    return crossovers("monthly_requests", [key for _, key, _ in options], base, per_request, *pairs(len(options), groups))
+
+def cache_hit_crossovers(catalog: ModelCatalog, scenario: Scenario, models: Optional[List[str]] = None,
+                         providers: Optional[List[str]] = None, cross_provider: bool = False) -> CrossoverTable:
+    """Cache hit rate where each pair of models swap places for a scenario's requests.
+
+    Compares the given models, or every model from the given providers, or
+    the whole catalog; cross_provider skips pairs from the same provider.
+    Per-request cost is linear in the hit rate, falling faster for providers
+    with deeper cache discounts, so evaluating it at 0 and 1 gives each line.
+    """
+    for name, values in (("models", models), ("providers", providers)):
+        if values is not None and (not isinstance(values, list) or not all(isinstance(v, str) for v in values)):
+            raise ValueError(f"{name} must be a list of strings")
+    if models is not None:
+        missing = [m for m in models if catalog.position(m) is None]
+        if missing:
+            raise ValueError(f"Unknown models: {', '.join(missing[:5])}")
+        rows = np.array([catalog.position(m) for m in dict.fromkeys(models)], np.intp)
+    elif providers is not None:
+        wanted = {p.lower() for p in providers}
+        codes = [i for i, p in enumerate(catalog.providers) if p.lower() in wanted]
+        rows = np.flatnonzero(np.isin(catalog.provider_codes, codes))
+    else:
+        rows = np.arange(len(catalog))
+    if len(rows) > CROSSOVER_MAX_MODELS:
+        raise ValueError(f"Compare at most {CROSSOVER_MAX_MODELS} models at once (got {len(rows)})")
+    at = [cost_per_request(catalog, scenario.input_tokens, scenario.output_tokens, scenario.effective_iterations,
+                           rate, scenario.scale_discount)[rows] for rate in (0.0, 1.0)]
+    a, b = pairs(len(rows), catalog.provider_codes[rows], same_group=False) if cross_provider else pairs(len(rows))
+    return crossovers("cache_hit_rate", [catalog.ids[r] for r in rows], at[0], at[1] - at[0], a, b, low=0.0, high=1.0)
@@ -0,0 +1,149 @@
+"""TCO calculation engine. Mirrors the calculator formulas in the page script."""
+from dataclasses import dataclass, fields
+from typing import Dict
+import math
+from models import ModelSpec
+
+# Complexity affects expected iterations/overhead (retries, tool calls, etc.)
+COMPLEXITY_MULTIPLIERS = {"low": 1.0, "medium": 1.5, "high": 2.5}
+# Volume discounts at higher scales
+SCALE_DISCOUNTS = {"startup": 1.0, "growth": 0.95, "scale": 0.90, "enterprise": 0.85}
+# Estimated platform costs for typical selections at each scale ($/month)
+PLATFORM_BASE_COSTS = {"startup": 50, "growth": 200, "scale": 800, "enterprise": 3000}
+DAYS_PER_MONTH = 30
+MAX_SCENARIO_VALUE = 1e15  # Far above any real workload, low enough that cost products stay finite
+
+@dataclass(frozen=True)
+class Scenario:
+    input_tokens: int = 1000
+    output_tokens: int = 500
+    daily_users: int = 100
+    requests_per_user: float = 10
+    iterations: int = 1
+    cache_hit_rate: float = 0.0  # Fraction of input tokens served from cache (0.0-1.0)
+    scale: str = "startup"
+    complexity: str = "low"
+
+    @property
+    def monthly_requests(self) -> float:
+        return self.daily_users * self.requests_per_user * DAYS_PER_MONTH
+
+    @property
+    def complexity_multiplier(self) -> float:
+        return COMPLEXITY_MULTIPLIERS.get(self.complexity, 1.0)
+
+    @property
+    def scale_discount(self) -> float:
+        return SCALE_DISCOUNTS.get(self.scale, 1.0)
+
+    @property
+    def effective_iterations(self) -> float:
+        return (self.iterations or 1) * self.complexity_multiplier
+
+@dataclass(frozen=True)
+class CostBreakdown:
+    cost_per_request: float
+    input_cost: float  # Per request, after cache discount
+    output_cost: float  # Per request
+    cache_savings: float  # Per request
+    daily_requests: float
+    monthly_requests: float
+    monthly_cost: float  # LLM cost
+    monthly_cache_savings: float
+    platform_cost: float
+    total_monthly_cost: float
+    effective_iterations: float
+    complexity_multiplier: float
+    scale_discount: float
+    cache_discount: float
+
+_SCENARIO_FIELDS = {f.name: f.type for f in fields(Scenario)}
+_SCENARIO_CHOICES = {"scale": SCALE_DISCOUNTS, "complexity": COMPLEXITY_MULTIPLIERS}
+
+def scenario_from_dict(data: Dict) -> Scenario:
+    """Build a scenario from JSON-style input, using defaults for missing fields.
+
+    Raises ValueError for unknown fields or values of the wrong type or out of range.
+    """
+    known = _SCENARIO_FIELDS
+    unknown = data.keys() - known.keys()
+    if unknown:
+        raise ValueError(f"Unknown scenario fields: {', '.join(sorted(unknown))}")
+    values = {}
+    for name, value in data.items():
+        kind = known[name]
+        if kind is str:
+            if not isinstance(value, str):
+                raise ValueError(f"{name} must be a string")
+            value = value.lower()
+            if value not in _SCENARIO_CHOICES[name]:
+                raise ValueError(f"{name} must be one of: {', '.join(_SCENARIO_CHOICES[name])}")
+            values[name] = value
+            continue
+        try:
+            if isinstance(value, bool):
+                raise TypeError
+            number = float(value)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"{name} must be a number") from None
+        if not math.isfinite(number):
+            raise ValueError(f"{name} must be a finite number")
+        if number < 0:
+            raise ValueError(f"{name} must not be negative")
+        if number > MAX_SCENARIO_VALUE:
+            raise ValueError(f"{name} must be at most {MAX_SCENARIO_VALUE:g}")
+        # Like the page's parseInt(), integer fields drop any fraction
+        values[name] = int(number) if kind is int else number
+    if not 0 <= values.get("cache_hit_rate", 0) <= 1:
+        raise ValueError("cache_hit_rate must be between 0 and 1")
+    return Scenario(**values)
+
+def cache_discount(provider: str) -> float:
+    """Price multiplier for cached input tokens (e.g. 0.1 means 90% off)."""
+    provider = provider.lower()
+    if "anthropic" in provider:
+        return 0.10  # ~90% off for Anthropic cached reads
+    if "openai" in provider:
+        return 0.25  # ~75% off for OpenAI (0.25x price)
+    return 0.25  # Default to 75% off for other providers
+
+def platform_cost(scale: str) -> float:
+    return PLATFORM_BASE_COSTS.get(scale, 50)
+
+def calculate(model: ModelSpec, scenario: Scenario) -> CostBreakdown:
+    """Full cost breakdown for one model, matching the page's calculate()."""
+    multiplier = scenario.complexity_multiplier
+    scale_discount = scenario.scale_discount
+    discount = cache_discount(model.provider)
+    effective_iterations = scenario.effective_iterations
+    hit_rate = scenario.cache_hit_rate
+
+    # Effective input cost = full_price × (1 - hit_rate) + (cached_price × hit_rate)
+    full_input_cost = (scenario.input_tokens * effective_iterations / 1000000) * model.price_input * scale_discount
+    cached_input_cost = full_input_cost * discount
+    input_cost = full_input_cost * (1 - hit_rate) + cached_input_cost * hit_rate
+    output_cost = (scenario.output_tokens * effective_iterations / 1000000) * model.price_output * scale_discount
+    cost_per_request = input_cost + output_cost
+    cache_savings = full_input_cost - input_cost
+
+    daily_requests = scenario.daily_users * scenario.requests_per_user
+    monthly_requests = daily_requests * DAYS_PER_MONTH
+    monthly_cost = cost_per_request * monthly_requests
+    platform = platform_cost(scenario.scale)
+
+    return CostBreakdown(
+        cost_per_request=cost_per_request,
+        input_cost=input_cost,
+        output_cost=output_cost,
+        cache_savings=cache_savings,
+        daily_requests=daily_requests,
+        monthly_requests=monthly_requests,
+        monthly_cost=monthly_cost,
+        monthly_cache_savings=cache_savings * monthly_requests,
+        platform_cost=platform,
+        total_monthly_cost=monthly_cost + platform,
+        effective_iterations=effective_iterations,
+        complexity_multiplier=multiplier,
+        scale_discount=scale_discount,
+        cache_discount=discount,
+    )
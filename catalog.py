@@ -0,0 +1,211 @@
+"""Columnar, NumPy-backed model catalog for vectorized cost evaluation."""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import math
+import os
+import numpy as np
+from models import ModelSpec, get_catalog_snapshot
+from calculator import Scenario, DAYS_PER_MONTH, cache_discount, platform_cost
+
+TIERS = ("budget", "balanced", "premium")
+# Percentiles of the price-sorted catalog where each tier ends (the last tier takes the rest)
+TIER_CUTS = tuple(float(c) for c in os.environ.get("THRIFTY_TIER_CUTS", "0.3333333333,0.6666666667").split(","))
+TIER_SUGGESTIONS = 5  # Cheapest models listed per tier
+
+@dataclass(frozen=True, eq=False)
+class ModelCatalog:
+    version: str
+    ids: List[str]
+    names: List[str]
+    providers: List[str]  # Distinct provider names, indexed by provider_codes
+    provider_codes: np.ndarray  # int32, one per model
+    price_input: np.ndarray  # float64, per 1M tokens
+    price_output: np.ndarray  # float64, per 1M tokens
+    context_window: np.ndarray  # int64
+    max_output: np.ndarray  # int64
+    cache_discount: np.ndarray  # float64, price multiplier for cached input tokens
+    positions: Dict[str, int]  # model_id -> row
+    provider_models: Dict[str, List[str]]  # provider -> model ids, in catalog order
+    models: Dict[str, ModelSpec]  # The specs the columns were built from
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def position(self, model_id: str) -> Optional[int]:
+        """Row of a model in the columns, or None if it is not in the catalog."""
+        return self.positions.get(model_id)
+
+    def provider(self, row: int) -> str:
+        return self.providers[self.provider_codes[row]]
+
+def build_catalog(models: Dict[str, ModelSpec], version: str = "") -> ModelCatalog:
+    """Build contiguous columns from a model dict."""
+    ids = list(models)
+    specs = list(models.values())
+    providers = sorted({m.provider for m in specs})
+    codes = {p: i for i, p in enumerate(providers)}
+    n = len(specs)
+    provider_codes = np.fromiter((codes[m.provider] for m in specs), np.int32, n)
+    discounts = np.array([cache_discount(p) for p in providers], np.float64)
+    provider_models = {p: [] for p in providers}
+    for model_id, m in zip(ids, specs):
+        provider_models[m.provider].append(model_id)
+    return ModelCatalog(
+        version=version,
+        ids=ids,
+        names=[m.name for m in specs],
+        providers=providers,
+        provider_codes=provider_codes,
+        price_input=np.fromiter((m.price_input for m in specs), np.float64, n),
+        price_output=np.fromiter((m.price_output for m in specs), np.float64, n),
+        context_window=np.fromiter((m.context_window for m in specs), np.int64, n),
+        max_output=np.fromiter((m.max_output for m in specs), np.int64, n),
+        cache_discount=discounts[provider_codes],
+        positions={model_id: i for i, model_id in enumerate(ids)},
+        provider_models=provider_models,
+        models=models,
+    )
+
+_catalog: Optional[ModelCatalog] = None
+_tier_index: Dict[Tuple[str, Tuple[float, ...]], dict] = {}
+
+def get_catalog() -> ModelCatalog:
+    """Get the columnar catalog for the current get_models() data, rebuilding it when the version changes."""
+    global _catalog
+    version, models = get_catalog_snapshot()
+    catalog = _catalog
+    if catalog is None or catalog.version != version:
+        catalog = _catalog = build_catalog(models, version)
+    return catalog
+
+def cost_per_request(catalog: ModelCatalog, input_tokens: float, output_tokens: float,
+                     iterations: float = 1.0, cache_hit_rate: float = 0.0, scale_discount: float = 1.0) -> np.ndarray:
+    """Cost of one request for every model at once.
+
+    `iterations` is the effective iteration count (iterations x complexity
+    multiplier). Cached input tokens are billed at the provider's cache discount.
+    """
+    full_input = (input_tokens * iterations / 1_000_000) * scale_discount * catalog.price_input
+    input_cost = full_input * (1 - cache_hit_rate * (1 - catalog.cache_discount))
+    output_cost = (output_tokens * iterations / 1_000_000) * scale_discount * catalog.price_output
+    return input_cost + output_cost
+
+def monthly_costs(catalog: ModelCatalog, input_tokens: float, output_tokens: float, monthly_requests: float,
+                  iterations: float = 1.0, cache_hit_rate: float = 0.0, scale_discount: float = 1.0) -> np.ndarray:
+    """Monthly LLM cost for every model at once."""
+    return cost_per_request(catalog, input_tokens, output_tokens, iterations, cache_hit_rate, scale_discount) * monthly_requests
+
+def cheapest_request_cost(catalog: ModelCatalog, input_tokens: float, output_tokens: float) -> Optional[float]:
+    """Lowest list-price cost of one request across the catalog, or None if it is empty."""
+    if not len(catalog):
+        return None
+    return float(cost_per_request(catalog, input_tokens, output_tokens).min())
+
+def scenario_costs(catalog: ModelCatalog, scenario: Scenario) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-request and monthly LLM cost of a scenario for every model."""
+    per_request = cost_per_request(catalog, scenario.input_tokens, scenario.output_tokens,
+                                   scenario.effective_iterations, scenario.cache_hit_rate, scenario.scale_discount)
+    return per_request, per_request * scenario.monthly_requests
+
+def evaluate_batch(catalog: ModelCatalog, rows: List[int], scenarios: List[Scenario]) -> Dict[str, np.ndarray]:
+    """Full cost breakdowns for many (model row, scenario) pairs at once.
+
+    Returns one column per CostBreakdown field. Operations run in the same
+    order as calculator.calculate(), so results match it exactly.
+    """
+    n = len(rows)
+    rows = np.asarray(rows, np.intp)
+
+    def column(values) -> np.ndarray:
+        return np.fromiter(values, np.float64, n)
+
+    input_tokens = column(s.input_tokens for s in scenarios)
+    output_tokens = column(s.output_tokens for s in scenarios)
+    hit_rate = column(s.cache_hit_rate for s in scenarios)
+    multiplier = column(s.complexity_multiplier for s in scenarios)
+    scale_discount = column(s.scale_discount for s in scenarios)
+    effective_iterations = column(s.effective_iterations for s in scenarios)
+    daily_requests = column(s.daily_users * s.requests_per_user for s in scenarios)
+    platform = column(platform_cost(s.scale) for s in scenarios)
+    discount = catalog.cache_discount[rows]
+
+    full_input_cost = (input_tokens * effective_iterations / 1000000) * catalog.price_input[rows] * scale_discount
+    input_cost = full_input_cost * (1 - hit_rate) + full_input_cost * discount * hit_rate
+    output_cost = (output_tokens * effective_iterations / 1000000) * catalog.price_output[rows] * scale_discount
+    cost = input_cost + output_cost
+    cache_savings = full_input_cost - input_cost
+    monthly_requests = daily_requests * DAYS_PER_MONTH
+    monthly_cost = cost * monthly_requests
+
+    columns = {
+        "cost_per_request": cost,
+        "input_cost": input_cost,
+        "output_cost": output_cost,
+        "cache_savings": cache_savings,
+        "daily_requests": daily_requests,
+        "monthly_requests": monthly_requests,
+        "monthly_cost": monthly_cost,
+        "monthly_cache_savings": cache_savings * monthly_requests,
+        "platform_cost": platform,
+        "total_monthly_cost": monthly_cost + platform,
+        "effective_iterations": effective_iterations,
+        "complexity_multiplier": multiplier,
+        "scale_discount": scale_discount,
+        "cache_discount": discount,
+    }
+    return columns
+
+def cheapest(costs: np.ndarray, k: int) -> np.ndarray:
+    """Rows of the k lowest costs in ascending order, ties in catalog order.
+
+    Uses partial selection, so only the k winners are sorted.
+    """
+    n = len(costs)
+    if k <= 0 or n == 0:
+        return np.zeros(0, np.intp)
+    if k >= n:
+        return np.argsort(costs, kind="stable")
+    kth = np.partition(costs, k - 1)[k - 1]
+    candidates = np.flatnonzero(costs <= kth)
+    return candidates[np.argsort(costs[candidates], kind="stable")][:k]
+
+def cost_rank(costs: np.ndarray, row: int) -> int:
+    """1-based rank of a row in ascending cost order, ties in catalog order."""
+    cost = costs[row]
+    return int(np.count_nonzero(costs < cost) + np.count_nonzero(costs[:row] == cost)) + 1
+
+def tier_index(catalog: ModelCatalog, cuts: Tuple[float, ...] = TIER_CUTS, suggestions: int = TIER_SUGGESTIONS) -> dict:
+    """Split priced models into budget/balanced/premium tiers by input + output price.
+
+    Returns the price range and size of each tier and its cheapest models.
+    """
+    if len(cuts) != len(TIERS) - 1 or list(cuts) != sorted(cuts) or not all(0 <= c <= 1 for c in cuts):
+        raise ValueError(f"Need {len(TIERS) - 1} ascending tier cuts between 0 and 1")
+    total = catalog.price_input + catalog.price_output
+    priced = np.flatnonzero(total > 0)
+    order = priced[np.argsort(total[priced], kind="stable")]
+    n = len(order)
+    # Tolerance keeps e.g. 9 * 0.6666666667 from rounding up to 7
+    bounds = [0, *(min(n, math.ceil(n * c - 1e-6)) for c in cuts), n]
+    tiers = {}
+    for tier, lo, hi in zip(TIERS, bounds, bounds[1:]):
+        rows = order[lo:hi]
+        tiers[tier] = {
+            "count": len(rows),
+            "min_price": float(total[rows[0]]) if len(rows) else None,
+            "max_price": float(total[rows[-1]]) if len(rows) else None,
+            "models": [{"id": catalog.ids[r], "name": catalog.names[r], "provider": catalog.provider(r)}
+                       for r in rows[:suggestions]],
+        }
+    return {"version": catalog.version, "cuts": list(cuts), "tiers": tiers}
+
+def get_tier_index(cuts: Tuple[float, ...] = TIER_CUTS) -> dict:
+    """Get the tier index for the current catalog, computed once per catalog version."""
+    catalog = get_catalog()
+    key = (catalog.version, tuple(cuts))
+    index = _tier_index.get(key)
+    if index is None:
+        if len(_tier_index) > 16:
+            _tier_index.clear()
+        index = _tier_index[key] = tier_index(catalog, tuple(cuts))
+    return index
@@ -0,0 +1,277 @@
+"""Append-only price history: memory-mapped columns of model prices per catalog refresh, with as-of queries."""
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import math
+import os
+import threading
+import numpy as np
+from calculator import Scenario, DAYS_PER_MONTH, cache_discount
+from models import ModelSpec, CatalogDiff, get_models, get_catalog_fetched_at
+
+try:
+    import fcntl
+except ImportError:  # No advisory locks (Windows): assume a single writer process
+    fcntl = None
+
+HISTORY_DIR = Path(os.environ.get("THRIFTY_HISTORY_DIR", Path(__file__).parent / "history"))
+CHECKPOINT_EVERY = 32  # Snapshots between full copies of every price, bounding how far back a lookup reads
+HISTORY_MAX_SERIES = 100  # Models per price series
+
+# One record per model whose price changed in a snapshot (every priced model in a checkpoint); NaN = removed
+RECORD = np.dtype([("model", "<u4"), ("price_input", "<f8"), ("price_output", "<f8")])
+# One entry per refresh that changed prices: when, and the end of its records
+SNAPSHOT = np.dtype([("time", "<f8"), ("end", "<u8"), ("checkpoint", "u1")])
+
+class PriceHistory:
+    """Price history stored in a directory of append-only files.
+
+    models.jsonl maps record model numbers (line numbers) to [id, provider];
+    records.bin and snapshots.bin hold RECORD and SNAPSHOT rows. Writers
+    append records before the snapshot that commits them, so readers only
+    trust records up to the last snapshot's end and never see a half-written
+    refresh. Reads memory-map the files and touch only the snapshots asked for.
+    """
+
+    def __init__(self, directory: Path = None):
+        self.directory = Path(directory or HISTORY_DIR)
+        self.models_path = self.directory / "models.jsonl"
+        self.records_path = self.directory / "records.bin"
+        self.snapshots_path = self.directory / "snapshots.bin"
+        self._ids: List[str] = []
+        self._providers: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._models_read = 0  # Bytes of models.jsonl parsed so far
+        self._models_lock = threading.Lock()
+
+    def _map(self, path: Path, dtype: np.dtype, count: Optional[int] = None) -> np.ndarray:
+        try:
+            available = path.stat().st_size // dtype.itemsize
+        except FileNotFoundError:
+            available = 0
+        count = available if count is None else min(count, available)
+        if not count:
+            return np.zeros(0, dtype)
+        return np.memmap(path, dtype, mode="r", shape=(count,))
+
+    def snapshots(self) -> np.ndarray:
+        """Committed snapshots, oldest first (memory-mapped)."""
+        return self._map(self.snapshots_path, SNAPSHOT)
+
+    def _records(self, snapshots: np.ndarray) -> np.ndarray:
+        return self._map(self.records_path, RECORD, int(snapshots["end"][-1]) if len(snapshots) else 0)
+
+    def _load_models(self):
+        """Pick up model ids appended since the last call (complete lines only)."""
+        with self._models_lock:
+            try:
+                with open(self.models_path, "rb") as f:
+                    f.seek(self._models_read)
+                    data = f.read()
+            except FileNotFoundError:
+                return
+            complete = data[:data.rfind(b"\n") + 1]
+            for line in complete.splitlines():
+                model_id, provider = json.loads(line)
+                self._positions[model_id] = len(self._ids)
+                self._ids.append(model_id)
+                self._providers.append(provider)
+            self._models_read += len(complete)
+
+    @staticmethod
+    def _start(snapshots: np.ndarray, s: int) -> int:
+        return int(snapshots["end"][s - 1]) if s else 0
+
+    def _state(self, snapshots: np.ndarray, records: np.ndarray, s: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Prices of every model as of snapshot s (NaN if unpriced), replayed from the checkpoint before it."""
+        n = len(self._ids)
+        price_input, price_output = np.full(n, np.nan), np.full(n, np.nan)
+        checkpoint = int(np.flatnonzero(snapshots["checkpoint"][:s + 1])[-1])
+        for i in range(checkpoint, s + 1):
+            self._apply(records[self._start(snapshots, i):int(snapshots["end"][i])], price_input, price_output)
+        return price_input, price_output
+
+    @staticmethod
+    def _apply(chunk: np.ndarray, price_input: np.ndarray, price_output: np.ndarray):
+        # A snapshot has at most one record per model, so plain fancy assignment is well defined
+        models = chunk["model"].astype(np.intp)
+        price_input[models] = chunk["price_input"]
+        price_output[models] = chunk["price_output"]
+
+    def as_of(self, at: float, model_ids: Optional[List[str]] = None) -> Dict[str, Tuple[float, float]]:
+        """(price_input, price_output) in effect at a time, for the given or all models priced then."""
+        snapshots = self.snapshots()
+        s = int(np.searchsorted(snapshots["time"], at, side="right")) - 1
+        if s < 0:
+            return {}
+        self._load_models()
+        price_input, price_output = self._state(snapshots, self._records(snapshots), s)
+        rows = range(len(self._ids)) if model_ids is None else [self._positions.get(m) for m in model_ids]
+        return {self._ids[r]: (float(price_input[r]), float(price_output[r]))
+                for r in rows if r is not None and not math.isnan(price_input[r])}
+
+    def _replay(self, start: float, end: float):
+        """Yield (from, to, price_input, price_output) for each stretch of [start, end) with constant prices."""
+        snapshots = self.snapshots()
+        times = snapshots["time"]
+        first = max(int(np.searchsorted(times, start, side="right")) - 1, 0)
+        last = int(np.searchsorted(times, end, side="left"))  # Snapshots in [first, last) matter
+        if first >= last:
+            return
+        self._load_models()
+        records = self._records(snapshots)
+        price_input, price_output = self._state(snapshots, records, first)
+        for s in range(first, last):
+            if s > first:
+                if snapshots["checkpoint"][s]:  # A full copy: models it leaves out are unpriced
+                    price_input[:] = price_output[:] = np.nan
+                self._apply(records[self._start(snapshots, s):int(snapshots["end"][s])], price_input, price_output)
+            upto = min(float(times[s + 1]), end) if s + 1 < len(times) else end
+            frm = max(float(times[s]), start)
+            if upto > frm:
+                yield frm, upto, price_input, price_output
+
+    def series(self, model_ids: List[str], start: float = -math.inf, end: float = math.inf) -> dict:
+        """Prices of a few models at every change within [start, end)."""
+        if len(model_ids) > HISTORY_MAX_SERIES:
+            raise ValueError(f"Ask for at most {HISTORY_MAX_SERIES} models at once")
+        self._load_models()
+        unknown = [m for m in model_ids if m not in self._positions]
+        if unknown:
+            raise ValueError(f"No price history for: {', '.join(unknown[:5])}")
+        rows = [self._positions[m] for m in model_ids]
+        times, inputs, outputs = [], [], []
+        for frm, _, price_input, price_output in self._replay(start, end):
+            times.append(frm)
+            inputs.append(price_input[rows])
+            outputs.append(price_output[rows])
+
+        def column(values: list, i: int) -> list:
+            return [None if math.isnan(v[i]) else float(v[i]) for v in values]
+
+        return {"times": times, "models": {m: {"price_input": column(inputs, i), "price_output": column(outputs, i)}
+                                           for i, m in enumerate(model_ids)}}
+
+    def reprice(self, scenario: Scenario, start: float, end: float) -> Dict[str, dict]:
+        """LLM cost of a scenario's traffic over [start, end) at the prices in effect at each moment.
+
+        Traffic runs at the scenario's monthly volume, spread evenly. Cost is
+        linear in the two prices, so each stretch only adds its request-weighted
+        prices to per-model totals; the scenario's token mix is applied once at
+        the end. Models priced for part of the window get `coverage` below 1.
+        """
+        if not end > start:
+            raise ValueError("end must be after start")
+        per_second = scenario.monthly_requests / (DAYS_PER_MONTH * 86400)
+        weighted_input = weighted_output = covered = None
+        for frm, upto, price_input, price_output in self._replay(start, end):
+            if weighted_input is None:
+                weighted_input, weighted_output, covered = (np.zeros(len(price_input)) for _ in range(3))
+            priced = ~np.isnan(price_input)
+            requests = per_second * (upto - frm)
+            weighted_input += np.where(priced, price_input, 0) * requests
+            weighted_output += np.where(priced, price_output, 0) * requests
+            covered += priced * (upto - frm)
+        if weighted_input is None:
+            return {}
+        # Same formula as catalog.cost_per_request(), with prices factored out
+        scale, iterations, hit = scenario.scale_discount, scenario.effective_iterations, scenario.cache_hit_rate
+        discounts = np.array([cache_discount(p) for p in self._providers[:len(weighted_input)]])
+        input_rate = (scenario.input_tokens * iterations / 1_000_000) * scale * (1 - hit * (1 - discounts))
+        output_rate = (scenario.output_tokens * iterations / 1_000_000) * scale
+        costs = input_rate * weighted_input + output_rate * weighted_output
+        return {self._ids[r]: {"cost": float(costs[r]), "coverage": float(covered[r] / (end - start))}
+                for r in np.flatnonzero(covered)}
+
+    @contextmanager
+    def _locked(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _repair(self):
+        """Drop whatever a crashed writer left after the last committed snapshot."""
+        snapshots = self.snapshots()
+        committed = int(snapshots["end"][-1]) if len(snapshots) else 0
+        for path, size in ((self.snapshots_path, len(snapshots) * SNAPSHOT.itemsize),
+                           (self.records_path, committed * RECORD.itemsize)):
+            if path.exists() and path.stat().st_size != size:
+                os.truncate(path, size)
+        if self.models_path.exists():
+            data = self.models_path.read_bytes()
+            if data and not data.endswith(b"\n"):
+                os.truncate(self.models_path, data.rfind(b"\n") + 1)
+
+    def append(self, models: Dict[str, ModelSpec], at: float) -> int:
+        """Record a catalog's prices as of a time; returns the number of records written.
+
+        Only prices that differ from the latest snapshot are written (every
+        CHECKPOINT_EVERY snapshots, all of them), so several workers recording
+        the same refresh write it once. Times never go backwards.
+        """
+        with self._locked():
+            self._repair()
+            self._load_models()
+            new = [(m, spec.provider) for m, spec in models.items() if m not in self._positions]
+            if new:
+                with open(self.models_path, "ab") as f:
+                    f.write(b"".join(json.dumps(list(entry)).encode() + b"\n" for entry in new))
+                self._load_models()
+            n = len(self._ids)
+            snapshots = self.snapshots()
+            if len(snapshots):
+                old_input, old_output = self._state(snapshots, self._records(snapshots), len(snapshots) - 1)
+                since_checkpoint = len(snapshots) - int(np.flatnonzero(snapshots["checkpoint"])[-1])
+            else:
+                old_input = old_output = np.full(n, np.nan)
+                since_checkpoint = CHECKPOINT_EVERY
+            price_input, price_output = np.full(n, np.nan), np.full(n, np.nan)
+            rows = np.fromiter((self._positions[m] for m in models), np.intp, len(models))
+            price_input[rows] = [spec.price_input for spec in models.values()]
+            price_output[rows] = [spec.price_output for spec in models.values()]
+
+            def differs(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+                return ~((a == b) | (np.isnan(a) & np.isnan(b)))
+
+            changed = differs(price_input, old_input) | differs(price_output, old_output)
+            if not changed.any():
+                return 0
+            checkpoint = since_checkpoint >= CHECKPOINT_EVERY
+            write = np.flatnonzero(~np.isnan(price_input) if checkpoint else changed)
+            records = np.empty(len(write), RECORD)
+            records["model"] = write
+            records["price_input"] = price_input[write]
+            records["price_output"] = price_output[write]
+            end = (int(snapshots["end"][-1]) if len(snapshots) else 0) + len(records)
+            at = max(at, float(snapshots["time"][-1])) if len(snapshots) else at
+            for path, data in ((self.records_path, records), (self.snapshots_path,
+                                                              np.array([(at, end, checkpoint)], SNAPSHOT))):
+                with open(path, "ab") as f:
+                    f.write(data.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            return len(records)
+
+_history: Optional[PriceHistory] = None
+
+def get_history() -> PriceHistory:
+    global _history
+    if _history is None:
+        _history = PriceHistory()
+    return _history
+
+def record_prices(diff: CatalogDiff):
+    """Catalog listener: append the new catalog's prices. Built-in defaults are not real prices, so skip them."""
+    fetched_at = get_catalog_fetched_at()
+    if fetched_at and (diff.added or diff.removed or diff.repriced):
+        try:
+            get_history().append(get_models(), fetched_at)
+        except OSError as e:
+            print(f"Error writing price history {get_history().directory}: {e}")
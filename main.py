@@ -1,13 +1,52 @@
-from fastcore.xml import Html, Head, Style, Body, H1, H2, Div, Label, Select, Input, Span, Button, Option, A, P, Nav, Meta, NotStr
+from fastcore.xml import Html, Head, Style, Body, H1, H2, Div, Label, Select, Input, Span, Button, Option, A, P, Nav, Meta, Link, NotStr, to_xml
 from fasthtml.xtend import Script
 from fasthtml.core import serve, FastHTML
+from starlette.responses import Response, RedirectResponse, JSONResponse, StreamingResponse
+from email.utils import formatdate, parsedate_to_datetime
+import asyncio
+import gzip
+import hashlib
 import json
-from models import get_models
-from platforms import get_all_platforms, get_use_case_templates
+import math
+import re
+import time
+from models import (get_catalog_snapshot, get_catalog_updated_at, get_merge_report, get_refresh_metrics,
+                    start_refresh_scheduler, stop_refresh_scheduler, add_catalog_listener, get_catalog_diff)
+from dataclasses import asdict
+from platforms import get_all_platforms, get_use_case_templates, get_recommendation_matrix
+from calculator import calculate, scenario_from_dict
+from sweep import SWEEP_MAX_JSON_CELLS, sweep_from_dict
+from simulate import simulate_from_dict, shutdown_pool
+from breakeven import CROSSOVER_LIMIT, platform_crossovers, cache_hit_crossovers
+from search import SEARCH_LIMIT, get_search_index
+from pareto import get_frontier, dominated_by
+from optimizer import optimize_from_dict
+from history import get_history, record_prices
+from scenarios import SCENARIO_MAX_ID, get_store, close_store, reevaluate_scenarios
+from catalog import (get_catalog, get_tier_index, scenario_costs, cheapest, cost_rank, evaluate_batch,
+                     cheapest_request_cost)
 
-app = FastHTML()
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip is always available
+    brotli = None
+
+# Pricing is refreshed by a background task so requests never wait on the upstream APIs
+app = FastHTML(on_startup=[start_refresh_scheduler], on_shutdown=[stop_refresh_scheduler, shutdown_pool, close_store])
 rt = app.route
 
+_started_at = time.time()
+
+# Rendered index page for the current catalog version: version -> (body, etag, last_modified)
+_index_cache = {}
+# Serialized, pre-compressed model catalog for the current version: version -> encoded bodies
+_catalog_cache = {}
+# Pre-compressed per-provider shards of the current version: (version, slug) -> encoded bodies.
+# Request threads and the catalog refresh thread both update it, so it is replaced, never changed in place
+_shard_cache = {}
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
 def get_common_styles():
     return """
         * { box-sizing: border-box; }
@@ -66,6 +105,7 @@ def get_common_styles():
         .comparison-table th, .comparison-table td { padding: 12px; text-align: left; border-bottom: 1px solid #e5e7eb; }
         .comparison-table th { background: #f8fafc; font-weight: 600; color: #374151; }
         .comparison-table tr:hover { background: #f8fafc; }
+        .frontier-table { overflow-x: auto; }
         .comparison-cards { display: none; }
         .comparison-card { background: white; border: 1px solid #e5e7eb; border-radius: 8px; padding: 16px; margin-bottom: 12px; }
         .comparison-card.current { border: 2px solid #2563eb; background: #eff6ff; }
@@ -95,6 +135,11 @@ def get_common_styles():
         .section-tab:hover { color: #2563eb; }
         .section-tab.active { color: #2563eb; border-bottom-color: #2563eb; font-weight: 500; }
         .hidden { display: none; }
+        .search-box { position: relative; }
+        .search-results { position: absolute; left: 0; right: 0; top: 100%; z-index: 50; background: white; border: 1px solid #d1d5db; border-radius: 6px; margin-top: 4px; box-shadow: 0 4px 12px rgba(0,0,0,0.1); max-height: 320px; overflow-y: auto; }
+        .search-result { display: flex; justify-content: space-between; gap: 10px; padding: 8px 12px; cursor: pointer; font-size: 0.9em; }
+        .search-result:hover, .search-result.active { background: #eff6ff; }
+        .search-result-provider { color: #6b7280; font-size: 0.85em; white-space: nowrap; }
         @media (max-width: 1024px) { .grid-2, .grid-3 { grid-template-columns: 1fr; } .tco-grid { grid-template-columns: repeat(2, 1fr); } }
         @media (max-width: 768px) { 
             .tco-grid { grid-template-columns: 1fr; } 
@@ -108,6 +153,7 @@ def get_common_styles():
             .nav a { flex: 1 1 auto; text-align: center; }
             .comparison-table { display: none; }
             .comparison-cards { display: block; }
+            .frontier-table .comparison-table { display: table; }
         }
     """
 
@@ -118,7 +164,8 @@ def serialize_models(models):
         "context_window": v.context_window,
         "max_output": v.max_output,
         "price_input": v.price_input,
-        "price_output": v.price_output
+        "price_output": v.price_output,
+        "source": v.source
     } for k, v in models.items()}
 
 def serialize_platforms(platforms_dict):
@@ -142,7 +189,7 @@ def serialize_platforms(platforms_dict):
             }
     return result
 
-def serialize_use_cases(use_cases):
+def serialize_use_cases(use_cases, catalog=None):
     return {k: {
         "name": v.name,
         "description": v.description,
@@ -151,19 +198,662 @@ def serialize_use_cases(use_cases):
         "requests_per_user_day": v.requests_per_user_day,
         "model_tier": v.model_tier,
         "complexity": v.complexity.value,
-        "cache_hit_rate": v.cache_hit_rate
+        "cache_hit_rate": v.cache_hit_rate,
+        "cheapest_cost": cheapest_request_cost(catalog, v.typical_input_tokens, v.typical_output_tokens) if catalog else None
     } for k, v in use_cases.items()}
 
+def etag_for(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def not_modified(req, etag: str, last_modified: float) -> bool:
+    """Check the request's conditional headers against an ETag and modification time."""
+    if_none_match = req.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = req.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def cached_response(req, body: bytes, etag: str, last_modified: float, media_type: str,
+                    cache_control: str = "no-cache") -> Response:
+    """Serve a pre-rendered body, answering 304 when the client's copy is current."""
+    headers = {"ETag": etag, "Last-Modified": formatdate(last_modified, usegmt=True), "Cache-Control": cache_control}
+    if not_modified(req, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
+
+def compress_body(body: bytes) -> dict:
+    """Pre-compress a body once so every request can be served from memory."""
+    etag = etag_for(body)
+    encoded = {"identity": (body, etag), "gzip": (gzip.compress(body, 9, mtime=0), etag[:-1] + '-gz"')}
+    if brotli is not None:
+        encoded["br"] = (brotli.compress(body, quality=11), etag[:-1] + '-br"')
+    return encoded
+
+def accepted_encodings(req) -> set:
+    """Content codings the client accepts (ignores those with q=0)."""
+    accepted = set()
+    for part in req.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.lower())
+    return accepted
+
+def encoded_response(req, encoded: dict, last_modified: float, media_type: str, cache_control: str) -> Response:
+    """Serve the best pre-compressed representation the client accepts."""
+    accepted = accepted_encodings(req)
+    coding = next((c for c in ("br", "gzip") if c in encoded and c in accepted), "identity")
+    body, etag = encoded[coding]
+    resp = cached_response(req, body, etag, last_modified, media_type, cache_control)
+    resp.headers["Vary"] = "Accept-Encoding"
+    if coding != "identity" and resp.status_code == 200:
+        resp.headers["Content-Encoding"] = coding
+    return resp
+
+def catalog_payload():
+    """Get the pre-compressed JSON catalog for the current version."""
+    version, models = get_catalog_snapshot()
+    payload = _catalog_cache.get(version)
+    if payload is None:
+        body = json.dumps(serialize_models(models), separators=(",", ":")).encode()
+        payload = compress_body(body)
+        _catalog_cache.clear()
+        _catalog_cache[version] = payload
+    return version, payload
+
+def models_url(version: str) -> str:
+    return f"/api/models.{version}.json"
+
+def provider_slug(provider: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", provider.lower()).strip("-")
+
+def shard_url(version: str, provider: str) -> str:
+    return f"/api/models/{version}/{provider_slug(provider)}.json"
+
+def shard_payload(slug: str):
+    """Get the pre-compressed JSON models of one provider (by slug) for the current version, or None."""
+    global _shard_cache
+    catalog = get_catalog()
+    key = (catalog.version, slug)
+    cache = _shard_cache
+    payload = cache.get(key)
+    if payload is None:
+        provider = next((p for p in catalog.providers if provider_slug(p) == slug), None)
+        if provider is None:
+            return catalog.version, None
+        shard = {model_id: catalog.models[model_id] for model_id in catalog.provider_models[provider]}
+        payload = compress_body(json.dumps(serialize_models(shard), separators=(",", ":")).encode())
+        _shard_cache = {**{k: v for k, v in cache.items() if k[0] == catalog.version}, key: payload}
+    return catalog.version, payload
+
+# Platform fit never changes at runtime, so the scale x complexity matrix is encoded once
+_recommendations_payload = None
+
+@app.get("/api/platforms/recommendations")
+def recommendations_json(req):
+    """Recommended platform keys by scale, then complexity, then category."""
+    global _recommendations_payload
+    if _recommendations_payload is None:
+        body = json.dumps(get_recommendation_matrix(), separators=(",", ":")).encode()
+        _recommendations_payload = compress_body(body)
+    return encoded_response(req, _recommendations_payload, _started_at, "application/json", "no-cache")
+
+def carry_over_shards(diff):
+    """Keep the encoded shards of providers a catalog change did not touch, under the new version."""
+    global _shard_cache
+    touched = {provider_slug(p) for p in diff.providers}
+    _shard_cache = {(diff.new_version, slug): payload for (version, slug), payload in _shard_cache.items()
+                    if version == diff.old_version and slug not in touched}
+
+add_catalog_listener(carry_over_shards)
+add_catalog_listener(record_prices)
+add_catalog_listener(reevaluate_scenarios)
+
+@app.get("/api/models.json")
+def models_json(req):
+    _, payload = catalog_payload()
+    return encoded_response(req, payload, get_catalog_updated_at(), "application/json", "no-cache")
+
+@app.get("/api/models.{version}.json")
+def models_json_versioned(req, version: str):
+    current, payload = catalog_payload()
+    # Versioned URLs never change content; old versions point at the latest catalog
+    if version != current:
+        return RedirectResponse("/api/models.json", status_code=302)
+    return encoded_response(req, payload, get_catalog_updated_at(), "application/json", IMMUTABLE)
+
+SEARCH_MAX_LIMIT = 50
+
+@app.get("/api/models/search")
+def search_models_api(req):
+    """Typo-tolerant model search by id, name or provider. Query: q, limit, provider."""
+    params = req.query_params
+    try:
+        limit = int(params.get("limit", SEARCH_LIMIT))
+    except ValueError:
+        return api_error("limit must be a number")
+    if not 0 < limit <= SEARCH_MAX_LIMIT:
+        return api_error(f"limit must be between 1 and {SEARCH_MAX_LIMIT}")
+    catalog = get_catalog()
+    rows = None
+    provider = params.get("provider")
+    if provider is not None:
+        rows = [catalog.position(m) for m in catalog.provider_models.get(provider, [])]
+    matches = get_search_index(catalog).search(params.get("q", ""), limit, rows)
+    return {"catalog_version": catalog.version, "results": [
+        {"id": catalog.ids[r], "name": catalog.names[r], "provider": catalog.provider(r), "score": round(score, 3)}
+        for r, score in matches]}
+
+@app.get("/api/models/{version}/{slug}.json")
+def provider_models_json(req, version: str, slug: str):
+    """One provider's models; the page loads these on demand instead of the whole catalog."""
+    current, payload = shard_payload(slug)
+    if payload is None:
+        return JSONResponse({"error": f"Unknown provider: {slug}"}, status_code=404)
+    if version != current:
+        return RedirectResponse(f"/api/models/{current}/{slug}.json", status_code=302)
+    return encoded_response(req, payload, get_catalog_updated_at(), "application/json", IMMUTABLE)
+
+def api_error(message: str, status_code: int = 400) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status_code)
+
+async def json_body(req) -> dict:
+    """Parse a JSON object request body. Raises ValueError if it is not one."""
+    try:
+        data = await req.json()
+    except ValueError:
+        raise ValueError("Request body must be JSON") from None
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    return data
+
+@app.post("/api/calculate")
+async def calculate_api(req):
+    """Cost breakdown for one model: {"model": id, ...scenario fields}."""
+    try:
+        data = await json_body(req)
+        model_id = data.pop("model", None)
+        if not isinstance(model_id, str):
+            raise ValueError("model must be a model id")
+        scenario = scenario_from_dict(data)
+    except ValueError as e:
+        return api_error(str(e))
+    version, models = get_catalog_snapshot()
+    if model_id not in models:
+        return api_error(f"Unknown model: {model_id}", 404)
+    return {"model": model_id, "catalog_version": version, "scenario": asdict(scenario),
+            **asdict(calculate(models[model_id], scenario))}
+
+BULK_BATCH_SIZE = 1024  # Scenario lines evaluated per vectorized batch
+BULK_MAX_LINE = 65536  # Longest accepted input line, in bytes
+
+async def ndjson_lines(req):
+    """Yield (line_number, bytes) for each non-blank line of a streamed request body."""
+    buffer = b""
+    number = 0
+    async for chunk in req.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+        if len(buffer) > BULK_MAX_LINE:
+            raise ValueError(f"Line {number + 1} is longer than {BULK_MAX_LINE} bytes")
+    if buffer.strip():
+        yield number + 1, buffer
+
+def parse_bulk_line(catalog, line: bytes) -> tuple:
+    """(model_id, row, scenario, error) for one input line; error is None when the line is valid."""
+    try:
+        data = json.loads(line)
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object")
+        model_id = data.pop("model", None)
+        scenario = scenario_from_dict(data)
+    except ValueError as e:
+        return None, None, None, str(e)
+    row = catalog.position(model_id) if isinstance(model_id, str) else None
+    if row is None:
+        return model_id, None, None, f"Unknown model: {model_id}"
+    return model_id, row, scenario, None
+
+def bulk_results(catalog, batch: list) -> bytes:
+    """Evaluate a batch of (line, model_id, row, scenario, error) entries into NDJSON."""
+    valid = [entry for entry in batch if entry[4] is None]
+    columns = evaluate_batch(catalog, [e[2] for e in valid], [e[3] for e in valid]) if valid else {}
+    names = list(columns)
+    breakdowns = zip(*(column.tolist() for column in columns.values()))
+    out = []
+    for line, model_id, row, scenario, error in batch:
+        if error is not None:
+            out.append(json.dumps({"line": line, "error": error}))
+        else:
+            out.append(json.dumps({"line": line, "model": model_id, **dict(zip(names, next(breakdowns)))}))
+    return ("\n".join(out) + "\n").encode()
+
+@app.post("/api/calculate/bulk")
+async def calculate_bulk_api(req):
+    """Cost breakdowns for newline-delimited {"model": id, ...scenario} objects, streamed back as NDJSON.
+
+    Input is read only as fast as results are sent, in batches of
+    BULK_BATCH_SIZE lines, so memory use does not grow with the input. Every
+    line is priced against the same catalog version (X-Catalog-Version).
+    """
+    catalog = get_catalog()
+
+    async def results():
+        batch = []
+        try:
+            async for number, line in ndjson_lines(req):
+                batch.append((number, *parse_bulk_line(catalog, line)))
+                if len(batch) >= BULK_BATCH_SIZE:
+                    yield bulk_results(catalog, batch)
+                    batch = []
+        except ValueError as e:
+            batch.append((None, None, None, None, str(e)))
+        if batch:
+            yield bulk_results(catalog, batch)
+
+    return StreamingResponse(results(), media_type="application/x-ndjson",
+                             headers={"X-Catalog-Version": catalog.version, "Cache-Control": "no-store"})
+
+def sweep_body(catalog, data: dict, select: dict, npz: bool) -> bytes:
+    """Run a sweep and encode the result, as .npz or as JSON up to SWEEP_MAX_JSON_CELLS values."""
+    result = sweep_from_dict(catalog, data).select(**select)
+    if npz:
+        return result.to_npz(catalog_version=catalog.version)
+    if result.values.size > SWEEP_MAX_JSON_CELLS:
+        raise ValueError(f"Sweep result has {result.values.size:,} values, the JSON limit is {SWEEP_MAX_JSON_CELLS:,}; "
+                         "request it with Accept: application/x-npz or narrow it with select")
+    return json.dumps({"catalog_version": catalog.version, **result.to_dict()}, separators=(",", ":")).encode()
+
+@app.post("/api/sweep")
+async def sweep_api(req):
+    """Metric for every model over a grid of scenarios, optionally sliced with {"select": {dim: value}}.
+
+    Sends an .npz instead of JSON when the client accepts application/x-npz.
+    """
+    npz = "application/x-npz" in req.headers.get("accept", "")
+    try:
+        data = await json_body(req)
+        select = data.pop("select", None) or {}
+        if not isinstance(select, dict):
+            raise ValueError("select must be an object")
+        catalog = get_catalog()
+        # Large grids take seconds to evaluate and encode; keep the event loop free meanwhile
+        body = await asyncio.to_thread(sweep_body, catalog, data, select, npz)
+    except (TypeError, ValueError) as e:
+        return api_error(str(e))
+    return Response(body, media_type="application/x-npz" if npz else "application/json")
+
+@app.post("/api/simulate")
+async def simulate_api(req):
+    """Monthly cost P50/P90/P99 per model with distributions for the scenario inputs (see simulate.py)."""
+    try:
+        data = await json_body(req)
+        catalog = get_catalog()
+        # Large runs take seconds across the worker pool; keep the event loop free meanwhile
+        result = await asyncio.to_thread(simulate_from_dict, catalog, data)
+    except (TypeError, ValueError) as e:
+        return api_error(str(e))
+    return {"catalog_version": catalog.version, **result}
+
+def crossover_response(table, params: dict) -> dict:
+    """Filter a crossover table by the shared query fields: involving, low, high and limit."""
+    unknown = set(params) - {"involving", "low", "high", "limit"}
+    if unknown:
+        raise ValueError(f"Unknown query fields: {', '.join(sorted(unknown))}")
+    try:
+        limit = int(params.get("limit", CROSSOVER_LIMIT))
+        low, high = float(params.get("low", "-inf")), float(params.get("high", "inf"))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("low, high and limit must be numbers") from None
+    if limit < 0:
+        raise ValueError("limit must not be negative")
+    table = table.query(params.get("involving"), low, high)
+    return {"variable": table.variable, "count": len(table), "crossovers": table.rows(limit)}
+
+@app.get("/api/breakeven/platforms")
+def platform_breakeven_api(req):
+    """Monthly request volumes where platforms in the same category overtake each other.
+
+    Query: platforms (comma-separated keys), involving, low, high, limit.
+    """
+    params = dict(req.query_params)
+    try:
+        keys = params.pop("platforms", None)
+        table = platform_crossovers(tuple(sorted(set(keys.split(",")))) if keys else None)
+        return crossover_response(table, params)
+    except ValueError as e:
+        return api_error(str(e))
+
+@app.post("/api/breakeven/models")
+async def model_breakeven_api(req):
+    """Cache hit rates where models overtake each other for a scenario.
+
+    Body: scenario fields plus models (ids) or providers, cross_provider, involving, low, high and limit.
+    """
+    try:
+        data = await json_body(req)
+        query = {k: data.pop(k) for k in ("involving", "low", "high", "limit") if k in data}
+        selection = {k: data.pop(k) for k in ("models", "providers", "cross_provider") if k in data}
+        scenario = scenario_from_dict(data)
+        catalog = get_catalog()
+        table = cache_hit_crossovers(catalog, scenario, **selection)
+        return {"catalog_version": catalog.version, **crossover_response(table, query)}
+    except (TypeError, ValueError) as e:
+        return api_error(str(e))
+
+COMPARE_MAX_K = 100
+
+def comparison_row(catalog, row: int, per_request, monthly) -> dict:
+    return {"id": catalog.ids[row], "name": catalog.names[row], "provider": catalog.provider(row),
+            "cost_per_request": float(per_request[row]), "monthly_cost": float(monthly[row]),
+            "price_input": float(catalog.price_input[row]), "price_output": float(catalog.price_output[row]),
+            "context_window": int(catalog.context_window[row])}
+
+@app.post("/api/compare")
+async def compare_api(req):
+    """The k cheapest models per request for a scenario, plus the rank of {"model": id} if given.
+
+    Ranking by per-request cost keeps the order independent of request volume,
+    so clients can rescale monthly costs without asking again.
+    """
+    try:
+        data = await json_body(req)
+        model_id = data.pop("model", None)
+        if model_id is not None and not isinstance(model_id, str):
+            raise ValueError("model must be a model id")
+        try:
+            k = int(data.pop("k", 10))
+        except (TypeError, ValueError):
+            raise ValueError("k must be an integer") from None
+        if not 0 < k <= COMPARE_MAX_K:
+            raise ValueError(f"k must be between 1 and {COMPARE_MAX_K}")
+        scenario = scenario_from_dict(data)
+    except (TypeError, ValueError) as e:
+        return api_error(str(e))
+    catalog = get_catalog()
+    per_request, monthly = scenario_costs(catalog, scenario)
+    current = None
+    row = catalog.position(model_id) if model_id is not None else None
+    if row is not None:
+        current = {**comparison_row(catalog, row, per_request, monthly), "rank": cost_rank(per_request, row)}
+    return {
+        "catalog_version": catalog.version,
+        "count": len(catalog),
+        "monthly_requests": scenario.monthly_requests,
+        "top": [comparison_row(catalog, r, per_request, monthly) for r in cheapest(per_request, k)],
+        "current": current,
+    }
+
+@app.post("/api/pareto")
+async def pareto_api(req):
+    """Models no other model beats on per-request cost, context window and max output at once, cheapest first.
+
+    Body: scenario fields, plus {"model": id} to list the frontier models that dominate it.
+    """
+    try:
+        data = await json_body(req)
+        model_id = data.pop("model", None)
+        if model_id is not None and not isinstance(model_id, str):
+            raise ValueError("model must be a model id")
+        scenario = scenario_from_dict(data)
+    except (TypeError, ValueError) as e:
+        return api_error(str(e))
+    catalog = get_catalog()
+    frontier, per_request, monthly = get_frontier(catalog, scenario)
+
+    def frontier_row(row: int) -> dict:
+        return {**comparison_row(catalog, row, per_request, monthly), "max_output": int(catalog.max_output[row])}
+
+    current = None
+    row = catalog.position(model_id) if model_id is not None else None
+    if row is not None:
+        current = {**frontier_row(row),
+                   "dominated_by": [catalog.ids[r] for r in dominated_by(catalog, per_request, frontier, row)]}
+    return {
+        "catalog_version": catalog.version,
+        "count": len(catalog),
+        "monthly_requests": scenario.monthly_requests,
+        "frontier": [frontier_row(r) for r in frontier],
+        "current": current,
+    }
+
+@app.post("/api/optimize")
+async def optimize_api(req):
+    """The cheapest full stacks (model plus one platform per category) for a scenario.
+
+    Body: scenario fields, k (stacks to return) and constraints (see optimizer.constraints_from_dict).
+    """
+    try:
+        data = await json_body(req)
+        catalog = get_catalog()
+        result = optimize_from_dict(catalog, data)
+    except (TypeError, ValueError) as e:
+        return api_error(str(e))
+    return {"catalog_version": catalog.version, "stacks": [s.to_dict() for s in result.stacks],
+            "unfilled": result.unfilled, "explored": result.explored}
+
+@app.get("/api/catalog/diff")
+def catalog_diff_api(req):
+    """Models added, removed, repriced or otherwise changed since a recent catalog version.
+
+    Query: since (a catalog_version). Clients reload only the provider shards
+    listed in shards; an unknown or expired version means reloading everything.
+    """
+    since = req.query_params.get("since", "")
+    diff = get_catalog_diff(since)
+    if diff is None:
+        return api_error(f"Unknown or expired catalog version: {since}", status_code=404)
+    current = get_catalog().provider_models
+    return {**diff.to_dict(), "shards": {p: shard_url(diff.new_version, p) for p in diff.providers if p in current}}
+
+def epoch_field(params, name: str, default: float = None) -> float:
+    """A time in epoch seconds from query or body fields; required unless a default is given."""
+    if name not in params:
+        if default is None:
+            raise ValueError(f"{name} is required (epoch seconds)")
+        return default
+    try:
+        if isinstance(params[name], bool):
+            raise TypeError
+        value = float(params[name])
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"{name} must be epoch seconds") from None
+    # float() takes "nan" and "inf", which JSON cannot carry back
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be epoch seconds")
+    return value
+
+def int_field(params, name: str, default: int) -> int:
+    """An integer from query or body fields, or the default if absent."""
+    try:
+        return int(params.get(name, default))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"{name} must be an integer") from None
+
+@app.get("/api/history/prices")
+def history_prices_api(req):
+    """Prices in effect at a time. Query: at (epoch seconds), models (comma-separated, default all)."""
+    params = req.query_params
+    try:
+        at = epoch_field(params, "at")
+    except ValueError as e:
+        return api_error(str(e))
+    models = params.get("models")
+    prices = get_history().as_of(at, models.split(",") if models else None)
+    return {"at": at, "prices": {m: {"price_input": i, "price_output": o} for m, (i, o) in prices.items()}}
+
+@app.get("/api/history/series")
+def history_series_api(req):
+    """Price changes of a few models (see history.HISTORY_MAX_SERIES). Query: models (comma-separated), start, end."""
+    params = req.query_params
+    try:
+        models = [m for m in params.get("models", "").split(",") if m]
+        if not models:
+            raise ValueError("models is required")
+        return get_history().series(models, epoch_field(params, "start", -math.inf), epoch_field(params, "end", math.inf))
+    except ValueError as e:
+        return api_error(str(e))
+
+@app.post("/api/history/reprice")
+async def history_reprice_api(req):
+    """What a scenario's traffic cost over [start, end) at the prices in effect then, cheapest first.
+
+    Body: scenario fields plus start and end (epoch seconds), optional models and limit (default 20).
+    """
+    try:
+        data = await json_body(req)
+        start, end = epoch_field(data, "start"), epoch_field(data, "end")
+        del data["start"], data["end"]
+        limit = int_field(data, "limit", 20)
+        data.pop("limit", None)
+        models = data.pop("models", None)
+        if models is not None and (not isinstance(models, list) or not all(isinstance(m, str) for m in models)):
+            raise ValueError("models must be a list of model ids")
+        scenario = scenario_from_dict(data)
+        costs = await asyncio.to_thread(get_history().reprice, scenario, start, end)
+    except (TypeError, ValueError) as e:
+        return api_error(str(e))
+    if models is not None:
+        costs = {m: costs[m] for m in models if m in costs}
+    ranked = sorted(costs.items(), key=lambda item: item[1]["cost"])
+    return {"start": start, "end": end, "monthly_requests": scenario.monthly_requests, "count": len(ranked),
+            "models": [{"id": m, **c} for m, c in ranked[:max(limit, 0)]]}
+
+def scenario_payload(row: dict) -> dict:
+    """A stored scenario with its model's provider and name from the current catalog (None once it is gone)."""
+    catalog = get_catalog()
+    pos = catalog.position(row["model"])
+    return {**row, "provider": catalog.provider(pos) if pos is not None else None,
+            "model_name": catalog.names[pos] if pos is not None else None}
+
+def id_field(params, name: str) -> int:
+    """A scenario id from query fields, or None if absent."""
+    if name not in params:
+        return None
+    try:
+        value = int(params[name])
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a scenario id") from None
+    if not 0 <= value <= SCENARIO_MAX_ID:
+        raise ValueError(f"{name} must be a scenario id")
+    return value
+
+@app.post("/api/scenarios")
+async def create_scenario_api(req):
+    """Save a scenario. Body: owner, model, optional name and tags, plus scenario fields."""
+    try:
+        row = await asyncio.to_thread(get_store().create, await json_body(req))
+    except ValueError as e:
+        return api_error(str(e))
+    return JSONResponse(scenario_payload(row), status_code=201)
+
+@app.get("/api/scenarios")
+def list_scenarios_api(req):
+    """Saved scenarios, newest first. Query: owner, model, tag, limit (default 50), before (the previous page's next)."""
+    params = req.query_params
+    try:
+        page = get_store().list(params.get("owner"), params.get("model"), params.get("tag"),
+                                int_field(params, "limit", 50), id_field(params, "before"))
+    except ValueError as e:
+        return api_error(str(e))
+    return {"scenarios": [scenario_payload(r) for r in page["scenarios"]], "next": page["next"]}
+
+@app.delete("/api/scenarios")
+def clear_scenarios_api(req):
+    """Delete all of an owner's scenarios. Query: owner."""
+    owner = req.query_params.get("owner")
+    if not owner:
+        return api_error("owner is required")
+    return {"deleted": get_store().delete_owner(owner)}
+
+@app.get("/api/scenarios/delta")
+def scenario_delta_api(req):
+    """Saved scenarios against a baseline, in save order. Query: owner, tag, baseline (default the first), limit."""
+    params = req.query_params
+    try:
+        delta = get_store().delta(params.get("owner"), params.get("tag"), id_field(params, "baseline"),
+                                  int_field(params, "limit", 100))
+    except ValueError as e:
+        return api_error(str(e))
+    if delta is None:
+        return {"baseline": None, "count": 0, "scenarios": [], "cheapest": None, "most_expensive": None}
+    return {**delta, **{k: scenario_payload(delta[k]) if delta[k] else None
+                        for k in ("baseline", "cheapest", "most_expensive")},
+            "scenarios": [scenario_payload(r) for r in delta["scenarios"]]}
+
+@app.get("/api/scenarios/{scenario_id:int}")
+def get_scenario_api(req, scenario_id: int):
+    row = get_store().get(scenario_id)
+    if row is None:
+        return api_error(f"Unknown scenario: {scenario_id}", status_code=404)
+    return scenario_payload(row)
+
+@app.put("/api/scenarios/{scenario_id:int}")
+async def update_scenario_api(req, scenario_id: int):
+    """Change a saved scenario. Body: any of name, tags, model and scenario fields."""
+    try:
+        row = await asyncio.to_thread(get_store().update, scenario_id, await json_body(req))
+    except ValueError as e:
+        return api_error(str(e))
+    if row is None:
+        return api_error(f"Unknown scenario: {scenario_id}", status_code=404)
+    return scenario_payload(row)
+
+@app.delete("/api/scenarios/{scenario_id:int}")
+def delete_scenario_api(req, scenario_id: int):
+    if not get_store().delete(scenario_id):
+        return api_error(f"Unknown scenario: {scenario_id}", status_code=404)
+    return {"deleted": 1}
+
+@app.get("/api/status")
+def status():
+    report = get_merge_report()
+    version, models = get_catalog_snapshot()
+    return {
+        "catalog_version": version,
+        "model_count": len(models),
+        "updated_at": get_catalog_updated_at(),
+        "merge": asdict(report) if report else None,
+        "refresh": get_refresh_metrics(),
+    }
+
 @app.get("/")
-def get():
-    models = get_models()
-    providers = sorted(set(m.provider for m in models.values()))
+def get(req):
+    catalog = get_catalog()
+    version = catalog.version
+    page = _index_cache.get(version)
+    if page is None:
+        # Only the latest catalog version is worth keeping
+        body = to_xml(index_page(catalog)).encode()
+        page = (body, etag_for(body), max(get_catalog_updated_at(), _started_at))
+        _index_cache.clear()
+        _index_cache[version] = page
+    body, etag, last_modified = page
+    return cached_response(req, body, etag, last_modified, "text/html; charset=utf-8")
+
+def index_page(catalog):
+    models = catalog.models
+    providers = catalog.providers
+    # The page loads one provider's models at a time, starting with the first (selected) one
+    shards = {p: {"url": shard_url(catalog.version, p), "count": len(catalog.provider_models[p])} for p in providers}
     all_platforms = get_all_platforms()
     use_cases = get_use_case_templates()
 
     return Html(
         Head(
             Meta(name="viewport", content="width=device-width, initial-scale=1"),
+            *([Link(rel="preload", href=shards[providers[0]]["url"], **{"as": "fetch"}, crossorigin="anonymous")]
+              if providers else []),
             Style(get_common_styles())
         ),
         Body(
@@ -187,6 +877,7 @@ def get():
                         A("Templates", href="#use-cases"),
                         A("Platforms", href="#platforms"),
                         A("Comparison", href="#comparison"),
+                        A("Frontier", href="#frontier"),
                         cls="nav"
                     ),
                     cls="header-content"
@@ -258,6 +949,13 @@ def get():
                         Div(style="border-top: 1px solid #e5e7eb; margin: 20px 0;"),
 
                         # Model Selection
+                        Div(
+                            Label("Find a Model"),
+                            Input(type="search", id="model-search", placeholder="e.g. sonnet, gemini flash", autocomplete="off",
+                                  oninput="searchModels()", onkeydown="searchKeydown(event)", onblur="hideSearchResults()"),
+                            Div(id="model-search-results", cls="search-results hidden"),
+                            cls="form-group search-box"
+                        ),
                         Div(
                             Label("LLM Provider"),
                             Select(
@@ -279,13 +977,13 @@ def get():
                         # Token Configuration
                         Div(
                             Label("Input Tokens per Request"),
-                            Input(type="number", id="input-tokens", value="1000", min="1", oninput="recalculateAll()"),
+                            Input(type="number", id="input-tokens", value="1000", min="1", oninput="scheduleRecalculate()"),
                             Span(id="input-info", cls="info-text"),
                             cls="form-group"
                         ),
                         Div(
                             Label("Output Tokens per Request"),
-                            Input(type="number", id="output-tokens", value="500", min="1", oninput="recalculateAll()"),
+                            Input(type="number", id="output-tokens", value="500", min="1", oninput="scheduleRecalculate()"),
                             Span(id="output-info", cls="info-text"),
                             cls="form-group"
                         ),
@@ -295,23 +993,23 @@ def get():
                         # Volume Configuration
                         Div(
                             Label("Daily Active Users"),
-                            Input(type="number", id="daily-users", value="100", min="1", oninput="recalculateAll()"),
+                            Input(type="number", id="daily-users", value="100", min="1", oninput="scheduleRecalculate()"),
                             cls="form-group"
                         ),
                         Div(
                             Label("Requests per User per Day"),
-                            Input(type="number", id="requests-per-user", value="10", min="1", oninput="recalculateAll()"),
+                            Input(type="number", id="requests-per-user", value="10", min="1", oninput="scheduleRecalculate()"),
                             cls="form-group"
                         ),
                         Div(
                             Label("Agent Iterations per Request"),
-                            Input(type="number", id="iterations", value="1", min="1", oninput="recalculateAll()"),
+                            Input(type="number", id="iterations", value="1", min="1", oninput="scheduleRecalculate()"),
                             Span("For multi-step agents, enter average iterations", cls="info-text"),
                             cls="form-group"
                         ),
                         Div(
                             Label("Expected Cache Hit Rate (%)"),
-                            Input(type="range", id="cache-hit-rate", value="0", min="0", max="100", step="5", oninput="updateCacheDisplay(); recalculateAll()", style="width: 100%;"),
+                            Input(type="range", id="cache-hit-rate", value="0", min="0", max="100", step="5", oninput="updateCacheDisplay(); scheduleRecalculate()", style="width: 100%;"),
                             Div(
                                 Span(id="cache-display", style="font-weight: 500; color: #2563eb;"),
                                 Span(" of input tokens served from cache", style="color: #64748b; font-size: 0.85em;"),
@@ -360,6 +1058,12 @@ def get():
                         # Saved Scenarios for Comparison
                         Div(
                             H2("Saved Scenarios"),
+                            Div(
+                                Label("Saved As"),
+                                Input(type="text", id="scenario-owner", placeholder="Your name or team", autocomplete="off",
+                                      onchange="setScenarioOwner(this.value)"),
+                                cls="form-group"
+                            ),
                             Div(id="saved-scenarios", children=P("No scenarios saved yet. Save configurations to compare.", style="color: #6b7280; font-size: 0.9em;")),
                             Div(
                                 Button("Clear All", cls="btn btn-secondary", onclick="clearScenarios()"),
@@ -395,6 +1099,7 @@ def get():
                         cls="section-tabs"
                     ),
 
+                    Div(id="optimized-stack"),
                     Div(id="platform-recommendations"),
 
                     cls="card", style="margin-top: 25px;"
@@ -408,6 +1113,14 @@ def get():
                     cls="card", style="margin-top: 25px;"
                 ),
 
+                # Pareto Frontier
+                Div(
+                    H2("Efficient Frontier", id="frontier"),
+                    P("Models no other model beats on cost, context window and max output at once", style="color: #6b7280; margin-top: -10px;"),
+                    Div(id="model-frontier"),
+                    cls="card", style="margin-top: 25px;"
+                ),
+
                 # Delta Comparison Modal (hidden by default)
                 Div(
                     Div(
@@ -426,54 +1139,165 @@ def get():
 
             # JavaScript
             Script("""
-                const models = """ + json.dumps(serialize_models(models)) + """;
+                const providerShards = """ + json.dumps(shards) + """;
+                const catalogSize = """ + json.dumps(len(catalog)) + """;
+                let models = {};  // Models of the providers loaded so far
                 const providers = """ + json.dumps(providers) + """;
+                const tierIndex = """ + json.dumps(get_tier_index()) + """;
                 const platforms = """ + json.dumps(serialize_platforms(all_platforms)) + """;
-                const useCases = """ + json.dumps(serialize_use_cases(use_cases)) + """;
+                // Recommended platform keys by scale, complexity and category (see platforms.py)
+                const recommendations = """ + json.dumps(get_recommendation_matrix()) + """;
+                const useCases = """ + json.dumps(serialize_use_cases(use_cases, catalog)) + """;
                 
                 let savedScenarios = [];
                 let currentPlatformTab = 'agent_frameworks';
                 
+                const shardRequests = {};
+                
+                function loadProvider(provider) {
+                    // Each provider's models are fetched the first time it is shown, then reused
+                    if (!shardRequests[provider]) {
+                        const shard = providerShards[provider];
+                        shardRequests[provider] = !shard ? Promise.resolve({}) : fetch(shard.url)
+                            .then(resp => {
+                                if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+                                return resp.json();
+                            })
+                            .then(shardModels => {
+                                Object.assign(models, shardModels);
+                                return shardModels;
+                            })
+                            .catch(e => {
+                                console.error(`Failed to load ${provider} models`, e);
+                                delete shardRequests[provider];  // Retry on the next switch
+                                return {};
+                            });
+                    }
+                    return shardRequests[provider];
+                }
+                
                 // Initialize
-                function init() {
-                    const modelCount = Object.keys(models).length;
+                async function init() {
                     const providerCount = providers.length;
-                    console.log(`Loaded ${modelCount} models from ${providerCount} providers`);
+                    console.log(`Catalog has ${catalogSize} models from ${providerCount} providers`);
                     
                     // Update model count badge in header
                     const badge = document.getElementById('model-count-badge');
                     if (badge) {
-                        badge.textContent = `${modelCount} models from ${providerCount} providers (live pricing)`;
+                        badge.textContent = `${catalogSize} models from ${providerCount} providers (live pricing)`;
                     }
                     
-                    if (modelCount === 0) {
+                    if (catalogSize === 0) {
                         document.getElementById('model-info').textContent = 'No models loaded - check API connection';
                     }
                     
                     // Initialize cache display
                     updateCacheDisplay();
                     
-                    updateModels();
                     renderUseCaseTemplates();
+                    await updateModels();
                     updateRecommendations();
-                    generateModelComparison();
+                    initScenarioOwner();
                 }
                 
-                function updateModels() {
+                async function updateModels() {
                     const provider = document.getElementById('provider-select').value;
+                    const shardModels = await loadProvider(provider);
+                    // Another provider may have been picked while this one loaded
+                    if (document.getElementById('provider-select').value !== provider) return;
                     const modelSelect = document.getElementById('model-select');
                     modelSelect.innerHTML = '';
-                    Object.entries(models).forEach(([id, model]) => {
-                        if (model.provider === provider) {
-                            const opt = document.createElement('option');
-                            opt.value = id;
-                            opt.textContent = model.name;
-                            modelSelect.appendChild(opt);
-                        }
+                    Object.entries(shardModels).forEach(([id, model]) => {
+                        const opt = document.createElement('option');
+                        opt.value = id;
+                        opt.textContent = model.name;
+                        modelSelect.appendChild(opt);
                     });
                     updateModelSpecs();
                 }
                 
+                const SEARCH_DELAY_MS = 80;
+                const searchCache = new Map();  // query -> results, for this catalog version
+                let searchTimer = null;
+                let searchRequest = null;
+                let searchResults = [];
+                let searchActive = -1;
+                
+                function searchModels() {
+                    // Debounced type-ahead; the server keeps a trigram index of the whole catalog
+                    clearTimeout(searchTimer);
+                    searchTimer = setTimeout(runModelSearch, SEARCH_DELAY_MS);
+                }
+                
+                async function runModelSearch() {
+                    const query = document.getElementById('model-search').value.trim();
+                    if (!query) return renderSearchResults([]);
+                    let results = searchCache.get(query);
+                    if (!results) {
+                        if (searchRequest) searchRequest.abort();
+                        searchRequest = new AbortController();
+                        try {
+                            const resp = await fetch('/api/models/search?' + new URLSearchParams({ q: query, limit: 8 }),
+                                                     { signal: searchRequest.signal });
+                            if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+                            results = (await resp.json()).results;
+                        } catch (e) {
+                            if (e.name !== 'AbortError') console.error('Model search failed', e);
+                            return;
+                        }
+                        if (searchCache.size > 200) searchCache.clear();
+                        searchCache.set(query, results);
+                    }
+                    // Ignore answers for queries the user has already typed past
+                    if (document.getElementById('model-search').value.trim() === query) renderSearchResults(results);
+                }
+                
+                function renderSearchResults(results) {
+                    searchResults = results;
+                    searchActive = results.length ? 0 : -1;
+                    const container = document.getElementById('model-search-results');
+                    const query = document.getElementById('model-search').value.trim();
+                    if (!query) {
+                        container.classList.add('hidden');
+                        return;
+                    }
+                    container.innerHTML = results.length ? results.map((r, i) => `
+                        <div class="search-result ${i === searchActive ? 'active' : ''}" onmousedown="event.preventDefault(); pickSearchResult(${i})">
+                            <span>${escapeHtml(r.name)}</span><span class="search-result-provider">${escapeHtml(r.provider)}</span>
+                        </div>`).join('') : '<div class="search-result" style="color: #6b7280;">No matching models</div>';
+                    container.classList.remove('hidden');
+                }
+                
+                function searchKeydown(e) {
+                    if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+                        if (!searchResults.length) return;
+                        e.preventDefault();
+                        searchActive = (searchActive + (e.key === 'ArrowDown' ? 1 : -1) + searchResults.length) % searchResults.length;
+                        document.querySelectorAll('#model-search-results .search-result')
+                            .forEach((el, i) => el.classList.toggle('active', i === searchActive));
+                    } else if (e.key === 'Enter' && searchActive >= 0) {
+                        e.preventDefault();
+                        pickSearchResult(searchActive);
+                    } else if (e.key === 'Escape') {
+                        hideSearchResults();
+                    }
+                }
+                
+                function hideSearchResults() {
+                    document.getElementById('model-search-results').classList.add('hidden');
+                }
+                
+                async function pickSearchResult(i) {
+                    const result = searchResults[i];
+                    if (!result) return;
+                    hideSearchResults();
+                    document.getElementById('model-search').value = '';
+                    document.getElementById('provider-select').value = result.provider;
+                    await updateModels();
+                    document.getElementById('model-select').value = result.id;
+                    updateModelSpecs();
+                }
+                
                 function updateModelSpecs() {
                     const modelId = document.getElementById('model-select').value;
                     if (!modelId || !models[modelId]) return;
@@ -486,10 +1310,10 @@ def get():
                     document.getElementById('output-info').textContent = `Max: ${model.max_output.toLocaleString()} tokens`;
                     document.getElementById('model-info').textContent = `$${model.price_input}/1M in, $${model.price_output}/1M out`;
                     
-                    recalculateAll();
+                    recalculate();
                 }
                 
-                function applyUseCase() {
+                async function applyUseCase() {
                     const ucId = document.getElementById('use-case-select').value;
                     const infoPanel = document.getElementById('use-case-info');
                     
@@ -538,42 +1362,20 @@ def get():
                     if (recommendedModels.length > 0) {
                         const bestModel = recommendedModels[0];
                         document.getElementById('provider-select').value = bestModel.provider;
-                        updateModels();
+                        await updateModels();
                         document.getElementById('model-select').value = bestModel.id;
                         updateModelSpecs();
                     } else {
-                        recalculateAll();
+                        recalculate();
                     }
                     
                     updateRecommendations();
                 }
                 
                 function getRecommendedModelsForTier(tier) {
-                    // Get all models sorted by cost
-                    const modelList = Object.entries(models).map(([id, m]) => ({
-                        id,
-                        ...m,
-                        totalCost: m.price_input + m.price_output
-                    })).filter(m => m.totalCost > 0).sort((a, b) => a.totalCost - b.totalCost);
-                    
-                    if (modelList.length === 0) return [];
-                    
-                    // Divide into tiers based on percentiles
-                    const tierSize = Math.ceil(modelList.length / 3);
-                    
-                    switch (tier) {
-                        case 'budget':
-                            // Cheapest third
-                            return modelList.slice(0, tierSize);
-                        case 'balanced':
-                            // Middle third
-                            return modelList.slice(tierSize, tierSize * 2);
-                        case 'premium':
-                            // Most expensive third
-                            return modelList.slice(tierSize * 2);
-                        default:
-                            return modelList.slice(0, tierSize);
-                    }
+                    // Tiers are computed on the server once per catalog version, cheapest first
+                    const entry = tierIndex.tiers[tier] || tierIndex.tiers.budget;
+                    return entry ? entry.models : [];
                 }
                 
                 function renderUseCaseTemplates() {
@@ -627,14 +1429,8 @@ def get():
                 }
                 
                 function calculateUseCaseCost(uc) {
-                    // Find cheapest model cost for this use case
-                    let minCost = Infinity;
-                    Object.values(models).forEach(m => {
-                        const cost = (uc.typical_input_tokens / 1000000) * m.price_input + 
-                                     (uc.typical_output_tokens / 1000000) * m.price_output;
-                        if (cost < minCost) minCost = cost;
-                    });
-                    return '$' + minCost.toFixed(4);
+                    // Cheapest model cost for this use case, computed on the server for the whole catalog
+                    return uc.cheapest_cost == null ? '—' : '$' + uc.cheapest_cost.toFixed(4);
                 }
                 
                 function selectUseCaseTemplate(ucId) {
@@ -644,17 +1440,85 @@ def get():
                     document.querySelector('.card').scrollIntoView({ behavior: 'smooth', block: 'start' });
                 }
                 
-                function calculate() {
-                    const modelId = document.getElementById('model-select').value;
-                    if (!modelId || !models[modelId]) return;
-                    
-                    const model = models[modelId];
-                    const inputTokens = parseInt(document.getElementById('input-tokens').value) || 0;
-                    const outputTokens = parseInt(document.getElementById('output-tokens').value) || 0;
-                    const dailyUsers = parseInt(document.getElementById('daily-users').value) || 0;
-                    const requestsPerUser = parseFloat(document.getElementById('requests-per-user').value) || 0;
-                    const iterations = parseInt(document.getElementById('iterations').value) || 1;
-                    const cacheHitRate = parseFloat(document.getElementById('cache-hit-rate').value) / 100 || 0;
+                // Calculator inputs, by the names the dependency graph below uses
+                const calcInputs = {
+                    model: 'model-select', inputTokens: 'input-tokens', outputTokens: 'output-tokens',
+                    dailyUsers: 'daily-users', requestsPerUser: 'requests-per-user', iterations: 'iterations',
+                    cacheHitRate: 'cache-hit-rate', scale: 'scale-select', complexity: 'complexity-select'
+                };
+                const perRequestInputs = ['model', 'inputTokens', 'outputTokens', 'iterations', 'cacheHitRate', 'scale', 'complexity'];
+                // Derived values in dependency order. A node reruns only when an input or node it
+                // depends on changed. Volume just rescales costs, so editing daily users or requests
+                // re-renders the comparison without ranking the catalog again.
+                const calcNodes = [
+                    { name: 'requestCost', deps: perRequestInputs, run: computeRequestCost },
+                    { name: 'volume', deps: ['dailyUsers', 'requestsPerUser'], run: computeVolume },
+                    { name: 'summary', deps: ['requestCost', 'volume', 'scale', 'complexity'], run: renderCalculation },
+                    { name: 'ranking', deps: perRequestInputs, run: fetchRanking },
+                    { name: 'comparison', deps: ['ranking', 'volume'], run: renderModelComparison },
+                    { name: 'frontier', deps: perRequestInputs, run: fetchFrontier },
+                    { name: 'frontierView', deps: ['frontier', 'volume'], run: renderFrontier },
+                    { name: 'stack', deps: [...perRequestInputs.filter(name => name !== 'model'), 'volume'], run: fetchStack },
+                    { name: 'stackView', deps: ['stack', 'summary'], run: renderStack }
+                ];
+                const RECALC_DELAY_MS = 150;
+                const calc = {};
+                let calcSnapshot = {};
+                let calcPending = new Set();
+                let calcGeneration = 0;
+                let recalcTimer = null;
+                
+                function readCalcInputs() {
+                    const values = {};
+                    Object.entries(calcInputs).forEach(([name, id]) => values[name] = document.getElementById(id).value);
+                    return values;
+                }
+                
+                function scheduleRecalculate() {
+                    // Debounce typing; only the last keystroke in a burst recalculates
+                    clearTimeout(recalcTimer);
+                    recalcTimer = setTimeout(recalculate, RECALC_DELAY_MS);
+                }
+                
+                async function recalculate() {
+                    clearTimeout(recalcTimer);
+                    const generation = ++calcGeneration;
+                    const inputs = readCalcInputs();
+                    Object.keys(inputs).forEach(name => {
+                        if (inputs[name] !== calcSnapshot[name]) calcPending.add(name);
+                    });
+                    calcSnapshot = inputs;
+                    // Changes stay pending until a pass completes, so a pass superseded while
+                    // waiting on the server leaves its work to the next one
+                    for (const node of calcNodes) {
+                        if (!node.deps.some(dep => calcPending.has(dep))) continue;
+                        calcPending.add(node.name);
+                        const value = await node.run(inputs);
+                        if (generation !== calcGeneration) return;
+                        calc[node.name] = value;
+                    }
+                    calcPending.clear();
+                }
+                
+                function parseScenario(inputs) {
+                    return {
+                        input_tokens: parseInt(inputs.inputTokens) || 0,
+                        output_tokens: parseInt(inputs.outputTokens) || 0,
+                        iterations: parseInt(inputs.iterations) || 1,
+                        cache_hit_rate: parseFloat(inputs.cacheHitRate) / 100 || 0,
+                        scale: inputs.scale,
+                        complexity: inputs.complexity
+                    };
+                }
+                
+                function computeRequestCost(inputs) {
+                    const model = models[inputs.model];
+                    if (!model) return null;
+                    const scenario = parseScenario(inputs);
+                    const inputTokens = scenario.input_tokens;
+                    const outputTokens = scenario.output_tokens;
+                    const iterations = scenario.iterations;
+                    const cacheHitRate = scenario.cache_hit_rate;
                     
                     // Get complexity multiplier (accounts for retries, tool calls, etc.)
                     const complexityMultiplier = getComplexityMultiplier();
@@ -678,9 +1542,29 @@ def get():
                     // Calculate savings from cache
                     const cacheSavings = fullInputCost - inputCost;
                     
-                    // Calculate monthly cost
+                    return {
+                        modelId: inputs.model, model, inputTokens, outputTokens, iterations, cacheHitRate,
+                        complexityMultiplier, scaleDiscount, cacheDiscount, effectiveIterations,
+                        inputCost, outputCost, costPerRequest, cacheSavings
+                    };
+                }
+                
+                function computeVolume(inputs) {
+                    const dailyUsers = parseInt(inputs.dailyUsers) || 0;
+                    const requestsPerUser = parseFloat(inputs.requestsPerUser) || 0;
                     const dailyRequests = dailyUsers * requestsPerUser;
-                    const monthlyRequests = dailyRequests * 30;
+                    return { dailyUsers, requestsPerUser, dailyRequests, monthlyRequests: dailyRequests * 30 };
+                }
+                
+                function renderCalculation(inputs) {
+                    const cost = calc.requestCost;
+                    if (!cost) return null;
+                    const { modelId, model, inputTokens, outputTokens, iterations, cacheHitRate,
+                            complexityMultiplier, scaleDiscount, cacheDiscount, effectiveIterations,
+                            inputCost, outputCost, costPerRequest, cacheSavings } = cost;
+                    const { dailyUsers, requestsPerUser, dailyRequests, monthlyRequests } = calc.volume;
+                    
+                    // Calculate monthly cost
                     const monthlyCost = costPerRequest * monthlyRequests;
                     const monthlyCacheSavings = cacheSavings * monthlyRequests;
                     
@@ -700,8 +1584,8 @@ def get():
                     document.getElementById('tco-total').textContent = '$' + Math.round(totalMonthlyCost).toLocaleString();
                     
                     // Update breakdown
-                    const complexity = document.getElementById('complexity-select').value;
-                    const scale = document.getElementById('scale-select').value;
+                    const complexity = inputs.complexity;
+                    const scale = inputs.scale;
                     
                     const breakdown = document.getElementById('breakdown');
                     breakdown.innerHTML = `
@@ -731,15 +1615,10 @@ def get():
                         dailyUsers, requestsPerUser,
                         costPerRequest, monthlyCost, platformCost, totalMonthlyCost,
                         monthlyRequests,
-                        scale: document.getElementById('scale-select').value,
-                        complexity: document.getElementById('complexity-select').value,
+                        scale, complexity,
                         timestamp: new Date().toISOString()
                     };
-                }
-                
-                function recalculateAll() {
-                    calculate();
-                    generateModelComparison();
+                    return window.currentCalc;
                 }
                 
                 function getCacheDiscount(provider) {
@@ -763,7 +1642,7 @@ def get():
                 function setCacheHitRate(rate) {
                     document.getElementById('cache-hit-rate').value = rate;
                     updateCacheDisplay();
-                    recalculateAll();
+                    recalculate();
                 }
                 
                 function calculatePlatformCosts() {
@@ -806,7 +1685,7 @@ def get():
                     const complexity = document.getElementById('complexity-select').value;
                     
                     showPlatformTab(currentPlatformTab);
-                    recalculateAll();
+                    recalculate();
                 }
                 
                 function showPlatformTab(category) {
@@ -823,8 +1702,10 @@ def get():
                     
                     let html = '<div class="grid-2">';
                     
+                    const recommended = new Set(recommendations[scale]?.[complexity]?.[category] || []);
+                    
                     Object.entries(categoryPlatforms).forEach(([key, p]) => {
-                        const isRecommended = p.scale_fit.includes(scale) && p.complexity_fit.includes(complexity);
+                        const isRecommended = recommended.has(key);
                         const borderColor = isRecommended ? '#22c55e' : '#e2e8f0';
                         
                         html += `
@@ -861,55 +1742,111 @@ def get():
                     container.innerHTML = html;
                 }
                 
-                function generateModelComparison() {
-                    const inputTokens = parseInt(document.getElementById('input-tokens').value) || 1000;
-                    const outputTokens = parseInt(document.getElementById('output-tokens').value) || 500;
-                    const dailyUsers = parseInt(document.getElementById('daily-users').value) || 100;
-                    const requestsPerUser = parseFloat(document.getElementById('requests-per-user').value) || 10;
-                    const iterations = parseInt(document.getElementById('iterations').value) || 1;
-                    const cacheHitRate = parseFloat(document.getElementById('cache-hit-rate').value) / 100 || 0;
-                    const currentModelId = document.getElementById('model-select').value;
-                    
-                    const complexityMultiplier = getComplexityMultiplier();
-                    const scaleDiscount = getScaleDiscount();
-                    const effectiveIterations = iterations * complexityMultiplier;
-                    const monthlyRequests = dailyUsers * requestsPerUser * 30;
-                    
-                    let modelCosts = [];
-                    let currentModelCost = null;
+                const categoryLabels = {
+                    agent_frameworks: 'Agent Framework', vector_stores: 'Vector Store', cicd: 'CI/CD',
+                    observability: 'Observability', registries: 'Model Registry'
+                };
+                let stackRequest = null;
+                
+                async function fetchStack(inputs) {
+                    // Cheapest model plus one fitting platform per category, found by the server's optimizer
+                    if (stackRequest) stackRequest.abort();
+                    stackRequest = new AbortController();
+                    try {
+                        const resp = await fetch('/api/optimize', {
+                            method: 'POST',
+                            headers: { 'Content-Type': 'application/json' },
+                            body: JSON.stringify(parseScenario(inputs)),
+                            signal: stackRequest.signal
+                        });
+                        if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+                        return await resp.json();
+                    } catch (e) {
+                        if (e.name !== 'AbortError') console.error('Stack optimization failed', e);
+                        return null;
+                    }
+                }
+                
+                function renderStack() {
+                    const data = calc.stack;
+                    const stack = data?.stacks[0];
+                    if (!stack) return null;
+                    const money = v => '$' + v.toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2});
+                    const current = calc.summary;
+                    const savings = current ? current.totalMonthlyCost - stack.total_monthly_cost : 0;
+                    
+                    let html = `<div style="background: #f0fdf4; border-radius: 8px; padding: 15px; margin-bottom: 15px;">
+                        <div style="display: flex; justify-content: space-between; flex-wrap: wrap; gap: 10px;">
+                            <div>
+                                <div style="font-size: 0.85em; color: #6b7280;">Cheapest full stack</div>
+                                <div style="font-weight: 600; color: #1e293b;">${money(stack.total_monthly_cost)}/mo</div>
+                                <div style="font-size: 0.85em; color: #6b7280;">LLM ${money(stack.llm_monthly_cost)} + platforms ${money(stack.platform_monthly_cost)}</div>
+                            </div>
+                            ${savings > 0 ? `<div>
+                                <div style="font-size: 0.85em; color: #6b7280;">vs your estimate</div>
+                                <div style="font-weight: 600; color: #059669;">${money(savings)}/mo less</div>
+                            </div>` : ''}
+                        </div>
+                        <div style="margin-top: 10px;">
+                            <span class="tag tag-blue">Model: ${escapeHtml(stack.model.name)}</span>
+                            ${Object.entries(stack.platforms).map(([category, p]) =>
+                                `<span class="tag tag-gray">${categoryLabels[category] || category}: ${p.name}${p.monthly_cost > 0 ? ` (${money(p.monthly_cost)})` : ''}</span>`).join('')}
+                        </div>
+                        ${data.unfilled.length ? `<div style="font-size: 0.85em; color: #6b7280; margin-top: 8px;">No platform fits this scale and complexity for: ${data.unfilled.map(c => categoryLabels[c] || c).join(', ')}</div>` : ''}
+                    </div>`;
                     
-                    Object.entries(models).forEach(([id, m]) => {
-                        const cacheDiscount = getCacheDiscount(m.provider);
-                        
-                        // Calculate input cost with cache discount
-                        const fullInputCost = (inputTokens * effectiveIterations / 1000000) * m.price_input * scaleDiscount;
-                        const cachedInputCost = fullInputCost * cacheDiscount;
-                        const inputCost = fullInputCost * (1 - cacheHitRate) + cachedInputCost * cacheHitRate;
-                        
-                        const outputCost = (outputTokens * effectiveIterations / 1000000) * m.price_output * scaleDiscount;
-                        const costPerRequest = inputCost + outputCost;
-                        const monthlyCost = costPerRequest * monthlyRequests;
-                        
-                        const modelData = {
-                            id, name: m.name, provider: m.provider,
-                            costPerRequest, monthlyCost,
-                            priceInput: m.price_input, priceOutput: m.price_output,
-                            contextWindow: m.context_window,
-                            isCurrent: id === currentModelId
-                        };
-                        
-                        modelCosts.push(modelData);
-                        if (id === currentModelId) {
-                            currentModelCost = modelData;
-                        }
+                    document.getElementById('optimized-stack').innerHTML = html;
+                    return html;
+                }
+                
+                let comparisonRequest = null;
+                
+                async function fetchComparison(scenario) {
+                    // Cancel the previous request; only the latest inputs matter
+                    if (comparisonRequest) comparisonRequest.abort();
+                    comparisonRequest = new AbortController();
+                    const resp = await fetch('/api/compare', {
+                        method: 'POST',
+                        headers: { 'Content-Type': 'application/json' },
+                        body: JSON.stringify(scenario),
+                        signal: comparisonRequest.signal
                     });
-                    
-                    // Sort by monthly cost
-                    modelCosts.sort((a, b) => a.monthlyCost - b.monthlyCost);
-                    
-                    // Find current model rank
-                    const currentRank = modelCosts.findIndex(m => m.isCurrent) + 1;
-                    const cheapestModel = modelCosts[0];
+                    if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+                    return resp.json();
+                }
+                
+                function comparisonModel(m, currentModelId, monthlyRequests) {
+                    return {
+                        id: m.id, name: m.name, provider: m.provider,
+                        costPerRequest: m.cost_per_request, monthlyCost: m.cost_per_request * monthlyRequests,
+                        priceInput: m.price_input, priceOutput: m.price_output,
+                        contextWindow: m.context_window,
+                        isCurrent: m.id === currentModelId
+                    };
+                }
+                
+                async function fetchRanking(inputs) {
+                    // Ranking depends only on per-request inputs; the server returns the top 10 and the current model's rank
+                    try {
+                        return await fetchComparison({ model: inputs.model || null, k: 10, ...parseScenario(inputs) });
+                    } catch (e) {
+                        if (e.name !== 'AbortError') console.error('Model comparison failed', e);
+                        return null;
+                    }
+                }
+                
+                function renderModelComparison(inputs) {
+                    const data = calc.ranking;
+                    if (!data) return null;
+                    const { input_tokens: inputTokens, output_tokens: outputTokens } = parseScenario(inputs);
+                    const monthlyRequests = calc.volume.monthlyRequests;
+                    const currentModelId = inputs.model;
+                    
+                    const modelCount = data.count;
+                    const topModels = data.top.map(m => comparisonModel(m, currentModelId, monthlyRequests));
+                    const currentModelCost = data.current ? comparisonModel(data.current, currentModelId, monthlyRequests) : null;
+                    const currentRank = data.current ? data.current.rank : 0;
+                    const cheapestModel = topModels[0];
                     
                     let html = '';
                     
@@ -926,7 +1863,7 @@ def get():
                             </div>
                             <div>
                                 <div style="font-size: 0.85em; color: #6b7280;">Rank</div>
-                                <div style="font-weight: 600; color: #1e293b;">#${currentRank} of ${modelCosts.length}</div>
+                                <div style="font-weight: 600; color: #1e293b;">#${currentRank} of ${modelCount}</div>
                             </div>
                             ${savings > 0 ? `<div>
                                 <div style="font-size: 0.85em; color: #6b7280;">Potential savings</div>
@@ -956,7 +1893,6 @@ def get():
                     `;
                     
                     // Show top 10 cheapest + current model if not in top 10
-                    const topModels = modelCosts.slice(0, 10);
                     const showCurrentSeparately = currentRank > 10;
                     
                     topModels.forEach((m, i) => {
@@ -1102,21 +2038,169 @@ def get():
                     
                     cardsHtml += '</div>';
                     html += cardsHtml;
-                    html += `<p style="font-size: 0.8em; color: #6b7280; margin-top: 10px;">Showing top 10 of ${modelCosts.length} models. Costs based on your configuration: ${inputTokens} input × ${outputTokens} output tokens, ${monthlyRequests.toLocaleString()} requests/month.</p>`;
+                    html += `<p style="font-size: 0.8em; color: #6b7280; margin-top: 10px;">Showing top 10 of ${modelCount} models. Costs based on your configuration: ${inputTokens} input × ${outputTokens} output tokens, ${monthlyRequests.toLocaleString()} requests/month.</p>`;
                     
                     document.getElementById('model-comparison-table').innerHTML = html;
+                    return html;
                 }
                 
-                function saveScenario() {
-                    if (!window.currentCalc) return;
+                let frontierRequest = null;
+                
+                async function fetchFrontier(inputs) {
+                    // The frontier depends only on per-request inputs, like the ranking
+                    if (frontierRequest) frontierRequest.abort();
+                    frontierRequest = new AbortController();
+                    try {
+                        const resp = await fetch('/api/pareto', {
+                            method: 'POST',
+                            headers: { 'Content-Type': 'application/json' },
+                            body: JSON.stringify({ model: inputs.model || null, ...parseScenario(inputs) }),
+                            signal: frontierRequest.signal
+                        });
+                        if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+                        return await resp.json();
+                    } catch (e) {
+                        if (e.name !== 'AbortError') console.error('Pareto frontier failed', e);
+                        return null;
+                    }
+                }
+                
+                function renderFrontier(inputs) {
+                    const data = calc.frontier;
+                    if (!data) return null;
+                    const monthlyRequests = calc.volume.monthlyRequests;
+                    const frontier = data.frontier.map(m => ({
+                        ...comparisonModel(m, inputs.model, monthlyRequests), maxOutput: m.max_output
+                    }));
+                    const formatTokens = n => n >= 1000 ? `${(n / 1000).toFixed(0)}K` : `${n}`;
+                    let html = '';
                     
-                    const scenario = {
-                        ...window.currentCalc,
-                        id: Date.now(),
-                        name: `${window.currentCalc.model} - ${new Date().toLocaleTimeString()}`
-                    };
+                    // Is the current model worth its price, or does something beat it on every axis?
+                    if (data.current) {
+                        const dominators = frontier.filter(m => data.current.dominated_by.includes(m.id));
+                        html += dominators.length ? `<div style="background: #fef3c7; border-radius: 8px; padding: 15px; margin-bottom: 15px;">
+                                <strong>${escapeHtml(data.current.name)}</strong> is outclassed: ${dominators.map(m => escapeHtml(m.name)).join(', ')}
+                                ${dominators.length === 1 ? 'costs' : 'cost'} no more with at least as much context and output.
+                            </div>` : `<div style="background: #f0fdf4; border-radius: 8px; padding: 15px; margin-bottom: 15px;">
+                                <strong>${escapeHtml(data.current.name)}</strong> is on the frontier: no model is cheaper with as much context and output.
+                            </div>`;
+                    }
+                    
+                    html += `
+                        <div class="frontier-table"><table class="comparison-table">
+                            <thead>
+                                <tr>
+                                    <th>Model</th>
+                                    <th>Provider</th>
+                                    <th>$/Request</th>
+                                    <th>$/Month</th>
+                                    <th>Context</th>
+                                    <th>Max Output</th>
+                                </tr>
+                            </thead>
+                            <tbody>
+                    `;
+                    frontier.forEach(m => {
+                        html += `
+                            <tr style="${m.isCurrent ? 'background: #eff6ff; border-left: 3px solid #2563eb;' : ''}">
+                                <td><strong>${escapeHtml(m.name)}</strong>${m.isCurrent ? ' <span class="tag tag-blue">Current</span>' : ''}</td>
+                                <td>${escapeHtml(m.provider)}</td>
+                                <td>$${m.costPerRequest.toFixed(4)}</td>
+                                <td>$${m.monthlyCost.toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})}</td>
+                                <td>${formatTokens(m.contextWindow)}</td>
+                                <td>${formatTokens(m.maxOutput)}</td>
+                            </tr>
+                        `;
+                    });
+                    html += '</tbody></table></div>';
+                    html += `<p style="font-size: 0.8em; color: #6b7280; margin-top: 10px;">${frontier.length} of ${data.count} models are not beaten on cost, context window and max output at once. Cheapest first; each step up buys more context or output.</p>`;
                     
-                    savedScenarios.push(scenario);
+                    document.getElementById('model-frontier').innerHTML = html;
+                    return html;
+                }
+                
+                function escapeHtml(text) {
+                    return String(text).replace(/[&<>"']/g, c => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' })[c]);
+                }
+                
+                // Scenarios are stored on the server under an owner (a person or a team) kept in this browser
+                const SCENARIO_PAGE = 50;
+                let scenarioOwner = '';
+                let scenariosNext = null;
+                
+                function initScenarioOwner() {
+                    let owner = localStorage.getItem('thrifty-owner');
+                    if (!owner) {
+                        owner = `user-${Math.random().toString(36).slice(2, 10)}`;
+                        localStorage.setItem('thrifty-owner', owner);
+                    }
+                    scenarioOwner = owner;
+                    document.getElementById('scenario-owner').value = owner;
+                    return loadSavedScenarios();
+                }
+                
+                function setScenarioOwner(value) {
+                    const owner = value.trim();
+                    if (!owner || owner === scenarioOwner) return;
+                    scenarioOwner = owner;
+                    localStorage.setItem('thrifty-owner', owner);
+                    loadSavedScenarios();
+                }
+                
+                async function scenarioApi(path, options = {}) {
+                    const resp = await fetch(path, {
+                        ...options, headers: { 'Content-Type': 'application/json', ...(options.headers || {}) }
+                    });
+                    const data = await resp.json();
+                    if (!resp.ok) throw new Error(data.error || `HTTP ${resp.status}`);
+                    return data;
+                }
+                
+                function scenarioFromRow(row) {
+                    return {
+                        id: row.id, name: row.name, modelId: row.model, model: row.model_name || row.model,
+                        provider: row.provider, tags: row.tags,
+                        inputTokens: row.scenario.input_tokens, outputTokens: row.scenario.output_tokens,
+                        iterations: row.scenario.iterations, cacheHitRate: Math.round(row.scenario.cache_hit_rate * 100),
+                        dailyUsers: row.scenario.daily_users, requestsPerUser: row.scenario.requests_per_user,
+                        scale: row.scenario.scale, complexity: row.scenario.complexity,
+                        costPerRequest: row.cost_per_request, monthlyCost: row.monthly_cost,
+                        totalMonthlyCost: row.total_monthly_cost, monthlyRequests: row.monthly_requests
+                    };
+                }
+                
+                async function loadSavedScenarios(more = false) {
+                    const params = new URLSearchParams({ owner: scenarioOwner, limit: SCENARIO_PAGE });
+                    if (more && scenariosNext !== null) params.set('before', scenariosNext);
+                    try {
+                        const data = await scenarioApi(`/api/scenarios?${params}`);
+                        const page = data.scenarios.map(scenarioFromRow);
+                        savedScenarios = more ? [...savedScenarios, ...page] : page;
+                        scenariosNext = data.next;
+                    } catch (e) {
+                        console.error('Loading saved scenarios failed', e);
+                    }
+                    renderSavedScenarios();
+                }
+                
+                async function saveScenario() {
+                    if (!window.currentCalc) return;
+                    const c = window.currentCalc;
+                    try {
+                        const row = await scenarioApi('/api/scenarios', {
+                            method: 'POST',
+                            body: JSON.stringify({
+                                owner: scenarioOwner, model: c.modelId,
+                                name: `${c.model} - ${new Date().toLocaleTimeString()}`,
+                                ...parseScenario(readCalcInputs()),
+                                daily_users: c.dailyUsers, requests_per_user: c.requestsPerUser
+                            })
+                        });
+                        savedScenarios.unshift(scenarioFromRow(row));
+                    } catch (e) {
+                        alert(`Could not save scenario: ${e.message}`);
+                        return;
+                    }
                     renderSavedScenarios();
                 }
                 
@@ -1128,52 +2212,85 @@ def get():
                         return;
                     }
                     
+                    // Newest first; a model dropped from the catalog has no current cost
+                    const money = (value, digits) => value === null ? 'n/a' : '$' + value.toFixed(digits);
                     let html = '';
                     savedScenarios.forEach((s, i) => {
                         html += `
                             <div class="scenario-card" onclick="loadScenario(${i})">
                                 <div style="display: flex; justify-content: space-between;">
-                                    <h4 style="margin: 0;">${s.model}</h4>
+                                    <h4 style="margin: 0;">${escapeHtml(s.name)}</h4>
                                     <button onclick="event.stopPropagation(); removeScenario(${i})" style="background: none; border: none; color: #dc2626; cursor: pointer;">×</button>
                                 </div>
-                                <p>$${s.costPerRequest.toFixed(4)}/req · $${s.monthlyCost.toFixed(2)}/mo · ${s.monthlyRequests.toLocaleString()} req/mo</p>
+                                <p>${money(s.costPerRequest, 4)}/req · ${money(s.monthlyCost, 2)}/mo · ${(s.monthlyRequests || 0).toLocaleString()} req/mo</p>
                             </div>
                         `;
                     });
+                    if (scenariosNext !== null) {
+                        html += '<button class="btn btn-secondary" onclick="loadSavedScenarios(true)">Load more</button>';
+                    }
                     
                     container.innerHTML = html;
                 }
                 
-                function loadScenario(index) {
+                async function loadScenario(index) {
                     const s = savedScenarios[index];
                     if (!s) return;
+                    if (!s.provider) {
+                        alert(`${s.modelId} is no longer in the catalog`);
+                        return;
+                    }
                     
                     document.getElementById('provider-select').value = s.provider;
-                    updateModels();
+                    await updateModels();
                     document.getElementById('model-select').value = s.modelId;
                     document.getElementById('input-tokens').value = s.inputTokens;
                     document.getElementById('output-tokens').value = s.outputTokens;
                     document.getElementById('iterations').value = s.iterations;
+                    document.getElementById('cache-hit-rate').value = s.cacheHitRate;
                     document.getElementById('daily-users').value = s.dailyUsers;
                     document.getElementById('requests-per-user').value = s.requestsPerUser;
                     document.getElementById('scale-select').value = s.scale;
                     document.getElementById('complexity-select').value = s.complexity;
                     
+                    updateCacheDisplay();
                     updateModelSpecs();
                 }
                 
-                function removeScenario(index) {
-                    savedScenarios.splice(index, 1);
+                async function removeScenario(index) {
+                    const s = savedScenarios[index];
+                    if (!s) return;
+                    try {
+                        await scenarioApi(`/api/scenarios/${s.id}`, { method: 'DELETE' });
+                    } catch (e) {
+                        console.error('Removing scenario failed', e);
+                    }
+                    savedScenarios = savedScenarios.filter(other => other.id !== s.id);
                     renderSavedScenarios();
                 }
                 
-                function clearScenarios() {
+                async function clearScenarios() {
+                    if (savedScenarios.length && !confirm(`Delete every scenario saved as ${scenarioOwner}?`)) return;
+                    try {
+                        await scenarioApi(`/api/scenarios?${new URLSearchParams({ owner: scenarioOwner })}`, { method: 'DELETE' });
+                    } catch (e) {
+                        console.error('Clearing scenarios failed', e);
+                    }
                     savedScenarios = [];
+                    scenariosNext = null;
                     renderSavedScenarios();
                 }
                 
-                function showDelta() {
-                    if (savedScenarios.length < 2) {
+                async function showDelta() {
+                    // Deltas and the cheapest / most expensive pair come from the server over all saved scenarios
+                    let data;
+                    try {
+                        data = await scenarioApi(`/api/scenarios/delta?${new URLSearchParams({ owner: scenarioOwner })}`);
+                    } catch (e) {
+                        alert(`Could not compare scenarios: ${e.message}`);
+                        return;
+                    }
+                    if (data.count < 2) {
                         alert('Save at least 2 scenarios to compare deltas');
                         return;
                     }
@@ -1181,11 +2298,12 @@ def get():
                     const modal = document.getElementById('delta-modal');
                     const content = document.getElementById('delta-comparison-content');
                     
-                    // Use first scenario as baseline
-                    const baseline = savedScenarios[0];
+                    // The first saved scenario is the baseline
+                    const baseline = scenarioFromRow(data.baseline);
+                    const money = (value, digits) => value === null ? 'n/a' : '$' + value.toFixed(digits);
                     
                     let html = `
-                        <p style="color: #6b7280;">Comparing against baseline: <strong>${baseline.model}</strong></p>
+                        <p style="color: #6b7280;">Comparing against baseline: <strong>${escapeHtml(baseline.model)}</strong></p>
                         <table class="comparison-table">
                             <thead>
                                 <tr>
@@ -1200,43 +2318,49 @@ def get():
                             <tbody>
                     `;
                     
-                    savedScenarios.forEach((s, i) => {
-                        const deltaPerReq = s.costPerRequest - baseline.costPerRequest;
-                        const deltaMonthly = s.monthlyCost - baseline.monthlyCost;
-                        const deltaPercent = baseline.monthlyCost > 0 ? ((s.monthlyCost - baseline.monthlyCost) / baseline.monthlyCost * 100) : 0;
-                        
-                        const deltaClass = deltaMonthly > 0 ? 'delta-negative' : (deltaMonthly < 0 ? 'delta-positive' : '');
-                        const deltaSign = deltaMonthly > 0 ? '+' : '';
+                    data.scenarios.forEach(row => {
+                        const s = scenarioFromRow(row);
+                        const isBaseline = s.id === baseline.id;
+                        const known = row.delta_monthly !== null;
+                        const deltaClass = row.delta_monthly > 0 ? 'delta-negative' : (row.delta_monthly < 0 ? 'delta-positive' : '');
+                        const deltaSign = row.delta_monthly > 0 ? '+' : '';
+                        const delta = text => isBaseline ? '-' : (known ? deltaSign + text : 'n/a');
                         
                         html += `
-                            <tr ${i === 0 ? 'style="background: #f8fafc;"' : ''}>
-                                <td><strong>${s.model}</strong>${i === 0 ? ' (baseline)' : ''}</td>
-                                <td>$${s.costPerRequest.toFixed(4)}</td>
-                                <td class="${deltaClass}">${i === 0 ? '-' : deltaSign + '$' + deltaPerReq.toFixed(4)}</td>
-                                <td>$${s.monthlyCost.toFixed(2)}</td>
-                                <td class="${deltaClass}">${i === 0 ? '-' : deltaSign + '$' + deltaMonthly.toFixed(2)}</td>
-                                <td class="${deltaClass}">${i === 0 ? '-' : deltaSign + deltaPercent.toFixed(1) + '%'}</td>
+                            <tr ${isBaseline ? 'style="background: #f8fafc;"' : ''}>
+                                <td><strong>${escapeHtml(s.model)}</strong>${isBaseline ? ' (baseline)' : ''}</td>
+                                <td>${money(s.costPerRequest, 4)}</td>
+                                <td class="${deltaClass}">${delta(known && '$' + row.delta_per_request.toFixed(4))}</td>
+                                <td>${money(s.monthlyCost, 2)}</td>
+                                <td class="${deltaClass}">${delta(known && '$' + row.delta_monthly.toFixed(2))}</td>
+                                <td class="${deltaClass}">${delta(known && row.delta_percent.toFixed(1) + '%')}</td>
                             </tr>
                         `;
                     });
                     
                     html += '</tbody></table>';
+                    if (data.count > data.scenarios.length) {
+                        html += `<p style="font-size: 0.8em; color: #6b7280; margin-top: 10px;">Showing the first ${data.scenarios.length} of ${data.count} scenarios.</p>`;
+                    }
                     
                     // Add savings summary
-                    const cheapest = savedScenarios.reduce((a, b) => a.monthlyCost < b.monthlyCost ? a : b);
-                    const mostExpensive = savedScenarios.reduce((a, b) => a.monthlyCost > b.monthlyCost ? a : b);
-                    const savings = mostExpensive.monthlyCost - cheapest.monthlyCost;
-                    
-                    html += `
-                        <div style="margin-top: 20px; padding: 15px; background: #f0fdf4; border-radius: 8px;">
-                            <strong style="color: #059669;">Potential Savings:</strong>
-                            <p style="margin: 5px 0 0 0;">
-                                Switching from <strong>${mostExpensive.model}</strong> to <strong>${cheapest.model}</strong> 
-                                saves <strong>$${savings.toFixed(2)}/month</strong> 
-                                (${((savings / mostExpensive.monthlyCost) * 100).toFixed(1)}% reduction)
-                            </p>
-                        </div>
-                    `;
+                    if (data.cheapest && data.most_expensive) {
+                        const cheapest = scenarioFromRow(data.cheapest);
+                        const mostExpensive = scenarioFromRow(data.most_expensive);
+                        const savings = mostExpensive.monthlyCost - cheapest.monthlyCost;
+                        const reduction = mostExpensive.monthlyCost > 0 ? (savings / mostExpensive.monthlyCost) * 100 : 0;
+                        
+                        html += `
+                            <div style="margin-top: 20px; padding: 15px; background: #f0fdf4; border-radius: 8px;">
+                                <strong style="color: #059669;">Potential Savings:</strong>
+                                <p style="margin: 5px 0 0 0;">
+                                    Switching from <strong>${escapeHtml(mostExpensive.model)}</strong> to <strong>${escapeHtml(cheapest.model)}</strong> 
+                                    saves <strong>$${savings.toFixed(2)}/month</strong> 
+                                    (${reduction.toFixed(1)}% reduction)
+                                </p>
+                            </div>
+                        `;
+                    }
                     
                     content.innerHTML = html;
                     modal.classList.remove('hidden');
@@ -1247,7 +2371,7 @@ def get():
                 }
                 
                 function showComparison() {
-                    generateModelComparison();
+                    recalculate();
                     document.getElementById('comparison').scrollIntoView({ behavior: 'smooth' });
                 }
                 
@@ -1,8 +1,19 @@
-from dataclasses import dataclass
-from typing import Dict
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, astuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
 import httpx
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModelSpec:
     name: str
     provider: str
@@ -10,106 +21,296 @@ class ModelSpec:
     max_output: int
     price_input: float  # per 1M tokens
     price_output: float  # per 1M tokens
+    source: str = "default"  # Where the pricing came from: "litellm", "openrouter" or "default"
 
 # API URLs
+FETCH_TIMEOUT = 15  # seconds
 LITELLM_URL = "https://raw.githubusercontent.com/BerriAI/litellm/main/model_prices_and_context_window.json"
 OPENROUTER_URL = "https://openrouter.ai/api/v1/models"
 
+# Sources are fetched concurrently; on overlap, earlier sources in this order win
+SOURCE_PRECEDENCE = ("litellm", "openrouter")
+SOURCE_DEADLINES = {"litellm": 20, "openrouter": 10}  # seconds per source
+PRICE_CONFLICT_TOLERANCE = 0.01  # Relative price difference reported as a conflict
+
+# On-disk catalog cache, shared across restarts and worker processes
+MODELS_CACHE_PATH = Path(os.environ.get("THRIFTY_MODELS_CACHE", Path(__file__).parent / "models.json"))
+MODELS_CACHE_TTL = float(os.environ.get("THRIFTY_MODELS_TTL", 6 * 60 * 60))  # seconds
+REFRESH_RETRY_INTERVAL = 60  # seconds between attempts after a failed refresh
+CACHE_SCHEMA_VERSION = 2
+CATALOG_HISTORY = 8  # Past catalog versions kept so clients can ask what changed since them
+
 # Cache for fetched models
 _models_cache: Dict[str, ModelSpec] = {}
+_fetched_at: float = 0.0  # When _models_cache was fetched from upstream (0 for defaults)
+_last_attempt: float = 0.0
+_refresh_lock = threading.Lock()
+_scheduler_task: Optional[asyncio.Task] = None
+_last_merge: Optional["MergeReport"] = None
+_sources: Dict[str, "SourceState"] = {}  # Last successful download per upstream source
+_refresh_metrics: Dict[str, dict] = {}
+# Content hash and load time of the cached catalog, set whenever _models_cache is replaced
+_catalog_version: str = ""
+_catalog_updated_at: float = 0.0
+_fingerprints: Dict[str, bytes] = {}  # Per-model content hashes of _models_cache
+# (version, models) replaced in one assignment, so readers on other threads never pair a version with another catalog
+_catalog_snapshot: Tuple[str, Dict[str, ModelSpec]] = ("", {})
+# Recent catalogs for diffs: version -> (models, fingerprints), oldest first
+_catalog_history: "OrderedDict[str, Tuple[Dict[str, ModelSpec], Dict[str, bytes]]]" = OrderedDict()
+_catalog_listeners: List[Callable[["CatalogDiff"], None]] = []
+_set_models_lock = threading.RLock()  # Catalog swaps run on worker threads; each diffs against the one before
+
+@lru_cache(maxsize=None)
+def provider_name(raw: str) -> str:
+    """Clean up a provider name (e.g. "together_ai" -> "Together Ai"), shared by all its models."""
+    return sys.intern(raw.replace("_", " ").replace("-", " ").title())
+
+def parse_litellm_entry(name: str, info: dict) -> Optional[ModelSpec]:
+    """Build a model spec from one LiteLLM pricing entry, or None if it should be skipped."""
+    # Skip entries without pricing info
+    if not isinstance(info, dict) or "input_cost_per_token" not in info:
+        return None
+
+    # Skip sample/test/fine-tuned models
+    if any(x in name.lower() for x in ['sample', 'ft:', 'ft-', 'finetune']):
+        return None
 
-def fetch_litellm_pricing() -> Dict[str, ModelSpec]:
-    """Fetch pricing from LiteLLM's community-maintained JSON file."""
     try:
-        response = httpx.get(LITELLM_URL, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-
-        models = {}
-        for name, info in data.items():
-            # Skip entries without pricing info
-            if "input_cost_per_token" not in info:
-                continue
+        # Extract provider from litellm_provider field if available, otherwise from model name
+        provider = info.get("litellm_provider", "")
+        if not provider:
+            # Try to extract from model name (e.g., "openai/gpt-4" -> "openai")
+            if "/" in name:
+                provider = name.split("/")[0]
+            else:
+                provider = "Other"
 
-            # Skip sample/test/fine-tuned models
-            if any(x in name.lower() for x in ['sample', 'ft:', 'ft-', 'finetune']):
-                continue
+        return ModelSpec(
+            name=info.get("litellm_model", name),  # Use display name if available
+            provider=provider_name(provider),
+            context_window=info.get("max_input_tokens") or info.get("max_tokens", 4096),
+            max_output=info.get("max_output_tokens") or 4096,
+            price_input=round(info.get("input_cost_per_token", 0) * 1_000_000, 4),
+            price_output=round(info.get("output_cost_per_token", 0) * 1_000_000, 4),
+            source="litellm"
+        )
+    except (ValueError, TypeError, KeyError):
+        return None
 
-            try:
-                # Extract provider from litellm_provider field if available, otherwise from model name
-                provider = info.get("litellm_provider", "")
-                if not provider:
-                    # Try to extract from model name (e.g., "openai/gpt-4" -> "openai")
-                    if "/" in name:
-                        provider = name.split("/")[0]
-                    else:
-                        provider = "Other"
-
-                # Clean up provider name
-                provider = provider.replace("_", " ").replace("-", " ").title()
-
-                models[name] = ModelSpec(
-                    name=info.get("litellm_model", name),  # Use display name if available
-                    provider=provider,
-                    context_window=info.get("max_input_tokens") or info.get("max_tokens", 4096),
-                    max_output=info.get("max_output_tokens") or 4096,
-                    price_input=round(info.get("input_cost_per_token", 0) * 1_000_000, 4),
-                    price_output=round(info.get("output_cost_per_token", 0) * 1_000_000, 4)
-                )
-            except (ValueError, TypeError, KeyError):
-                continue
+def parse_litellm_pricing(data: dict) -> Dict[str, ModelSpec]:
+    """Build model specs from LiteLLM's pricing JSON."""
+    models = {}
+    for name, info in data.items():
+        spec = parse_litellm_entry(name, info)
+        if spec is not None:
+            models[name] = spec
+    return models
 
-        return models
-    except Exception as e:
-        print(f"Error fetching LiteLLM pricing: {e}")
-        return {}
+class JSONObjectStream:
+    """Incremental parser for a top-level JSON object fed in text chunks.
 
-def fetch_openrouter_pricing() -> Dict[str, ModelSpec]:
-    """Fetch pricing from OpenRouter API."""
-    try:
-        response = httpx.get(OPENROUTER_URL, timeout=15)
-        response.raise_for_status()
-        data = response.json()
+    Each call to feed() returns the (key, value) pairs completed so far, so only
+    one entry (plus the unparsed tail of the input) is held in memory at a time.
+    """
+    _WS = " \t\n\r"
 
-        models = {}
-        for m in data.get("data", []):
-            try:
-                pricing = m.get("pricing", {})
-                price_in = float(pricing.get("prompt", 0)) * 1_000_000
-                price_out = float(pricing.get("completion", 0)) * 1_000_000
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"  # start -> key -> colon -> value -> sep -> key ... -> done
+        self._key = None
+
+    def _skip_ws(self) -> bool:
+        """Advance past whitespace; False if the buffer ran out."""
+        buf, pos = self._buf, self._pos
+        while pos < len(buf) and buf[pos] in self._WS:
+            pos += 1
+        self._pos = pos
+        return pos < len(buf)
 
-                # Skip free/zero-cost models
-                if price_in == 0 and price_out == 0:
+    def _expect(self, char: str):
+        if self._buf[self._pos] != char:
+            raise ValueError(f"Expected {char!r} at offset {self._pos}, found {self._buf[self._pos]!r}")
+        self._pos += 1
+
+    def feed(self, text: str, final: bool = False) -> List[Tuple[str, object]]:
+        """Add a chunk of input and return the entries it completed."""
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        entries = []
+        while self._state != "done" and self._skip_ws():
+            if self._state == "start":
+                self._expect("{")
+                self._state = "key"
+            elif self._state in ("key", "sep"):
+                if self._buf[self._pos] == "}":
+                    self._pos += 1
+                    self._state = "done"
+                    break
+                if self._state == "sep":
+                    self._expect(",")
+                    self._state = "key"
                     continue
+                try:
+                    self._key, end = self._decoder.raw_decode(self._buf, self._pos)
+                except json.JSONDecodeError:
+                    break  # Key is split across chunks
+                self._pos = end
+                self._state = "colon"
+            elif self._state == "colon":
+                self._expect(":")
+                self._state = "value"
+            else:
+                # A bare number or literal running to the end of the buffer may continue in the next
+                # chunk, and raw_decode would accept a shorter valid prefix of it ("1." as 1)
+                if not final and self._buf[self._pos] not in '{["':
+                    end = self._pos
+                    while end < len(self._buf) and self._buf[end] not in self._WS + ",}":
+                        end += 1
+                    if end == len(self._buf):
+                        break
+                try:
+                    value, end = self._decoder.raw_decode(self._buf, self._pos)
+                except json.JSONDecodeError:
+                    break  # Value is split across chunks
+                self._pos = end
+                entries.append((self._key, value))
+                self._state = "sep"
+        if final and self._state != "done":
+            raise ValueError("Truncated JSON object")
+        return entries
+
+async def _parse_litellm_stream(response: httpx.Response) -> Tuple[Dict[str, ModelSpec], float]:
+    """Parse LiteLLM's feed entry by entry as it downloads. Returns (models, parse_seconds)."""
+    stream = JSONObjectStream()
+    models = {}
+    parse_seconds = 0.0
+
+    def add(entries):
+        for name, info in entries:
+            spec = parse_litellm_entry(name, info)
+            if spec is not None:
+                models[name] = spec
+
+    async for chunk in response.aiter_text():
+        start = time.perf_counter()
+        add(stream.feed(chunk))
+        parse_seconds += time.perf_counter() - start
+    start = time.perf_counter()
+    add(stream.feed("", final=True))
+    return models, parse_seconds + time.perf_counter() - start
+
+async def _parse_openrouter_response(response: httpx.Response) -> Tuple[Dict[str, ModelSpec], float]:
+    """Parse OpenRouter's (small) response in one go. Returns (models, parse_seconds)."""
+    await response.aread()
+    start = time.perf_counter()
+    # Parsing is CPU work; keep it off the loop
+    models = await asyncio.to_thread(lambda: parse_openrouter_pricing(response.json()))
+    return models, time.perf_counter() - start
 
-            except (ValueError, TypeError):
+def parse_openrouter_pricing(data: dict) -> Dict[str, ModelSpec]:
+    """Build model specs from OpenRouter's models API response."""
+    models = {}
+    for m in data.get("data", []):
+        try:
+            pricing = m.get("pricing", {})
+            price_in = float(pricing.get("prompt", 0)) * 1_000_000
+            price_out = float(pricing.get("completion", 0)) * 1_000_000
+
+            # Skip free/zero-cost models
+            if price_in == 0 and price_out == 0:
                 continue
 
-            model_id = m.get("id", "")
+        except (ValueError, TypeError):
+            continue
 
-            # Extract provider from model ID (e.g., "openai/gpt-4" -> "Openai")
-            if "/" in model_id:
-                provider = model_id.split("/")[0].replace("-", " ").replace("_", " ").title()
-            else:
-                provider = "Other"
+        model_id = m.get("id", "")
+
+        # Extract provider from model ID (e.g., "openai/gpt-4" -> "Openai")
+        if "/" in model_id:
+            provider = provider_name(model_id.split("/")[0])
+        else:
+            provider = "Other"
+
+        # Get max_output from top_provider if available
+        max_output = 4096
+        if "top_provider" in m and m["top_provider"]:
+            max_output = m["top_provider"].get("max_completion_tokens") or 4096
+
+        models[model_id] = ModelSpec(
+            name=m.get("name", model_id),
+            provider=provider,
+            context_window=m.get("context_length") or 4096,
+            max_output=max_output,
+            price_input=round(price_in, 4),
+            price_output=round(price_out, 4),
+            source="openrouter"
+        )
+    return models
+
+@dataclass
+class SourceState:
+    """Last successful download of one upstream source, with its HTTP validators."""
+    models: Dict[str, ModelSpec]
+    etag: str = ""
+    last_modified: str = ""
+    size: int = 0  # Bytes transferred by the last full download
+    parse_seconds: float = 0.0  # Time spent parsing the last full download
 
-            # Get max_output from top_provider if available
-            max_output = 4096
-            if "top_provider" in m and m["top_provider"]:
-                max_output = m["top_provider"].get("max_completion_tokens") or 4096
-
-            models[model_id] = ModelSpec(
-                name=m.get("name", model_id),
-                provider=provider,
-                context_window=m.get("context_length") or 4096,
-                max_output=max_output,
-                price_input=round(price_in, 4),
-                price_output=round(price_out, 4)
-            )
+def _record(source: str, status: str, downloaded: int = 0, saved: int = 0, parsed: float = 0.0, skipped: float = 0.0):
+    metrics = _refresh_metrics.setdefault(source, {
+        "last_status": "", "downloads": 0, "not_modified": 0, "errors": 0,
+        "bytes_downloaded": 0, "bytes_saved": 0, "parse_seconds": 0.0, "parse_seconds_skipped": 0.0})
+    metrics["last_status"] = status
+    metrics[{"downloaded": "downloads", "not_modified": "not_modified", "error": "errors"}[status]] += 1
+    metrics["bytes_downloaded"] += downloaded
+    metrics["bytes_saved"] += saved
+    metrics["parse_seconds"] += parsed
+    metrics["parse_seconds_skipped"] += skipped
+
+async def _afetch_conditional(source: str, url: str, parse, client: httpx.AsyncClient) -> Dict[str, ModelSpec]:
+    """Fetch a source, sending the stored validators so an unchanged feed costs a 304 and no parse.
+
+    `parse` is an async callable taking the streaming response and returning
+    (models, parse_seconds). If the fetch fails, the last successful download
+    of the source is kept.
+    """
+    state = _sources.get(source)
+    headers = {}
+    if state is not None:
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+    try:
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and state is not None:
+                _record(source, "not_modified", saved=state.size, skipped=state.parse_seconds)
+                return state.models
+            response.raise_for_status()
+            models, elapsed = await parse(response)
+            size = response.num_bytes_downloaded
+        _sources[source] = SourceState(models, response.headers.get("etag", ""),
+                                       response.headers.get("last-modified", ""), size, elapsed)
+        _record(source, "downloaded", downloaded=size, parsed=elapsed)
         return models
     except Exception as e:
-        print(f"Error fetching OpenRouter pricing: {e}")
-        return {}
+        print(f"Error fetching {source} pricing: {e}")
+        _record(source, "error")
+        return state.models if state is not None else {}
+
+async def afetch_litellm_pricing(client: httpx.AsyncClient) -> Dict[str, ModelSpec]:
+    """Fetch pricing from LiteLLM without blocking the event loop, parsing as it streams."""
+    return await _afetch_conditional("litellm", LITELLM_URL, _parse_litellm_stream, client)
+
+async def afetch_openrouter_pricing(client: httpx.AsyncClient) -> Dict[str, ModelSpec]:
+    """Fetch pricing from OpenRouter without blocking the event loop."""
+    return await _afetch_conditional("openrouter", OPENROUTER_URL, _parse_openrouter_response, client)
+
+def get_refresh_metrics() -> Dict[str, dict]:
+    """Get per-source download, 304, bytes saved and parse time counters."""
+    return _refresh_metrics
 
 def get_default_models() -> Dict[str, ModelSpec]:
     """Get hardcoded default models as fallback."""
@@ -128,38 +329,396 @@ def get_default_models() -> Dict[str, ModelSpec]:
         "gemini/gemini-1.5-flash": ModelSpec("gemini-1.5-flash", "Google", 1000000, 8192, 0.075, 0.30),
     }
 
+@dataclass
+class MergeReport:
+    counts: Dict[str, int]  # Models returned per source
+    duplicates: int  # Lower-precedence entries dropped because a higher source has the model
+    conflicts: List[dict]  # Duplicates whose prices disagree beyond PRICE_CONFLICT_TOLERANCE
+
+def canonical_model_id(model_id: str) -> str:
+    """Key used to match the same model across sources (e.g. "openai/gpt-4o" -> "gpt-4o")."""
+    return model_id.rsplit("/", 1)[-1].lower()
+
+def _prices_differ(a: ModelSpec, b: ModelSpec) -> bool:
+    return any(abs(x - y) > PRICE_CONFLICT_TOLERANCE * max(x, y)
+               for x, y in ((a.price_input, b.price_input), (a.price_output, b.price_output)))
+
+def merge_sources(results: Dict[str, Dict[str, ModelSpec]]) -> Tuple[Dict[str, ModelSpec], MergeReport]:
+    """Union per-source catalogs, keeping the highest-precedence entry for each model."""
+    merged: Dict[str, ModelSpec] = {}
+    owners: Dict[str, str] = {}  # canonical id -> merged model id
+    report = MergeReport(counts={}, duplicates=0, conflicts=[])
+    for source in sorted(results, key=lambda s: SOURCE_PRECEDENCE.index(s)):
+        models = results[source]
+        report.counts[source] = len(models)
+        added = {}
+        for model_id, spec in models.items():
+            key = canonical_model_id(model_id)
+            if key in owners:
+                report.duplicates += 1
+                winner_id = owners[key]
+                winner = merged[winner_id]
+                if _prices_differ(winner, spec):
+                    report.conflicts.append({
+                        "model": winner_id, "source": winner.source,
+                        "price_input": winner.price_input, "price_output": winner.price_output,
+                        "other_model": model_id, "other_source": source,
+                        "other_price_input": spec.price_input, "other_price_output": spec.price_output})
+                continue
+            merged[model_id] = spec
+            # Prefer the bare id (e.g. "gpt-4o" over "azure/gpt-4o") as the canonical owner
+            if key not in added or model_id.lower() == key:
+                added[key] = model_id
+        owners.update(added)
+    return merged, report
+
+def fetch_models() -> Dict[str, ModelSpec]:
+    """Fetch models from all upstream sources concurrently. Returns an empty dict if all fail."""
+    async def fetch():
+        async with httpx.AsyncClient(timeout=FETCH_TIMEOUT, follow_redirects=True) as client:
+            return await afetch_models(client)
+    return asyncio.run(fetch())
+
+async def _fetch_source(source: str, client: httpx.AsyncClient) -> Dict[str, ModelSpec]:
+    fetchers = {"litellm": afetch_litellm_pricing, "openrouter": afetch_openrouter_pricing}
+    try:
+        return await asyncio.wait_for(fetchers[source](client), SOURCE_DEADLINES[source])
+    except asyncio.TimeoutError:
+        # The cancelled fetch never reached its own fallback, so keep the last good download here
+        print(f"Timed out fetching {source} pricing after {SOURCE_DEADLINES[source]}s")
+        _record(source, "error")
+        state = _sources.get(source)
+        return state.models if state is not None else {}
+
+async def afetch_models(client: httpx.AsyncClient) -> Dict[str, ModelSpec]:
+    """Fetch and merge all sources concurrently, each bounded by its own deadline."""
+    global _last_merge
+    results = await asyncio.gather(*(_fetch_source(source, client) for source in SOURCE_PRECEDENCE))
+    models, report = merge_sources(dict(zip(SOURCE_PRECEDENCE, results)))
+    if report.conflicts:
+        print(f"{len(report.conflicts)} pricing conflicts between sources (kept higher-precedence prices)")
+    _last_merge = report
+    return _priced(models)
+
+def get_merge_report() -> Optional[MergeReport]:
+    """Get the source counts and conflicts from the last upstream fetch."""
+    return _last_merge
+
+def _priced(models: Dict[str, ModelSpec]) -> Dict[str, ModelSpec]:
+    """Filter to keep only models with pricing > 0."""
+    return {k: v for k, v in models.items()
+            if v.price_input > 0 or v.price_output > 0}
+
+def load_disk_cache(path: Path = None) -> Optional[Tuple[Dict[str, ModelSpec], float, Dict[str, SourceState]]]:
+    """Load (models, fetched_at, sources) from the on-disk cache, or None if missing or unreadable."""
+    path = path or MODELS_CACHE_PATH
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("schema") != CACHE_SCHEMA_VERSION:
+            return None
+        sources = {}
+        for source, state in data["sources"].items():
+            models = {k: ModelSpec(**{**v, "provider": sys.intern(v["provider"])}, source=source)
+                      for k, v in state.pop("models").items()}
+            sources[source] = SourceState(models, **state)
+        models, _ = merge_sources({source: state.models for source, state in sources.items()})
+        return _priced(models), float(data["fetched_at"]), sources
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error reading model cache {path}: {e}")
+        return None
+
+def write_disk_cache(sources: Dict[str, SourceState], fetched_at: float, path: Path = None):
+    """Atomically write the per-source catalogs and their validators to the on-disk cache."""
+    path = path or MODELS_CACHE_PATH
+    data = {"schema": CACHE_SCHEMA_VERSION, "fetched_at": fetched_at, "sources": {
+        source: {"etag": state.etag, "last_modified": state.last_modified, "size": state.size,
+                 "parse_seconds": state.parse_seconds,
+                 "models": {k: _spec_fields(v) for k, v in state.models.items()}}
+        for source, state in sources.items()}}
+    try:
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError as e:
+        print(f"Error writing model cache {path}: {e}")
+
+def _spec_fields(spec: ModelSpec) -> dict:
+    fields = asdict(spec)
+    del fields["source"]  # Implied by the source section it is stored under
+    return fields
+
+def _adopt_disk_cache(cached: Tuple[Dict[str, ModelSpec], float, Dict[str, SourceState]]):
+    models, fetched_at, sources = cached
+    _sources.update(sources)
+    _set_models(models, fetched_at)
+
+def _is_stale(fetched_at: float) -> bool:
+    return time.time() - fetched_at > MODELS_CACHE_TTL
+
+def _use_disk_cache_if_newer() -> bool:
+    """Adopt the disk cache if another process refreshed it since our last fetch."""
+    cached = load_disk_cache()
+    if cached and cached[1] > _fetched_at and not _is_stale(cached[1]):
+        _adopt_disk_cache(cached)
+        return True
+    return False
+
+def refresh_models() -> bool:
+    """Refresh the catalog from upstream, updating memory and disk caches.
+
+    Another process may already have refreshed the disk cache, in which case
+    that copy is used instead of fetching. Returns True if fresh data was loaded.
+    """
+    global _last_attempt
+    with _refresh_lock:
+        _last_attempt = time.time()
+        if _use_disk_cache_if_newer():
+            return True
+
+        models = fetch_models()
+        if not models:
+            print("API fetch failed, keeping cached models")
+            return False
+        fetched_at = time.time()
+        _set_models(models, fetched_at)
+        write_disk_cache(dict(_sources), fetched_at)
+        return True
+
+async def arefresh_models(client: httpx.AsyncClient) -> bool:
+    """Async version of refresh_models(). Skips the refresh if one is already running."""
+    global _last_attempt
+    if not _refresh_lock.acquire(blocking=False):
+        return False
+    try:
+        _last_attempt = time.time()
+        if await asyncio.to_thread(_use_disk_cache_if_newer):
+            return True
+
+        models = await afetch_models(client)
+        if not models:
+            print("API fetch failed, keeping cached models")
+            return False
+        fetched_at = time.time()
+        # The new dict is fully built before this single swap, so readers see the old or new catalog, never a mix.
+        # Fingerprinting, diffing and the catalog listeners (history appends with fsync) run off the event loop.
+        await asyncio.to_thread(_set_models, models, fetched_at)
+        await asyncio.to_thread(write_disk_cache, dict(_sources), fetched_at)
+        return True
+    finally:
+        _refresh_lock.release()
+
+def _refresh_in_background():
+    """Start a background refresh unless one is running or was attempted recently."""
+    if _scheduler_task is not None or _refresh_lock.locked() or time.time() - _last_attempt < REFRESH_RETRY_INTERVAL:
+        return
+    threading.Thread(target=refresh_models, name="models-refresh", daemon=True).start()
+
+async def refresh_loop():
+    """Keep the catalog fresh, refreshing whenever it is older than MODELS_CACHE_TTL."""
+    limits = httpx.Limits(max_connections=4, max_keepalive_connections=2)
+    async with httpx.AsyncClient(timeout=FETCH_TIMEOUT, limits=limits, follow_redirects=True) as client:
+        while True:
+            if _is_stale(_fetched_at):
+                refreshed = await arefresh_models(client)
+                delay = MODELS_CACHE_TTL if refreshed else REFRESH_RETRY_INTERVAL
+            else:
+                delay = MODELS_CACHE_TTL - (time.time() - _fetched_at)
+            await asyncio.sleep(max(delay, 1))
+
+async def start_refresh_scheduler():
+    """Start the background refresh task. Use as an app startup handler."""
+    global _scheduler_task
+    if _scheduler_task is None:
+        # Serve whatever is on disk (or defaults) right away; the task fetches if it is stale
+        if not _models_cache:
+            cached = await asyncio.to_thread(load_disk_cache)
+            if cached:
+                await asyncio.to_thread(_adopt_disk_cache, cached)
+            else:
+                await asyncio.to_thread(_set_models, get_default_models(), 0.0)
+        _scheduler_task = asyncio.create_task(refresh_loop())
+
+async def stop_refresh_scheduler():
+    """Stop the background refresh task. Use as an app shutdown handler."""
+    global _scheduler_task
+    if _scheduler_task is not None:
+        _scheduler_task.cancel()
+        try:
+            await _scheduler_task
+        except asyncio.CancelledError:
+            pass
+        _scheduler_task = None
+
 def get_models(force_refresh: bool = False) -> Dict[str, ModelSpec]:
     """Get model specifications. Fetches from APIs with fallback to defaults.
 
+    Cached data is served immediately, even when older than MODELS_CACHE_TTL;
+    stale data triggers a refresh in the background (by the refresh scheduler
+    when it is running, otherwise a thread). Only a cold start with no disk
+    cache and no scheduler blocks on the network.
+
     Args:
         force_refresh: If True, bypass cache and fetch fresh data
 
     Returns:
         Dictionary of model_id -> ModelSpec
     """
-    global _models_cache
-
     # Return cached models if available and not forcing refresh
     if _models_cache and not force_refresh:
+        if _is_stale(_fetched_at):
+            _refresh_in_background()
         return _models_cache
 
-    # Try fetching from LiteLLM first (more comprehensive)
-    models = fetch_litellm_pricing()
-
-    # If LiteLLM failed, try OpenRouter
-    if not models:
-        models = fetch_openrouter_pricing()
+    # Fall back to the disk cache written by an earlier run or another worker
+    if not force_refresh:
+        cached = load_disk_cache()
+        if cached:
+            _adopt_disk_cache(cached)
+            if _is_stale(_fetched_at):
+                _refresh_in_background()
+            return _models_cache
 
-    # If both failed, use defaults
-    if not models:
+    # If the fetch failed and nothing is cached, use defaults
+    if not refresh_models() and not _models_cache:
         print("API fetch failed, using default models")
-        models = get_default_models()
+        _set_models(get_default_models(), 0.0)
 
-    # Filter to keep only models with pricing > 0
-    models = {k: v for k, v in models.items()
-              if v.price_input > 0 or v.price_output > 0}
+    return _models_cache
 
-    # Cache the results
-    _models_cache = models
+def model_fingerprint(model_id: str, spec: ModelSpec) -> bytes:
+    """Content hash of one catalog entry."""
+    return hashlib.blake2b(json.dumps([model_id, *astuple(spec)]).encode(), digest_size=8).digest()
 
-    return models
+def catalog_fingerprints(models: Dict[str, ModelSpec], previous: Dict[str, ModelSpec] = None,
+                         previous_fingerprints: Dict[str, bytes] = None) -> Dict[str, bytes]:
+    """Fingerprint every entry, reusing those of entries equal to the previous catalog's."""
+    previous, previous_fingerprints = previous or {}, previous_fingerprints or {}
+    return {model_id: previous_fingerprints[model_id]
+            if model_id in previous_fingerprints and previous.get(model_id) == spec
+            else model_fingerprint(model_id, spec)
+            for model_id, spec in models.items()}
+
+def catalog_version(models: Dict[str, ModelSpec], fingerprints: Dict[str, bytes] = None) -> str:
+    """Content hash of a model catalog, stable across processes and restarts."""
+    if fingerprints is None:
+        fingerprints = catalog_fingerprints(models)
+    digest = hashlib.sha256()
+    for model_id in sorted(fingerprints):
+        digest.update(fingerprints[model_id])
+    return digest.hexdigest()[:16]
+
+@dataclass(frozen=True)
+class CatalogDiff:
+    """What changed between two catalog versions."""
+    old_version: str
+    new_version: str
+    added: List[str]
+    removed: List[str]
+    repriced: Dict[str, dict]  # model_id -> {"price_input": [old, new], "price_output": [old, new]}
+    changed: List[str]  # Same prices but other fields differ (name, limits, source)
+    providers: List[str]  # Providers with a model in any of the above, before or after
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.repriced or self.changed)
+
+    @property
+    def models(self) -> List[str]:
+        """Every model id the diff touches."""
+        return [*self.added, *self.removed, *self.repriced, *self.changed]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def diff_catalogs(old: Dict[str, ModelSpec], new: Dict[str, ModelSpec], old_fingerprints: Dict[str, bytes],
+                  new_fingerprints: Dict[str, bytes], old_version: str = "", new_version: str = "") -> CatalogDiff:
+    """Diff two catalogs; only entries whose fingerprints differ are compared field by field."""
+    repriced, changed = {}, []
+    for model_id in sorted(old_fingerprints.keys() & new_fingerprints.keys()):
+        if old_fingerprints[model_id] == new_fingerprints[model_id]:
+            continue
+        a, b = old[model_id], new[model_id]
+        if (a.price_input, a.price_output) != (b.price_input, b.price_output):
+            repriced[model_id] = {"price_input": [a.price_input, b.price_input],
+                                  "price_output": [a.price_output, b.price_output]}
+        else:
+            changed.append(model_id)
+    added = sorted(new_fingerprints.keys() - old_fingerprints.keys())
+    removed = sorted(old_fingerprints.keys() - new_fingerprints.keys())
+    providers = {new[m].provider for m in [*added, *repriced, *changed]} | {old[m].provider for m in
+                                                                           [*removed, *repriced, *changed]}
+    return CatalogDiff(old_version, new_version, added, removed, repriced, changed, sorted(providers))
+
+def add_catalog_listener(listener: Callable[[CatalogDiff], None]):
+    """Call listener(diff) whenever the catalog changes version, so caches can drop only what changed.
+
+    The first catalog loaded arrives as a diff from an empty old_version.
+    """
+    _catalog_listeners.append(listener)
+
+def get_catalog_diff(since: str) -> Optional[CatalogDiff]:
+    """What changed from a recent catalog version to the current one (None if it is unknown or too old)."""
+    get_models()
+    version = _catalog_version
+    past, current = _catalog_history.get(since), _catalog_history.get(version)
+    if past is None or current is None:
+        return None
+    return diff_catalogs(past[0], current[0], past[1], current[1], since, version)
+
+def _set_models(models: Dict[str, ModelSpec], fetched_at: float):
+    """Replace the cached catalog, record its version and tell listeners what changed."""
+    global _models_cache, _catalog_version, _catalog_snapshot, _catalog_updated_at, _fetched_at, _fingerprints
+    with _set_models_lock:
+        fingerprints = catalog_fingerprints(models, _models_cache, _fingerprints)
+        version = catalog_version(models, fingerprints)
+        old, old_fingerprints, old_version = _models_cache, _fingerprints, _catalog_version
+        _fetched_at = fetched_at
+        if version == old_version:
+            return
+        _models_cache, _fingerprints = models, fingerprints
+        _catalog_version = version
+        _catalog_snapshot = (version, models)
+        _catalog_updated_at = time.time()
+        _catalog_history[version] = (models, fingerprints)
+        _catalog_history.move_to_end(version)
+        while len(_catalog_history) > CATALOG_HISTORY:
+            _catalog_history.popitem(last=False)
+        diff = diff_catalogs(old, models, old_fingerprints, fingerprints, old_version, version)
+        for listener in list(_catalog_listeners):
+            try:
+                listener(diff)
+            except Exception as e:
+                print(f"Catalog listener {getattr(listener, '__name__', listener)} failed: {e}")
+
+def get_catalog_version() -> str:
+    """Get the content hash of the current catalog, loading it if needed."""
+    get_models()
+    return _catalog_version
+
+def get_catalog_snapshot() -> Tuple[str, Dict[str, ModelSpec]]:
+    """Get the current (version, models) as one consistent pair, loading the catalog if needed.
+
+    Caches keyed by version must take both from here: get_models() and
+    get_catalog_version() read separately can straddle a catalog swap.
+    """
+    get_models()
+    return _catalog_snapshot
+
+def get_catalog_fetched_at() -> float:
+    """Get the time (epoch seconds) the current catalog was fetched upstream (0 for the built-in defaults)."""
+    get_models()
+    return _fetched_at
+
+def get_catalog_updated_at() -> float:
+    """Get the time (epoch seconds) the current catalog version was first loaded."""
+    get_models()
+    return _catalog_updated_at
@@ -0,0 +1,220 @@
+"""Full-stack TCO optimizer: the cheapest model plus one platform per category for a scenario."""
+from bisect import bisect_right, insort
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import heapq
+import math
+import numpy as np
+from calculator import Scenario, scenario_from_dict
+from catalog import ModelCatalog, scenario_costs, cheapest
+from platforms import ScaleCategory, ComplexityLevel, get_all_platforms
+
+OPTIMIZE_MAX_STACKS = 20
+MODEL = "model"  # Category name of the LLM in a stack
+
+@dataclass(frozen=True)
+class StackOption:
+    category: str
+    key: str  # Platform key or model id
+    name: str
+    fixed: float  # $/month regardless of volume
+    cost: float  # $/month at the scenario's volume, fixed part included
+
+@dataclass(frozen=True)
+class Stack:
+    options: Tuple[StackOption, ...]
+
+    @property
+    def total(self) -> float:
+        return sum(o.cost for o in self.options)
+
+    @property
+    def fixed(self) -> float:
+        return sum(o.fixed for o in self.options)
+
+    def to_dict(self) -> dict:
+        model = next(o for o in self.options if o.category == MODEL)
+        platforms = {o.category: {"key": o.key, "name": o.name, "monthly_cost": o.cost, "fixed_cost": o.fixed}
+                     for o in self.options if o.category != MODEL}
+        return {"total_monthly_cost": self.total, "fixed_monthly_cost": self.fixed,
+                "llm_monthly_cost": model.cost, "platform_monthly_cost": self.total - model.cost,
+                "model": {"id": model.key, "name": model.name, "monthly_cost": model.cost}, "platforms": platforms}
+
+@dataclass(frozen=True)
+class Constraints:
+    require: Dict[str, str] = field(default_factory=dict)  # category -> platform key to use
+    exclude: Tuple[str, ...] = ()  # Platform keys never to use
+    skip: Tuple[str, ...] = ()  # Categories to leave out
+    fit: bool = True  # Only platforms that fit the scenario's scale and complexity
+    models: Optional[Tuple[str, ...]] = None
+    providers: Optional[Tuple[str, ...]] = None
+    min_context_window: int = 0
+    min_max_output: int = 0
+    max_fixed_cost: float = math.inf  # Cap on the summed fixed monthly platform cost
+    budget: float = math.inf  # Cap on the total monthly cost
+
+@dataclass(frozen=True)
+class OptimizeResult:
+    stacks: List[Stack]  # Cheapest first; empty if nothing meets the caps
+    unfilled: List[str]  # Categories where no platform met the constraints
+    explored: int  # Search nodes visited
+
+def prune_dominated(options: List[StackOption], k: int) -> List[StackOption]:
+    """Options sorted by cost, dropping any that k others match or beat on both cost and fixed cost.
+
+    Such an option can never be in the k cheapest stacks: swapping it for any
+    of those k gives k stacks that cost no more and fix no more.
+    """
+    options = sorted(options, key=lambda o: (o.cost, o.fixed))
+    kept, seen = [], []  # seen: fixed costs of cheaper options, ascending
+    for option in options:
+        if bisect_right(seen, option.fixed) < k:
+            kept.append(option)
+        insort(seen, option.fixed)
+    return kept
+
+def platform_groups(scenario: Scenario, constraints: Constraints, k: int) -> Tuple[List[List[StackOption]], List[str]]:
+    scale = complexity = None
+    if constraints.fit:
+        try:
+            scale, complexity = ScaleCategory(scenario.scale), ComplexityLevel(scenario.complexity)
+        except ValueError:
+            raise ValueError("Fitting platforms needs a known scale and complexity") from None
+    volume = scenario.monthly_requests
+    groups, unfilled = [], []
+    for category, platforms in get_all_platforms().items():
+        if category in constraints.skip:
+            continue
+        required = constraints.require.get(category)
+        if required is not None and required not in platforms:
+            raise ValueError(f"Unknown {category} platform: {required}")
+        options = [
+            StackOption(category, key, p.name, p.estimated_monthly_base,
+                        p.estimated_monthly_base + p.estimated_per_request * volume)
+            for key, p in platforms.items()
+            if (key == required if required is not None else
+                key not in constraints.exclude and (not constraints.fit or p.fits(scale, complexity)))
+        ]
+        if options:
+            groups.append(prune_dominated(options, k))
+        else:
+            unfilled.append(category)
+    return groups, unfilled
+
+def model_group(catalog: ModelCatalog, scenario: Scenario, constraints: Constraints, k: int) -> List[StackOption]:
+    """The k cheapest models that meet the constraints (models have no fixed cost, so no others can place)."""
+    mask = (catalog.context_window >= constraints.min_context_window) & (catalog.max_output >= constraints.min_max_output)
+    if constraints.models is not None:
+        missing = [m for m in constraints.models if catalog.position(m) is None]
+        if missing:
+            raise ValueError(f"Unknown models: {', '.join(missing[:5])}")
+        allowed = np.zeros(len(catalog), bool)
+        allowed[[catalog.position(m) for m in constraints.models]] = True
+        mask &= allowed
+    if constraints.providers is not None:
+        wanted = {p.lower() for p in constraints.providers}
+        codes = [i for i, p in enumerate(catalog.providers) if p.lower() in wanted]
+        mask &= np.isin(catalog.provider_codes, codes)
+    rows = np.flatnonzero(mask)
+    if not len(rows):
+        raise ValueError("No model meets the constraints")
+    _, monthly = scenario_costs(catalog, scenario)
+    return [StackOption(MODEL, catalog.ids[r], catalog.names[r], 0.0, float(monthly[r]))
+            for r in rows[cheapest(monthly[rows], k)]]
+
+def optimize(catalog: ModelCatalog, scenario: Scenario, constraints: Constraints = Constraints(),
+             k: int = 1) -> OptimizeResult:
+    """The k cheapest stacks (one model, one platform per category) within the constraints.
+
+    Depth-first branch and bound: categories with the widest cost spread are
+    decided first, options within one cheapest first, and a branch stops as
+    soon as its cost plus the cheapest possible rest cannot beat the k-th
+    best stack (or exceed a cap). Dominated options are pruned beforehand.
+    """
+    if not 0 < k <= OPTIMIZE_MAX_STACKS:
+        raise ValueError(f"k must be between 1 and {OPTIMIZE_MAX_STACKS}")
+    groups, unfilled = platform_groups(scenario, constraints, k)
+    groups.append(model_group(catalog, scenario, constraints, k))
+    groups.sort(key=lambda g: g[-1].cost - g[0].cost, reverse=True)
+    # Cheapest cost and fixed cost of everything after each depth
+    rest_cost = [0.0] * (len(groups) + 1)
+    rest_fixed = [0.0] * (len(groups) + 1)
+    for i in range(len(groups) - 1, -1, -1):
+        rest_cost[i] = rest_cost[i + 1] + groups[i][0].cost
+        rest_fixed[i] = rest_fixed[i + 1] + min(o.fixed for o in groups[i])
+
+    best: List[Tuple[float, int, Tuple[StackOption, ...]]] = []  # Max-heap of (-total, -order, options)
+    picks: List[StackOption] = []
+    explored = 0
+
+    def search(depth: int, cost: float, fixed: float):
+        nonlocal explored
+        explored += 1
+        if depth == len(groups):
+            entry = (-cost, -explored, tuple(picks))
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            else:
+                heapq.heapreplace(best, entry)
+            return
+        for option in groups[depth]:
+            bound = cost + option.cost + rest_cost[depth + 1]
+            if bound > constraints.budget or (len(best) == k and bound >= -best[0][0]):
+                break  # Options are sorted by cost, so the rest are no better
+            if fixed + option.fixed + rest_fixed[depth + 1] > constraints.max_fixed_cost:
+                continue
+            picks.append(option)
+            search(depth + 1, cost + option.cost, fixed + option.fixed)
+            picks.pop()
+
+    search(0, 0.0, 0.0)
+    order = {category: i for i, category in enumerate([MODEL, *get_all_platforms()])}
+    stacks = [Stack(tuple(sorted(options, key=lambda o: order[o.category])))
+              for _, _, options in sorted(best, key=lambda e: (-e[0], -e[1]))]
+    return OptimizeResult(stacks, unfilled, explored)
+
+def constraints_from_dict(data: Dict) -> Constraints:
+    """Constraints from JSON-style input. Raises ValueError for invalid input."""
+    known = {"require", "exclude", "skip", "fit", "models", "providers", "min_context_window", "min_max_output",
+             "max_fixed_cost", "budget"}
+    unknown = set(data) - known
+    if unknown:
+        raise ValueError(f"Unknown constraints: {', '.join(sorted(unknown))}")
+    require = data.get("require") or {}
+    if not isinstance(require, dict) or not all(isinstance(v, str) for v in require.values()):
+        raise ValueError("require must map categories to platform keys")
+
+    def strings(name: str) -> Optional[Tuple[str, ...]]:
+        value = data.get(name)
+        if value is None:
+            return None
+        if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+            raise ValueError(f"{name} must be a list of strings")
+        return tuple(value)
+
+    exclude, skip = strings("exclude") or (), strings("skip") or ()
+    unknown = (set(require) | set(skip)) - set(get_all_platforms())
+    if unknown:
+        raise ValueError(f"Unknown categories: {', '.join(sorted(map(str, unknown)))}")
+    fit = data.get("fit", True)
+    if not isinstance(fit, bool):
+        raise ValueError("fit must be true or false")
+    try:
+        numbers = {name: float(data.get(name, default)) for name, default in
+                   (("min_context_window", 0), ("min_max_output", 0), ("max_fixed_cost", math.inf), ("budget", math.inf))}
+    except (TypeError, ValueError):
+        raise ValueError("min_context_window, min_max_output, max_fixed_cost and budget must be numbers") from None
+    return Constraints(require=require, exclude=exclude, skip=skip, fit=fit, models=strings("models"),
+                       providers=strings("providers"), **numbers)
+
+def optimize_from_dict(catalog: ModelCatalog, data: Dict) -> OptimizeResult:
+    """Run the optimizer from JSON-style input: scenario fields plus {"constraints": {...}, "k": n}."""
+    data = dict(data)
+    constraints = data.pop("constraints", None) or {}
+    if not isinstance(constraints, dict):
+        raise ValueError("constraints must be an object")
+    try:
+        k = int(data.pop("k", 1))
+    except (TypeError, ValueError):
+        raise ValueError("k must be an integer") from None
+    return optimize(catalog, scenario_from_dict(data), constraints_from_dict(constraints), k)
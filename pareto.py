@@ -0,0 +1,63 @@
+"""Pareto frontier of models: cheapest per request vs. largest context window vs. largest max output."""
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Tuple
+import numpy as np
+from calculator import Scenario
+from catalog import ModelCatalog, scenario_costs
+
+_frontiers: Dict[tuple, np.ndarray] = {}
+
+def pareto_frontier(cost: np.ndarray, context: np.ndarray, output: np.ndarray) -> np.ndarray:
+    """Rows no other row dominates (cost <=, context >= and output >=, better in at least one), cheapest first.
+
+    Sweeps rows by ascending cost while keeping a staircase of the (context,
+    output) pairs seen so far: contexts descending, outputs ascending, so the
+    best output among contexts >= c is one bisect away. O(n log n) plus the
+    staircase updates, instead of comparing every pair.
+    """
+    # Identical rows cannot dominate each other, so sweep distinct points and expand at the end
+    points = np.stack([cost, -context.astype(np.float64), -output.astype(np.float64)], axis=1)
+    unique, inverse = np.unique(points, axis=0, return_inverse=True)  # By cost, then widest context, longest output
+    inverse = inverse.ravel()
+    contexts: List[float] = []  # Staircase, negated so bisect sees them ascending
+    outputs: List[float] = []  # Ascending
+    keep = np.zeros(len(unique), bool)
+    for i, (_, c, o) in enumerate(unique.tolist()):
+        o = -o
+        # Earlier rows cost no more and differ from this one, so any with context >= -c and output >= o dominates it
+        j = bisect_right(contexts, c)
+        if j and outputs[j - 1] >= o:
+            continue
+        keep[i] = True
+        # Drop staircase points this one covers (context <= -c and output <= o), which start at the bisect point
+        j = k = bisect_left(contexts, c, hi=j)
+        while k < len(outputs) and outputs[k] <= o:
+            k += 1
+        contexts[j:k] = [c]
+        outputs[j:k] = [o]
+    rows = np.flatnonzero(keep[inverse])
+    return rows[np.lexsort((-output[rows], -context[rows], cost[rows]))]
+
+def frontier_key(catalog: ModelCatalog, scenario: Scenario) -> tuple:
+    """Only the inputs of per-request cost change the frontier."""
+    return (catalog.version, scenario.input_tokens, scenario.output_tokens, scenario.effective_iterations,
+            scenario.cache_hit_rate, scenario.scale_discount)
+
+def get_frontier(catalog: ModelCatalog, scenario: Scenario) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Frontier rows for a scenario, cached per catalog version and cost inputs, plus scenario_costs()."""
+    per_request, monthly = scenario_costs(catalog, scenario)
+    key = frontier_key(catalog, scenario)
+    rows = _frontiers.get(key)
+    if rows is None:
+        if len(_frontiers) > 64:
+            _frontiers.clear()
+        rows = _frontiers[key] = pareto_frontier(per_request, catalog.context_window, catalog.max_output)
+    return rows, per_request, monthly
+
+def dominated_by(catalog: ModelCatalog, per_request: np.ndarray, frontier: np.ndarray, row: int) -> np.ndarray:
+    """Frontier rows that dominate a row (empty if it is on the frontier)."""
+    cost, context, output = per_request[frontier], catalog.context_window[frontier], catalog.max_output[frontier]
+    no_worse = (cost <= per_request[row]) & (context >= catalog.context_window[row]) & (output >= catalog.max_output[row])
+    better = ((cost < per_request[row]) | (context > catalog.context_window[row])
+              | (output > catalog.max_output[row]))
+    return frontier[no_worse & better]
@@ -1,6 +1,6 @@
 """Platform and tooling recommendations with TCO considerations."""
-from dataclasses import dataclass
-from typing import Dict, List
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
 from enum import Enum
 
 class ScaleCategory(Enum):
@@ -14,6 +14,16 @@ class ComplexityLevel(Enum):
     MEDIUM = "medium" # Multi-step, some context
     HIGH = "high"     # Complex agents, tool use, long context
 
+# One bit per enum member, so fit lists compile to integer masks
+SCALE_BITS = {s: 1 << i for i, s in enumerate(ScaleCategory)}
+COMPLEXITY_BITS = {c: 1 << i for i, c in enumerate(ComplexityLevel)}
+
+def fit_mask(fits: Iterable[Enum], bits: Dict[Enum, int]) -> int:
+    mask = 0
+    for fit in fits:
+        mask |= bits[fit]
+    return mask
+
 @dataclass
 class PlatformOption:
     name: str
@@ -28,6 +38,15 @@ class PlatformOption:
     scale_fit: List[ScaleCategory]
     complexity_fit: List[ComplexityLevel]
     url: str = ""
+    scale_mask: int = field(init=False, repr=False)
+    complexity_mask: int = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.scale_mask = fit_mask(self.scale_fit, SCALE_BITS)
+        self.complexity_mask = fit_mask(self.complexity_fit, COMPLEXITY_BITS)
+
+    def fits(self, scale: ScaleCategory, complexity: ComplexityLevel) -> bool:
+        return bool(self.scale_mask & SCALE_BITS[scale]) and bool(self.complexity_mask & COMPLEXITY_BITS[complexity])
 
 # LLM/Agent Framework Approaches
 AGENT_FRAMEWORKS = {
@@ -570,17 +589,26 @@ def get_use_case_templates() -> Dict[str, UseCaseTemplate]:
     """Get all use case templates."""
     return USE_CASE_TEMPLATES
 
-def get_recommendations(scale: ScaleCategory, complexity: ComplexityLevel) -> Dict[str, List[str]]:
-    """Get platform recommendations based on scale and complexity."""
-    recommendations = {}
-    all_platforms = get_all_platforms()
+def build_recommendation_matrix() -> Dict[Tuple[ScaleCategory, ComplexityLevel], Dict[str, List[str]]]:
+    """Recommended platform keys per category for every scale and complexity."""
+    return {
+        (scale, complexity): {
+            category: [name for name, platform in platforms.items() if platform.fits(scale, complexity)]
+            for category, platforms in get_all_platforms().items()
+        }
+        for scale in ScaleCategory for complexity in ComplexityLevel
+    }
 
-    for category, platforms in all_platforms.items():
-        suitable = []
-        for name, platform in platforms.items():
-            if scale in platform.scale_fit and complexity in platform.complexity_fit:
-                suitable.append(name)
-        recommendations[category] = suitable
+# The platform lists are static, so every combination is worked out once at import
+RECOMMENDATION_MATRIX = build_recommendation_matrix()
 
-    return recommendations
+def get_recommendations(scale: ScaleCategory, complexity: ComplexityLevel) -> Dict[str, List[str]]:
+    """Get platform recommendations based on scale and complexity (shared, do not modify)."""
+    return RECOMMENDATION_MATRIX[(scale, complexity)]
 
+def get_recommendation_matrix() -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+    """All recommendations keyed by scale value, then complexity value, then category."""
+    matrix: Dict[str, Dict[str, Dict[str, List[str]]]] = {}
+    for (scale, complexity), recommendations in RECOMMENDATION_MATRIX.items():
+        matrix.setdefault(scale.value, {})[complexity.value] = recommendations
+    return matrix
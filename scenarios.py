@@ -0,0 +1,369 @@
+"""Saved scenarios in SQLite (WAL mode), with costs kept current as the catalog changes."""
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from calculator import Scenario, scenario_from_dict
+from catalog import ModelCatalog, evaluate_batch, get_catalog
+from models import CatalogDiff
+
+SCENARIOS_DB_PATH = Path(os.environ.get("THRIFTY_SCENARIOS_DB", Path(__file__).parent / "scenarios.db"))
+SCENARIO_POOL_SIZE = 4
+SCENARIO_BATCH_SIZE = 5000  # Scenarios re-evaluated per transaction
+SCENARIO_MAX_LIST = 500  # Rows per page
+SCENARIO_MAX_TAGS = 20
+SCENARIO_MAX_ID = 2 ** 63 - 1  # SQLite's integer range; larger ids cannot exist (and cannot be bound)
+COST_FIELDS = ("cost_per_request", "monthly_requests", "monthly_cost", "total_monthly_cost")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    model TEXT NOT NULL,
+    scenario TEXT NOT NULL,  -- JSON of calculator.Scenario fields
+    cost_per_request REAL,  -- Costs at catalog_version; NULL while the model is not in the catalog
+    monthly_requests REAL,
+    monthly_cost REAL,
+    total_monthly_cost REAL,
+    catalog_version TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scenarios_owner ON scenarios (owner, id);
+CREATE INDEX IF NOT EXISTS scenarios_owner_cost ON scenarios (owner, monthly_cost);
+CREATE INDEX IF NOT EXISTS scenarios_model ON scenarios (model);
+CREATE TABLE IF NOT EXISTS scenario_tags (
+    tag TEXT NOT NULL,
+    scenario_id INTEGER NOT NULL REFERENCES scenarios (id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, scenario_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scenario_tags_scenario ON scenario_tags (scenario_id);
+"""
+
+class ConnectionPool:
+    """Up to `size` SQLite connections shared by threads; WAL lets readers run alongside the writer."""
+
+    def __init__(self, path: Path, size: int = SCENARIO_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # Durable across app crashes; WAL keeps the file consistent
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for one transaction (committed on success, rolled back on error)."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                opened = self._opened < self.size
+                if opened:
+                    self._opened += 1
+            conn = self._connect() if opened else self._idle.get()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._opened = 0
+
+def clean_tags(tags) -> List[str]:
+    if tags is None:
+        return []
+    if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+        raise ValueError("tags must be a list of strings")
+    tags = sorted({t.strip() for t in tags if t.strip()})
+    if len(tags) > SCENARIO_MAX_TAGS:
+        raise ValueError(f"At most {SCENARIO_MAX_TAGS} tags")
+    return tags
+
+def clean_text(data: Dict, field: str, limit: int, default: str = None) -> str:
+    value = data.get(field, default)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"{field} is required")
+    if len(value) > limit:
+        raise ValueError(f"{field} must be at most {limit} characters")
+    return value.strip()
+
+def costs_for(catalog: ModelCatalog, models: List[str], scenarios: List[Scenario]) -> List[tuple]:
+    """COST_FIELDS per (model, scenario), evaluated together; None for models not in the catalog."""
+    known = [i for i, m in enumerate(models) if catalog.position(m) is not None]
+    out = [(None,) * len(COST_FIELDS)] * len(models)
+    if known:
+        columns = evaluate_batch(catalog, [catalog.position(models[i]) for i in known], [scenarios[i] for i in known])
+        for j, values in enumerate(zip(*(columns[f].tolist() for f in COST_FIELDS))):
+            out[known[j]] = values
+    return out
+
+class ScenarioStore:
+    def __init__(self, path: Path = None):
+        self.pool = ConnectionPool(Path(path or SCENARIOS_DB_PATH))
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _row(self, conn: sqlite3.Connection, row: sqlite3.Row, tags: Optional[List[str]] = None) -> dict:
+        if tags is None:
+            tags = [t for (t,) in conn.execute("SELECT tag FROM scenario_tags WHERE scenario_id = ? ORDER BY tag",
+                                               (row["id"],))]
+        return {"id": row["id"], "owner": row["owner"], "name": row["name"], "model": row["model"],
+                "scenario": json.loads(row["scenario"]), "tags": tags,
+                **{f: row[f] for f in COST_FIELDS}, "catalog_version": row["catalog_version"],
+                "created_at": row["created_at"], "updated_at": row["updated_at"]}
+
+    def _rows(self, conn: sqlite3.Connection, rows: List[sqlite3.Row]) -> List[dict]:
+        """Rows with their tags, fetched in one query."""
+        tags: Dict[int, List[str]] = {r["id"]: [] for r in rows}
+        if rows:
+            marks = ",".join("?" * len(rows))
+            for scenario_id, tag in conn.execute(
+                    f"SELECT scenario_id, tag FROM scenario_tags WHERE scenario_id IN ({marks}) ORDER BY tag", list(tags)):
+                tags[scenario_id].append(tag)
+        return [self._row(conn, r, tags[r["id"]]) for r in rows]
+
+    def create(self, data: Dict) -> dict:
+        """Save {"owner", "model", "name"?, "tags"?, ...scenario fields}, priced against the current catalog."""
+        data = dict(data)
+        owner = clean_text(data, "owner", 100)
+        model = clean_text(data, "model", 200)
+        name = clean_text(data, "name", 200, model)
+        tags = clean_tags(data.pop("tags", None))
+        for field in ("owner", "model", "name"):
+            data.pop(field, None)
+        scenario = scenario_from_dict(data)
+        catalog = get_catalog()
+        costs, = costs_for(catalog, [model], [scenario])
+        now = time.time()
+        with self.pool.connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO scenarios (owner, name, model, scenario, cost_per_request, monthly_requests, monthly_cost,"
+                " total_monthly_cost, catalog_version, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (owner, name, model, json.dumps(asdict(scenario)), *costs, catalog.version, now, now))
+            conn.executemany("INSERT INTO scenario_tags (tag, scenario_id) VALUES (?, ?)",
+                             [(t, cursor.lastrowid) for t in tags])
+            row = conn.execute("SELECT * FROM scenarios WHERE id = ?", (cursor.lastrowid,)).fetchone()
+            return self._row(conn, row, tags)
+
+    def get(self, scenario_id: int) -> Optional[dict]:
+        if not 0 <= scenario_id <= SCENARIO_MAX_ID:
+            return None
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM scenarios WHERE id = ?", (scenario_id,)).fetchone()
+            return self._row(conn, row) if row else None
+
+    def update(self, scenario_id: int, data: Dict) -> Optional[dict]:
+        """Change any of name, tags, model and scenario fields; the rest keep their values."""
+        data = dict(data)
+        if "owner" in data:
+            raise ValueError("owner cannot be changed")
+        if not 0 <= scenario_id <= SCENARIO_MAX_ID:
+            return None
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM scenarios WHERE id = ?", (scenario_id,)).fetchone()
+            if row is None:
+                return None
+            name = clean_text(data, "name", 200, row["name"])
+            model = clean_text(data, "model", 200, row["model"])
+            tags = clean_tags(data.pop("tags")) if "tags" in data else None
+            data.pop("name", None)
+            data.pop("model", None)
+            scenario = scenario_from_dict({**json.loads(row["scenario"]), **data})
+            catalog = get_catalog()
+            costs, = costs_for(catalog, [model], [scenario])
+            conn.execute(
+                "UPDATE scenarios SET name = ?, model = ?, scenario = ?, cost_per_request = ?, monthly_requests = ?,"
+                " monthly_cost = ?, total_monthly_cost = ?, catalog_version = ?, updated_at = ? WHERE id = ?",
+                (name, model, json.dumps(asdict(scenario)), *costs, catalog.version, time.time(), scenario_id))
+            if tags is not None:
+                conn.execute("DELETE FROM scenario_tags WHERE scenario_id = ?", (scenario_id,))
+                conn.executemany("INSERT INTO scenario_tags (tag, scenario_id) VALUES (?, ?)",
+                                 [(t, scenario_id) for t in tags])
+            return self._row(conn, conn.execute("SELECT * FROM scenarios WHERE id = ?", (scenario_id,)).fetchone())
+
+    def delete(self, scenario_id: int) -> bool:
+        if not 0 <= scenario_id <= SCENARIO_MAX_ID:
+            return False
+        with self.pool.connection() as conn:
+            return conn.execute("DELETE FROM scenarios WHERE id = ?", (scenario_id,)).rowcount > 0
+
+    def delete_owner(self, owner: str) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute("DELETE FROM scenarios WHERE owner = ?", (owner,)).rowcount
+
+    @staticmethod
+    def _where(owner: Optional[str], model: Optional[str], tag: Optional[str]) -> tuple:
+        clauses, params = [], []
+        for column, value in (("owner", owner), ("model", model)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if tag is not None:
+            clauses.append("id IN (SELECT scenario_id FROM scenario_tags WHERE tag = ?)")
+            params.append(tag)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def list(self, owner: str = None, model: str = None, tag: str = None, limit: int = 50,
+             before: int = None) -> dict:
+        """Newest first, a page at a time: pass the returned `next` as `before` for the following page."""
+        if not 0 < limit <= SCENARIO_MAX_LIST:
+            raise ValueError(f"limit must be between 1 and {SCENARIO_MAX_LIST}")
+        where, params = self._where(owner, model, tag)
+        if before is not None:
+            where += (" AND" if where else " WHERE") + " id < ?"
+            params.append(before)
+        with self.pool.connection() as conn:
+            rows = conn.execute(f"SELECT * FROM scenarios{where} ORDER BY id DESC LIMIT ?", [*params, limit]).fetchall()
+            return {"scenarios": self._rows(conn, rows), "next": rows[-1]["id"] if len(rows) == limit else None}
+
+    def delta(self, owner: str = None, tag: str = None, baseline: int = None, limit: int = 100) -> Optional[dict]:
+        """Scenarios in save order with their cost differences from a baseline (default: the first saved).
+
+        The count and the cheapest and most expensive scenarios cover the whole
+        selection, not just the first `limit` rows, and come from indexes.
+        """
+        if not 0 < limit <= SCENARIO_MAX_LIST:
+            raise ValueError(f"limit must be between 1 and {SCENARIO_MAX_LIST}")
+        where, params = self._where(owner, None, tag)
+        priced = where + (" AND" if where else " WHERE") + " monthly_cost IS NOT NULL"
+        with self.pool.connection() as conn:
+            rows = conn.execute(f"SELECT * FROM scenarios{where} ORDER BY id LIMIT ?", [*params, limit]).fetchall()
+            if not rows:
+                return None
+            base = rows[0] if baseline is None else conn.execute(
+                "SELECT * FROM scenarios WHERE id = ?", (baseline,)).fetchone()
+            if base is None:
+                raise ValueError(f"Unknown baseline scenario: {baseline}")
+            count = conn.execute(f"SELECT COUNT(*) FROM scenarios{where}", params).fetchone()[0]
+            cheapest = conn.execute(f"SELECT * FROM scenarios{priced} ORDER BY monthly_cost LIMIT 1", params).fetchone()
+            priciest = conn.execute(f"SELECT * FROM scenarios{priced} ORDER BY monthly_cost DESC LIMIT 1",
+                                    params).fetchone()
+            out = []
+            for row in self._rows(conn, rows):
+                if row["monthly_cost"] is None or base["monthly_cost"] is None:
+                    out.append({**row, "delta_per_request": None, "delta_monthly": None, "delta_percent": None})
+                    continue
+                delta = row["monthly_cost"] - base["monthly_cost"]
+                out.append({**row, "delta_per_request": row["cost_per_request"] - base["cost_per_request"],
+                            "delta_monthly": delta,
+                            "delta_percent": delta / base["monthly_cost"] * 100 if base["monthly_cost"] else 0.0})
+            return {"baseline": self._row(conn, base), "count": count, "scenarios": out,
+                    "cheapest": self._row(conn, cheapest) if cheapest else None,
+                    "most_expensive": self._row(conn, priciest) if priciest else None}
+
+    def reevaluate(self, models: Iterable[str] = None, catalog: ModelCatalog = None) -> int:
+        """Re-price stored scenarios (those using `models`, or all) against the catalog, in batches.
+
+        Each batch is read, evaluated in one vectorized call and written back
+        in one transaction, so readers are never blocked for long.
+        """
+        catalog = catalog or get_catalog()
+        models = sorted(set(models)) if models is not None else None
+        updated, last = 0, 0
+        while True:
+            with self.pool.connection() as conn:
+                if models is None:
+                    rows = conn.execute("SELECT id, model, scenario FROM scenarios WHERE id > ? ORDER BY id LIMIT ?",
+                                        (last, SCENARIO_BATCH_SIZE)).fetchall()
+                else:
+                    # Through a temp table so the model index drives the lookup however many models changed
+                    conn.execute("CREATE TEMP TABLE IF NOT EXISTS changed_models (model TEXT PRIMARY KEY)")
+                    conn.execute("DELETE FROM changed_models")
+                    conn.executemany("INSERT INTO changed_models VALUES (?)", [(m,) for m in models])
+                    rows = conn.execute(
+                        "SELECT id, model, scenario FROM scenarios WHERE model IN (SELECT model FROM changed_models)"
+                        " AND id > ? ORDER BY id LIMIT ?", (last, SCENARIO_BATCH_SIZE)).fetchall()
+                if not rows:
+                    return updated
+                costs = costs_for(catalog, [r["model"] for r in rows],
+                                  [Scenario(**json.loads(r["scenario"])) for r in rows])
+                conn.executemany(
+                    "UPDATE scenarios SET cost_per_request = ?, monthly_requests = ?, monthly_cost = ?,"
+                    " total_monthly_cost = ?, catalog_version = ? WHERE id = ?",
+                    [(*c, catalog.version, r["id"]) for r, c in zip(rows, costs)])
+                updated += len(rows)
+                last = rows[-1]["id"]
+
+    def close(self):
+        self.pool.close()
+
+_store: Optional[ScenarioStore] = None
+_store_lock = threading.Lock()
+
+def get_store() -> ScenarioStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ScenarioStore()
+        return _store
+
+def close_store():
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+
+_pending_models: set = set()
+_reevaluating = False
+_pending_lock = threading.Lock()
+
+def _drain_reevaluations():
+    global _reevaluating
+    try:
+        while True:
+            with _pending_lock:
+                models = set(_pending_models)
+                _pending_models.clear()
+                if not models:
+                    # Cleared under the lock, so a listener either sees a running drain or starts a new one
+                    _reevaluating = False
+                    return
+            try:
+                get_store().reevaluate(models)
+            except Exception as e:  # Logged and dropped; the next catalog change tries again
+                print(f"Error re-evaluating saved scenarios: {e}")
+    except BaseException:
+        with _pending_lock:
+            _reevaluating = False
+        raise
+
+def reevaluate_scenarios(diff: CatalogDiff):
+    """Catalog listener: re-price the stored scenarios of every model the change touched.
+
+    That includes changed models, since a new provider means a new cache
+    discount. Runs on a worker thread so a large store never holds up the
+    refresh; changes arriving meanwhile are merged into the next pass, which
+    prices against the latest catalog.
+    """
+    global _reevaluating
+    models = set(diff.models)
+    if not models:
+        return
+    with _pending_lock:
+        _pending_models.update(models)
+        if _reevaluating:
+            return
+        _reevaluating = True
+    threading.Thread(target=_drain_reevaluations, name="scenario-reevaluate", daemon=True).start()
@@ -0,0 +1,85 @@
+"""Typo-tolerant model search: a trigram index over model ids, names and providers."""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import re
+import numpy as np
+from catalog import ModelCatalog, get_catalog
+
+SEARCH_LIMIT = 10
+SEARCH_MIN_SCORE = 0.45  # Mean word score a model needs to match
+WORD_MIN_SCORE = 0.5  # Share of a word's trigrams below which the word counts as missing
+
+def normalize(text: str) -> str:
+    """Lowercase words separated by single spaces (so "gpt-4o" and "GPT 4o" match)."""
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+def trigrams(word: str) -> set:
+    """Trigrams of a word padded at both ends, so short words and word starts still match."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+@dataclass(frozen=True, eq=False)
+class SearchIndex:
+    version: str
+    texts: List[str]  # Normalized "id name provider" per catalog row
+    lengths: np.ndarray  # len(texts[row])
+    postings: Dict[str, np.ndarray]  # trigram -> rows containing it (int32, ascending, unique)
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT, rows: Optional[np.ndarray] = None) -> List[tuple]:
+        """Best (row, score) matches for a query, best first.
+
+        Each query word scores the share of its trigrams a model contains (0
+        below WORD_MIN_SCORE, so stray shared trigrams do not count); a model's
+        score is the mean over words, plus 1 if the normalized query appears
+        verbatim. Ties go to shorter names. `rows` restricts the
+        candidates (e.g. to one provider).
+        """
+        words = normalize(query).split()
+        n = len(self.texts)
+        if not words or not n or limit <= 0:
+            return []
+        score = np.zeros(n)
+        for word in words:
+            grams = trigrams(word)
+            hits = [self.postings[g] for g in grams if g in self.postings]
+            if hits:
+                word_score = np.bincount(np.concatenate(hits), minlength=n) / len(grams)
+                score += np.where(word_score >= WORD_MIN_SCORE, word_score, 0)
+        score /= len(words)
+        if rows is not None:
+            allowed = np.zeros(n, bool)
+            allowed[rows] = True
+            score[~allowed] = 0
+        candidates = np.flatnonzero(score >= SEARCH_MIN_SCORE)
+        if not len(candidates):
+            return []
+        phrase = " ".join(words)
+        score = score[candidates] + np.fromiter((phrase in self.texts[r] for r in candidates), float, len(candidates))
+        # Prefer higher scores, then shorter texts (base models over long variants)
+        order = np.lexsort((self.lengths[candidates], -score))[:limit]
+        return [(int(candidates[i]), float(score[i])) for i in order]
+
+def build_search_index(catalog: ModelCatalog) -> SearchIndex:
+    texts = [normalize(f"{model_id} {name} {catalog.provider(row)}")
+             for row, (model_id, name) in enumerate(zip(catalog.ids, catalog.names))]
+    postings: Dict[str, List[int]] = {}
+    for row, text in enumerate(texts):
+        for gram in set().union(*(trigrams(w) for w in text.split())):
+            postings.setdefault(gram, []).append(row)
+    return SearchIndex(
+        version=catalog.version,
+        texts=texts,
+        lengths=np.fromiter(map(len, texts), np.int32, len(texts)),
+        postings={g: np.array(rows, np.int32) for g, rows in postings.items()},
+    )
+
+_search_index: Optional[SearchIndex] = None
+
+def get_search_index(catalog: Optional[ModelCatalog] = None) -> SearchIndex:
+    """Get the search index for `catalog` (default: the current one), rebuilt when the catalog version changes."""
+    global _search_index
+    catalog = catalog or get_catalog()
+    index = _search_index
+    if index is None or index.version != catalog.version:
+        index = _search_index = build_search_index(catalog)
+    return index
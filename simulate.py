@@ -0,0 +1,278 @@
+"""Monte Carlo cost distributions: sample uncertain scenario inputs and report monthly cost percentiles per model."""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import math
+import multiprocessing
+import os
+import threading
+import numpy as np
+from calculator import Scenario, PLATFORM_BASE_COSTS, DAYS_PER_MONTH, MAX_SCENARIO_VALUE, scenario_from_dict
+from catalog import ModelCatalog
+
+# Scenario fields that can be given a distribution, in the order samples are drawn
+SAMPLED_FIELDS = ("input_tokens", "output_tokens", "daily_users", "requests_per_user", "iterations", "cache_hit_rate")
+INTEGER_FIELDS = {"input_tokens", "output_tokens", "daily_users", "iterations"}
+DISTRIBUTIONS = {
+    "uniform": ("low", "high"),
+    "normal": ("mean", "std"),
+    "lognormal": ("median", "sigma"),  # or ("median", "p90")
+    "triangular": ("low", "mode", "high"),
+    "beta": ("a", "b"),
+}
+PERCENTILES = (50, 90, 99)
+SIM_MAX_SIGMA = 5.0  # Lognormal spread; already puts p99 over 100000x the median, and keeps samples finite
+
+SIM_CHUNK = 4096  # Samples per seeded chunk; results do not depend on pool size
+SIM_MODEL_BLOCK = 256  # Models evaluated at once within a chunk (bounds memory)
+SIM_SUM_GROUPS = 64  # Mean sums are kept per run of consecutive chunks, at most this many runs per simulation
+SIM_MAX_SAMPLES = 10_000_000
+SIM_WORKERS = int(os.environ.get("THRIFTY_SIM_WORKERS", os.cpu_count() or 1))
+# Percentiles come from per-model histograms of log10(monthly cost), which merge
+# across chunks and processes; linear interpolation within a bin keeps the error well under 1%
+HIST_MIN_LOG10 = -4  # $0.0001/month
+HIST_MAX_LOG10 = 9  # $1B/month
+HIST_BINS_PER_DECADE = 200
+HIST_BINS = (HIST_MAX_LOG10 - HIST_MIN_LOG10) * HIST_BINS_PER_DECADE
+
+@dataclass(frozen=True)
+class Distribution:
+    kind: str  # "constant" or a key of DISTRIBUTIONS
+    params: Tuple[float, ...]
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        p = self.params
+        if self.kind == "constant":
+            return np.full(n, p[0])
+        if self.kind == "uniform":
+            return rng.uniform(p[0], p[1], n)
+        if self.kind == "normal":
+            return rng.normal(p[0], p[1], n)
+        if self.kind == "lognormal":
+            return rng.lognormal(math.log(p[0]), p[1], n)
+        if self.kind == "triangular":
+            return rng.triangular(p[0], p[1], p[2], n)
+        return rng.beta(p[0], p[1], n)
+
+def distribution_from_dict(field: str, spec) -> Distribution:
+    """Parse a number (a constant) or {"dist": kind, ...params}; raises ValueError."""
+    if isinstance(spec, (int, float)) and not isinstance(spec, bool):
+        return Distribution("constant", (float(getattr(scenario_from_dict({field: spec}), field)),))
+    if not isinstance(spec, dict) or spec.get("dist") not in DISTRIBUTIONS:
+        raise ValueError(f"{field} must be a number or {{\"dist\": one of {', '.join(DISTRIBUTIONS)}, ...}}")
+    kind = spec["dist"]
+    names = DISTRIBUTIONS[kind]
+    if kind == "lognormal" and "p90" in spec and "sigma" not in spec:
+        names = ("median", "p90")
+    unknown = set(spec) - {"dist", *names}
+    if unknown:
+        raise ValueError(f"Unknown {kind} parameters for {field}: {', '.join(sorted(unknown))}")
+    try:
+        params = [float(spec[name]) for name in names]
+    except KeyError as e:
+        raise ValueError(f"{field} {kind} distribution needs {e.args[0]}") from None
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"{field} distribution parameters must be numbers") from None
+    for name, value in zip(names, params):
+        if not math.isfinite(value):
+            raise ValueError(f"{field} {kind} {name} must be a finite number")
+        if abs(value) > MAX_SCENARIO_VALUE:
+            raise ValueError(f"{field} {kind} {name} must be at most {MAX_SCENARIO_VALUE:g} in magnitude")
+    if kind == "lognormal":
+        if params[0] <= 0:
+            raise ValueError(f"{field} lognormal median must be positive")
+        if names[1] == "p90":
+            if params[1] < params[0]:
+                raise ValueError(f"{field} lognormal p90 must not be below the median")
+            params[1] = math.log(params[1] / params[0]) / 1.2815515655446004  # z-score of the 90th percentile
+    if kind in ("uniform", "triangular") and not params[0] <= params[-1]:
+        raise ValueError(f"{field} {kind} low must not exceed high")
+    if kind == "triangular" and not params[0] <= params[1] <= params[2]:
+        raise ValueError(f"{field} triangular mode must be between low and high")
+    if kind in ("normal", "lognormal") and params[1] < 0:
+        raise ValueError(f"{field} {kind} spread must not be negative")
+    if kind == "lognormal" and params[1] > SIM_MAX_SIGMA:
+        raise ValueError(f"{field} lognormal spread is too wide (sigma at most {SIM_MAX_SIGMA:g})")
+    if kind == "beta" and not (params[0] > 0 and params[1] > 0):
+        raise ValueError(f"{field} beta a and b must be positive")
+    return Distribution(kind, tuple(params))
+
+def draw(distributions: Dict[str, Distribution], rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+    """One chunk of samples per field, clipped to the values a scenario allows."""
+    samples = {}
+    for field in SAMPLED_FIELDS:
+        values = np.maximum(distributions[field].sample(rng, n), 0)
+        if field in INTEGER_FIELDS:
+            values = np.floor(values)
+        if field == "cache_hit_rate":
+            values = np.minimum(values, 1)
+        samples[field] = values
+    return samples
+
+def chunk_histograms(columns: Tuple[np.ndarray, np.ndarray, np.ndarray], distributions: Dict[str, Distribution],
+                     multiplier: float, scale_discount: float, chunks: List[Tuple[np.random.SeedSequence, int]],
+                     group: int = 1):
+    """Histogram counts, sums, minimums and maximums of monthly cost for a run of (seed, size) chunks.
+
+    Counts are int32 (a run never exceeds SIM_MAX_SAMPLES) with HIST_BINS + 1
+    columns per model; column 0 counts costs below the histogram range
+    (including zero). Sums have one row per `group` consecutive chunks.
+    """
+    price_input, price_output, discount = columns
+    m = len(price_input)
+    # Monthly cost is linear in three per-sample terms, so a chunk is one matrix product:
+    # price_input * full_input - price_input * (1 - discount) * cached_input + price_output * output
+    coefficients = np.stack([price_input, -price_input * (1 - discount), price_output], axis=1)
+    offsets = np.arange(min(m, SIM_MODEL_BLOCK))[:, None] * (HIST_BINS + 1)
+    counts = np.zeros((m, HIST_BINS + 1), np.int32)
+    sums = np.zeros((-(-len(chunks) // group), m))
+    low = np.full(m, np.inf)
+    high = np.full(m, -np.inf)
+    for i, (seed, size) in enumerate(chunks):
+        s = draw(distributions, np.random.default_rng(seed), size)
+        effective_iterations = np.where(s["iterations"] == 0, 1, s["iterations"]) * multiplier
+        monthly_units = s["daily_users"] * s["requests_per_user"] * DAYS_PER_MONTH * effective_iterations / 1000000
+        full_input = s["input_tokens"] * monthly_units * scale_discount
+        terms = np.stack([full_input, full_input * s["cache_hit_rate"], s["output_tokens"] * monthly_units * scale_discount])
+        for start in range(0, m, SIM_MODEL_BLOCK):
+            block = slice(start, start + SIM_MODEL_BLOCK)
+            monthly = coefficients[block] @ terms
+            np.maximum(monthly, 0, out=monthly)  # Rounding can leave -0.0 or tiny negatives
+            sums[i // group, block] += monthly.sum(axis=1)
+            low[block] = np.minimum(low[block], monthly.min(axis=1))
+            high[block] = np.maximum(high[block], monthly.max(axis=1))
+            with np.errstate(divide="ignore"):
+                bins = np.log10(monthly)
+            bins -= HIST_MIN_LOG10
+            bins *= HIST_BINS_PER_DECADE
+            bins += 1
+            np.clip(bins, 0, HIST_BINS, out=bins)
+            bins = bins.astype(np.intp)
+            rows = len(bins)
+            bins += offsets[:rows]
+            counts[block] += np.bincount(bins.ravel(), minlength=rows * (HIST_BINS + 1)).reshape(rows, -1).astype(np.int32)
+    return counts, sums, low, high
+
+def histogram_percentiles(counts: np.ndarray, low: float, high: float, percentiles=PERCENTILES) -> List[float]:
+    """Percentiles of one model's cost histogram, interpolated within bins and clamped to the observed range."""
+    cumulative = np.cumsum(counts)
+    total = cumulative[-1]
+    out = []
+    for q in percentiles:
+        rank = q / 100 * total
+        b = int(np.searchsorted(cumulative, rank))
+        if b == 0:
+            out.append(0.0)
+            continue
+        before = cumulative[b - 1]
+        fraction = (rank - before) / counts[b] if counts[b] else 0.0
+        value = 10 ** (HIST_MIN_LOG10 + (b - 1 + fraction) / HIST_BINS_PER_DECADE)
+        out.append(float(min(max(value, low), high)))
+    return out
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ProcessPoolExecutor:
+    """Shared worker pool, started on first use. Workers are spawned, not forked, because
+    the server process runs threads and an event loop."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(SIM_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+def simulate(catalog: ModelCatalog, distributions: Dict[str, Distribution], base: Scenario = Scenario(),
+             samples: int = 100_000, seed: int = 0, models: Optional[List[str]] = None,
+             workers: int = SIM_WORKERS) -> dict:
+    """Monthly LLM cost percentiles per model over `samples` scenarios drawn from `distributions`.
+
+    Fields without a distribution are fixed at `base`. Every chunk of
+    SIM_CHUNK samples has its own child of SeedSequence(seed), and sums are
+    added in runs of chunks that do not depend on the task split, so the same
+    seed gives the same results whatever the number of workers.
+    """
+    if not 0 < samples <= SIM_MAX_SAMPLES:
+        raise ValueError(f"samples must be between 1 and {SIM_MAX_SAMPLES:,}")
+    if models is None:
+        rows = np.arange(len(catalog))
+    else:
+        missing = [m for m in models if catalog.position(m) is None]
+        if missing:
+            raise ValueError(f"Unknown models: {', '.join(missing[:5])}")
+        rows = np.array([catalog.position(m) for m in models], np.intp)
+    distributions = {f: distributions.get(f) or Distribution("constant", (float(getattr(base, f)),))
+                     for f in SAMPLED_FIELDS}
+    columns = (catalog.price_input[rows], catalog.price_output[rows], catalog.cache_discount[rows])
+    seeds = np.random.SeedSequence(seed).spawn(-(-samples // SIM_CHUNK))
+    chunks = [(s, min(SIM_CHUNK, samples - i * SIM_CHUNK)) for i, s in enumerate(seeds)]
+    group = -(-len(chunks) // SIM_SUM_GROUPS)
+    groups = -(-len(chunks) // group)
+    args = (columns, distributions, base.complexity_multiplier, base.scale_discount)
+
+    workers = max(1, min(workers, groups))
+    if workers == 1:
+        counts, sums, low, high = chunk_histograms(*args, chunks, group)
+    else:
+        # One task per worker, each a whole number of sum groups; every task ships a full
+        # histogram, so they are merged as they arrive rather than held until the last one
+        per_task = -(-groups // workers) * group
+        pool = get_pool()
+        futures = {pool.submit(chunk_histograms, *args, chunks[i:i + per_task], group): i // group
+                   for i in range(0, len(chunks), per_task)}
+        m = len(rows)
+        counts = np.zeros((m, HIST_BINS + 1), np.int64)
+        sums = np.zeros((groups, m))
+        low = np.full(m, np.inf)
+        high = np.full(m, -np.inf)
+        for future in as_completed(futures):
+            task_counts, task_sums, task_low, task_high = future.result()
+            first = futures.pop(future)
+            counts += task_counts
+            sums[first:first + len(task_sums)] = task_sums
+            np.minimum(low, task_low, out=low)
+            np.maximum(high, task_high, out=high)
+            del future, task_counts
+    means = sums.sum(axis=0) / samples
+
+    out = []
+    for i, row in enumerate(rows):
+        p50, p90, p99 = histogram_percentiles(counts[i], low[i], high[i])
+        out.append({"id": catalog.ids[row], "name": catalog.names[row], "provider": catalog.provider(row),
+                    "mean": float(means[i]), "p50": p50, "p90": p90, "p99": p99,
+                    "min": float(low[i]), "max": float(high[i])})
+    return {"samples": samples, "seed": seed, "platform_cost": PLATFORM_BASE_COSTS.get(base.scale, 50), "models": out}
+
+def simulate_from_dict(catalog: ModelCatalog, data: Dict) -> dict:
+    """Run a simulation from JSON-style input:
+    {"distributions": {field: number or {"dist": ...}}, "base": {...}, "samples": n, "seed": n, "models": [...]}.
+
+    Raises ValueError for invalid input.
+    """
+    unknown = set(data) - {"distributions", "base", "samples", "seed", "models"}
+    if unknown:
+        raise ValueError(f"Unknown simulation fields: {', '.join(sorted(unknown))}")
+    specs = data.get("distributions") or {}
+    if not isinstance(specs, dict):
+        raise ValueError("distributions must be an object")
+    bad = set(specs) - set(SAMPLED_FIELDS)
+    if bad:
+        raise ValueError(f"Cannot sample: {', '.join(sorted(bad))} (only {', '.join(SAMPLED_FIELDS)})")
+    base = data.get("base") or {}
+    if not isinstance(base, dict):
+        raise ValueError("base must be an object")
+    models = data.get("models")
+    if models is not None and (not isinstance(models, list) or not all(isinstance(m, str) for m in models)):
+        raise ValueError("models must be a list of model ids")
+    samples, seed = data.get("samples", 100_000), data.get("seed", 0)
+    if not all(isinstance(v, int) and not isinstance(v, bool) for v in (samples, seed)) or seed < 0:
+        raise ValueError("samples and seed must be non-negative integers")
+    return simulate(catalog, {f: distribution_from_dict(f, spec) for f, spec in specs.items()},
+                    scenario_from_dict(base), samples, seed, models)
@@ -0,0 +1,162 @@
+"""Parameter sweeps: evaluate a Cartesian grid of scenarios over the model catalog by broadcasting."""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+import io
+import json
+import numpy as np
+from calculator import (Scenario, COMPLEXITY_MULTIPLIERS, SCALE_DISCOUNTS, PLATFORM_BASE_COSTS, DAYS_PER_MONTH,
+                        scenario_from_dict)
+from catalog import ModelCatalog
+
+METRICS = ("cost_per_request", "monthly_cost", "total_monthly_cost")
+SWEEP_MAX_CELLS = 5_000_000  # ~40 MB of float64 results
+SWEEP_MAX_AXIS = 1000  # Values per axis
+SWEEP_MAX_JSON_CELLS = 250_000  # ~5 MB of JSON; larger results are only sent as .npz
+
+@dataclass(frozen=True, eq=False)
+class SweepResult:
+    dims: List[str]  # "model" first, then the swept fields in request order
+    coords: Dict[str, list]  # dim -> values along it
+    values: np.ndarray  # float64, one axis per dim
+    metric: str = "monthly_cost"
+
+    @property
+    def shape(self) -> tuple:
+        return self.values.shape
+
+    def select(self, **coords) -> "SweepResult":
+        """Slice out single coordinate values, dropping those dims, e.g. select(complexity="high")."""
+        dims, values, kept = list(self.dims), self.values, dict(self.coords)
+        for dim, value in coords.items():
+            if dim not in dims:
+                raise ValueError(f"Unknown dimension: {dim}")
+            try:
+                index = kept[dim].index(value)
+            except ValueError:
+                raise ValueError(f"{value!r} is not a {dim} in this sweep") from None
+            values = np.take(values, index, axis=dims.index(dim))
+            dims.remove(dim)
+            del kept[dim]
+        return SweepResult(dims, kept, values, self.metric)
+
+    def to_dict(self) -> dict:
+        """JSON-ready form: values are flattened in row-major order over dims."""
+        return {"metric": self.metric, "dims": self.dims, "shape": list(self.shape),
+                "coords": self.coords, "values": self.values.ravel().tolist()}
+
+    def to_npz(self, **meta) -> bytes:
+        """Compact binary form for large grids: an .npz with the `values` array and
+        a JSON `meta` string (metric, dims, coords and any extra fields)."""
+        buffer = io.BytesIO()
+        header = json.dumps({"metric": self.metric, "dims": self.dims, "coords": self.coords, **meta})
+        np.savez(buffer, values=self.values, meta=np.array(header))
+        return buffer.getvalue()
+
+def axis_values(field: str, spec) -> list:
+    """Normalized values for one swept field.
+
+    `spec` is either a list of values or {"start", "stop", "num", "log"} for
+    evenly (or geometrically) spaced numbers. Every value is validated as a
+    scenario field, so integer fields drop fractions as in scenario_from_dict().
+    """
+    if isinstance(spec, dict):
+        unknown = set(spec) - {"start", "stop", "num", "log"}
+        if unknown:
+            raise ValueError(f"Unknown range keys for {field}: {', '.join(sorted(unknown))}")
+        try:
+            start, stop, num = float(spec["start"]), float(spec["stop"]), int(spec.get("num", 10))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"{field} range needs numeric start and stop") from None
+        if not 0 < num <= SWEEP_MAX_AXIS:
+            raise ValueError(f"{field} range num must be between 1 and {SWEEP_MAX_AXIS}")
+        if spec.get("log"):
+            if start <= 0 or stop <= 0:
+                raise ValueError(f"{field} log range needs positive bounds")
+            spec = np.geomspace(start, stop, num).tolist()
+        else:
+            spec = np.linspace(start, stop, num).tolist()
+    if not isinstance(spec, list) or not spec:
+        raise ValueError(f"{field} must be a non-empty list of values or a range")
+    if len(spec) > SWEEP_MAX_AXIS:
+        raise ValueError(f"{field} has more than {SWEEP_MAX_AXIS} values")
+    return [getattr(scenario_from_dict({field: value}), field) for value in spec]
+
+def sweep(catalog: ModelCatalog, axes: Dict[str, Sequence], base: Scenario = Scenario(),
+          models: Optional[List[str]] = None, metric: str = "monthly_cost") -> SweepResult:
+    """Evaluate `metric` for every model and every combination of the swept fields.
+
+    `axes` maps scenario fields to the (already normalized) values to sweep;
+    fields not swept come from `base`. Each swept field gets its own array
+    axis and the formulas broadcast across all of them, in the same operation
+    order as calculator.calculate().
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of: {', '.join(METRICS)}")
+    if models is None:
+        rows = np.arange(len(catalog))
+        model_ids = list(catalog.ids)
+    else:
+        missing = [m for m in models if catalog.position(m) is None]
+        if missing:
+            raise ValueError(f"Unknown models: {', '.join(missing[:5])}")
+        rows = np.array([catalog.position(m) for m in models], np.intp)
+        model_ids = list(models)
+    dims = ["model", *axes]
+    shape = (len(rows), *(len(v) for v in axes.values()))
+    cells = int(np.prod(shape, dtype=np.int64))
+    if cells > SWEEP_MAX_CELLS:
+        raise ValueError(f"Sweep has {cells:,} cells, the limit is {SWEEP_MAX_CELLS:,}")
+
+    def along(field: str, convert=float) -> np.ndarray:
+        """Values of a field shaped to broadcast along its own dim (or a scalar from base)."""
+        if field not in axes:
+            return np.float64(convert(getattr(base, field)))
+        column = np.array([convert(v) for v in axes[field]], np.float64)
+        return column.reshape([-1 if d == field else 1 for d in dims])
+
+    def model_column(column: np.ndarray) -> np.ndarray:
+        return column[rows].reshape([-1] + [1] * len(axes))
+
+    input_tokens = along("input_tokens")
+    output_tokens = along("output_tokens")
+    daily_users = along("daily_users")
+    requests_per_user = along("requests_per_user")
+    hit_rate = along("cache_hit_rate")
+    iterations = along("iterations", lambda i: i or 1)
+    multiplier = along("complexity", lambda c: COMPLEXITY_MULTIPLIERS.get(c, 1.0))
+    scale_discount = along("scale", lambda s: SCALE_DISCOUNTS.get(s, 1.0))
+    platform = along("scale", lambda s: PLATFORM_BASE_COSTS.get(s, 50))
+    effective_iterations = iterations * multiplier
+
+    full_input_cost = (input_tokens * effective_iterations / 1000000) * model_column(catalog.price_input) * scale_discount
+    cached_input_cost = full_input_cost * model_column(catalog.cache_discount)
+    input_cost = full_input_cost * (1 - hit_rate) + cached_input_cost * hit_rate
+    output_cost = (output_tokens * effective_iterations / 1000000) * model_column(catalog.price_output) * scale_discount
+    values = input_cost + output_cost
+    if metric != "cost_per_request":
+        values = values * (daily_users * requests_per_user * DAYS_PER_MONTH)
+        if metric == "total_monthly_cost":
+            values = values + platform
+    if values.shape != shape:  # Some swept fields do not affect the metric
+        values = np.broadcast_to(values, shape).copy()
+    return SweepResult(dims, {"model": model_ids, **{f: list(v) for f, v in axes.items()}}, values, metric)
+
+def sweep_from_dict(catalog: ModelCatalog, data: Dict) -> SweepResult:
+    """Run a sweep from JSON-style input: {"axes": {field: values or range}, "base": {...}, "models": [...], "metric": ...}.
+
+    Raises ValueError for invalid input.
+    """
+    unknown = set(data) - {"axes", "base", "models", "metric"}
+    if unknown:
+        raise ValueError(f"Unknown sweep fields: {', '.join(sorted(unknown))}")
+    axes = data.get("axes") or {}
+    if not isinstance(axes, dict):
+        raise ValueError("axes must be an object")
+    base = data.get("base") or {}
+    if not isinstance(base, dict):
+        raise ValueError("base must be an object")
+    models = data.get("models")
+    if models is not None and (not isinstance(models, list) or not all(isinstance(m, str) for m in models)):
+        raise ValueError("models must be a list of model ids")
+    return sweep(catalog, {field: axis_values(field, spec) for field, spec in axes.items()},
+                 scenario_from_dict(base), models, data.get("metric", "monthly_cost"))
@@ -0,0 +1,12 @@
+"""Shared fixtures: a catalog seeded from the built-in defaults, so nothing touches the network."""
+import time
+import pytest
+import models
+
+@pytest.fixture
+def default_catalog(tmp_path, monkeypatch):
+    """Load the default models as a freshly fetched catalog, with the disk cache kept in tmp_path."""
+    monkeypatch.setattr(models, "MODELS_CACHE_PATH", tmp_path / "models.json")
+    specs = models.get_default_models()
+    models._set_models(specs, time.time())
+    return specs
@@ -0,0 +1,95 @@
+"""Record the page script's cost outputs for test_calculator.py. Needs node; run after changing the page formulas.
+
+    python tests/record_js_parity.py
+"""
+from pathlib import Path
+import itertools
+import json
+import random
+import subprocess
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURE = Path(__file__).parent / "js_parity.json"
+# Page functions the calculator panel runs, copied verbatim from main.py's script
+FUNCTIONS = ("parseScenario", "computeRequestCost", "computeVolume", "renderCalculation", "getCacheDiscount",
+             "calculatePlatformCosts", "getComplexityMultiplier", "getScaleDiscount")
+MODELS = {
+    "claude-3-5-sonnet": {"name": "Claude 3.5 Sonnet", "provider": "Anthropic", "price_input": 3.0, "price_output": 15.0},
+    "gpt-4o-mini": {"name": "GPT-4o mini", "provider": "OpenAI", "price_input": 0.15, "price_output": 0.6},
+    "gemini-1.5-flash": {"name": "Gemini 1.5 Flash", "provider": "Google", "price_input": 0.075, "price_output": 0.3},
+    "deepseek-chat": {"name": "DeepSeek Chat", "provider": "DeepSeek", "price_input": 0.27, "price_output": 1.1},
+    "llama-3.1-405b": {"name": "Llama 3.1 405B", "provider": "meta-llama", "price_input": 2.7, "price_output": 2.7},
+    "free-model": {"name": "Free", "provider": "OpenRouter", "price_input": 0.0, "price_output": 0.0},
+}
+
+HARNESS = """
+const fs = require('fs');
+const cases = JSON.parse(fs.readFileSync(0, 'utf8'));
+const models = cases.models;
+let current = {};
+const element = id => ({ value: current[id] ?? '', textContent: '', innerHTML: '' });
+const document = { getElementById: id => element(id) };
+const window = {};
+const calc = {};
+%s
+const results = cases.inputs.map(inputs => {
+    current = { 'scale-select': inputs.scale, 'complexity-select': inputs.complexity };
+    calc.requestCost = computeRequestCost(inputs);
+    calc.volume = computeVolume(inputs);
+    const summary = renderCalculation(inputs);
+    const cost = calc.requestCost;
+    return {
+        cost_per_request: summary.costPerRequest, input_cost: cost.inputCost, output_cost: cost.outputCost,
+        cache_savings: cost.cacheSavings, daily_requests: calc.volume.dailyRequests,
+        monthly_requests: summary.monthlyRequests, monthly_cost: summary.monthlyCost,
+        platform_cost: summary.platformCost, total_monthly_cost: summary.totalMonthlyCost,
+        effective_iterations: cost.effectiveIterations, complexity_multiplier: cost.complexityMultiplier,
+        scale_discount: cost.scaleDiscount, cache_discount: cost.cacheDiscount
+    };
+});
+process.stdout.write(JSON.stringify(results));
+"""
+
+def extract_function(source: str, name: str) -> str:
+    """The text of `function name(...) {...}`, found by matching braces."""
+    start = source.index(f"function {name}(")
+    depth = 0
+    for i in range(source.index("{", start), len(source)):
+        depth += {"{": 1, "}": -1}.get(source[i], 0)
+        if depth == 0:
+            return source[start:i + 1]
+    raise ValueError(f"Unbalanced braces in {name}")
+
+def page_inputs(count: int = 150, seed: int = 10) -> list:
+    """Calculator form values as the page reads them (strings), covering every model, scale and complexity."""
+    rng = random.Random(seed)
+    grid = list(itertools.product(MODELS, ("startup", "growth", "scale", "enterprise"), ("low", "medium", "high")))
+    rng.shuffle(grid)
+    inputs = []
+    for i in range(count):
+        model, scale, complexity = grid[i % len(grid)]
+        inputs.append({
+            "model": model, "scale": scale, "complexity": complexity,
+            "inputTokens": str(rng.choice([1, 250, 1000, 4096, 128000]) + rng.choice([0, 0, 0.7])),
+            "outputTokens": str(rng.choice([1, 100, 500, 2048, 16384])),
+            "iterations": str(rng.choice([1, 1, 2, 3, 7])),
+            "cacheHitRate": str(rng.choice([0, 5, 30, 50, 95, 100])),
+            "dailyUsers": str(rng.choice([1, 10, 100, 2500, 1000000]) + rng.choice([0, 0, 0.5])),
+            "requestsPerUser": str(rng.choice([1, 2.5, 10, 40, 0.3])),
+        })
+    return inputs
+
+def main():
+    source = (ROOT / "main.py").read_text()
+    script = HARNESS % "\n".join(extract_function(source, name) for name in FUNCTIONS)
+    inputs = page_inputs()
+    run = subprocess.run(["node", "-e", script], input=json.dumps({"models": MODELS, "inputs": inputs}),
+                         capture_output=True, text=True, check=True)
+    cases = [{"inputs": i, "expected": e} for i, e in zip(inputs, json.loads(run.stdout))]
+    # One case per line keeps re-recorded diffs readable
+    lines = ",\n  ".join(json.dumps(case) for case in cases)
+    FIXTURE.write_text(f'{{"models": {json.dumps(MODELS)},\n "cases": [\n  {lines}\n]}}\n')
+    print(f"Recorded {len(cases)} cases to {FIXTURE}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""The Python engine against the page script's own outputs (recorded by record_js_parity.py)."""
+from dataclasses import asdict
+from pathlib import Path
+import json
+import pytest
+from calculator import Scenario, calculate, scenario_from_dict
+from catalog import build_catalog, evaluate_batch
+from models import ModelSpec
+
+FIXTURE = json.loads((Path(__file__).parent / "js_parity.json").read_text())
+MODELS = {model_id: ModelSpec(m["name"], m["provider"], 128000, 4096, m["price_input"], m["price_output"])
+          for model_id, m in FIXTURE["models"].items()}
+CASES = FIXTURE["cases"]
+
+def scenario_for(inputs: dict) -> Scenario:
+    """The scenario the page's form values describe, as the API would receive them."""
+    return scenario_from_dict({
+        "input_tokens": inputs["inputTokens"], "output_tokens": inputs["outputTokens"],
+        "iterations": inputs["iterations"], "cache_hit_rate": float(inputs["cacheHitRate"]) / 100,
+        "daily_users": inputs["dailyUsers"], "requests_per_user": inputs["requestsPerUser"],
+        "scale": inputs["scale"], "complexity": inputs["complexity"],
+    })
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: f"{case['inputs']['model']}-{case['inputs']['scale']}")
+def test_calculate_matches_page(case):
+    breakdown = asdict(calculate(MODELS[case["inputs"]["model"]], scenario_for(case["inputs"])))
+    # Same operations in the same order as the page, so the doubles match exactly
+    assert {name: breakdown[name] for name in case["expected"]} == case["expected"]
+
+def test_evaluate_batch_matches_page():
+    catalog = build_catalog(MODELS)
+    columns = evaluate_batch(catalog, [catalog.position(c["inputs"]["model"]) for c in CASES],
+                             [scenario_for(c["inputs"]) for c in CASES])
+    for i, case in enumerate(CASES):
+        assert {name: columns[name][i] for name in case["expected"]} == case["expected"]
+
+@pytest.mark.parametrize("data, message", [
+    ({"daily_users": float("inf")}, "daily_users must be a finite number"),
+    ({"cache_hit_rate": "NaN"}, "cache_hit_rate must be a finite number"),
+    ({"input_tokens": 10 ** 400}, "input_tokens must be a number"),
+    ({"input_tokens": 1e300}, "input_tokens must be at most"),
+    ({"iterations": -1}, "iterations must not be negative"),
+    ({"iterations": True}, "iterations must be a number"),
+    ({"cache_hit_rate": 1.5}, "cache_hit_rate must be between 0 and 1"),
+    ({"scale": 3}, "scale must be a string"),
+    ({"scale": "enterprize"}, "scale must be one of: startup, growth, scale, enterprise"),
+    ({"complexity": ""}, "complexity must be one of: low, medium, high"),
+    ({"tokens": 1}, "Unknown scenario fields: tokens"),
+])
+def test_scenario_from_dict_rejects(data, message):
+    with pytest.raises(ValueError, match=message):
+        scenario_from_dict(data)
+
+def test_scenario_from_dict_truncates_integers_like_parse_int():
+    scenario = scenario_from_dict({"input_tokens": "1500.9", "daily_users": 2.5, "requests_per_user": "2.5"})
+    assert (scenario.input_tokens, scenario.daily_users, scenario.requests_per_user) == (1500, 2, 2.5)
+
+def test_scenario_from_dict_accepts_choices_in_any_case():
+    scenario = scenario_from_dict({"scale": "Enterprise", "complexity": "HIGH"})
+    assert (scenario.scale, scenario.complexity) == ("enterprise", "high")
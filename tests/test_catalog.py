@@ -0,0 +1,28 @@
+"""Top-k selection and ranking against a full stable sort."""
+import numpy as np
+import pytest
+from catalog import cheapest, cost_rank
+
+def random_costs(seed: int, n: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # Few distinct prices, so ties are common, plus the free models a real catalog has
+    return rng.choice([0.0, 0.1, 0.25, 0.5, 1.0, 3.0, 15.0], n) * rng.choice([1, 1, 2], n)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_cheapest_matches_full_sort(seed):
+    n = 1 + seed * 7
+    costs = random_costs(seed, n)
+    order = sorted(range(n), key=lambda row: (costs[row], row))
+    for k in (1, 2, 3, n // 2, n - 1, n, n + 5):
+        assert cheapest(costs, k).tolist() == order[:max(k, 0)]
+
+@pytest.mark.parametrize("k, n", [(0, 5), (-1, 5), (3, 0)])
+def test_cheapest_of_nothing(k, n):
+    assert cheapest(np.ones(n), k).tolist() == []
+
+@pytest.mark.parametrize("seed", range(20))
+def test_cost_rank_matches_full_sort(seed):
+    n = 1 + seed * 7
+    costs = random_costs(seed, n)
+    order = sorted(range(n), key=lambda row: (costs[row], row))
+    assert [cost_rank(costs, row) for row in order] == list(range(1, n + 1))
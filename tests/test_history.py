@@ -0,0 +1,108 @@
+"""Price history round trips: what was appended is what as_of, series and reprice read back."""
+import random
+import pytest
+import history
+from calculator import DAYS_PER_MONTH, Scenario, calculate
+from history import PriceHistory
+from models import ModelSpec
+
+PROVIDERS = ("Anthropic", "OpenAI", "Mistral")
+
+def catalogs(seed: int, count: int) -> list:
+    """(time, catalog) pairs where models are added, removed and repriced between refreshes."""
+    rng = random.Random(seed)
+    current, out, at = {}, [], 1_000_000.0
+    for _ in range(count):
+        for i in rng.sample(range(12), rng.randint(1, 5)):
+            model_id = f"m{i}"
+            if model_id in current and rng.random() < 0.3:
+                del current[model_id]
+            else:
+                current[model_id] = ModelSpec(model_id, PROVIDERS[i % 3], 128000, 4096,
+                                              rng.choice([0.1, 0.5, 1.0, 3.0]), rng.choice([0.4, 2.0, 15.0]))
+        at += rng.choice([60.0, 3600.0, 86400.0])
+        out.append((at, dict(current)))
+    return out
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # Checkpoint often, so lookups replay across several checkpoints
+    monkeypatch.setattr(history, "CHECKPOINT_EVERY", 4)
+    return PriceHistory(tmp_path / "history")
+
+def prices(catalog: dict) -> dict:
+    return {m: (spec.price_input, spec.price_output) for m, spec in catalog.items()}
+
+@pytest.mark.parametrize("seed", range(5))
+def test_as_of_returns_the_catalog_in_effect(store, seed):
+    snapshots = catalogs(seed, 20)
+    for at, catalog in snapshots:
+        store.append(catalog, at)
+    assert store.as_of(snapshots[0][0] - 1) == {}
+    for (at, catalog), (following, _) in zip(snapshots, [*snapshots[1:], (snapshots[-1][0] + 10, None)]):
+        assert store.as_of(at) == prices(catalog)
+        assert store.as_of((at + following) / 2) == prices(catalog)
+        assert store.as_of(at, ["m1", "m2", "missing"]) == {m: p for m, p in prices(catalog).items() if m in ("m1", "m2")}
+
+def test_unchanged_catalog_is_not_recorded(store):
+    _, catalog = catalogs(0, 1)[0]
+    assert store.append(catalog, 100.0) == len(catalog)
+    assert store.append(catalog, 200.0) == 0
+    assert len(store.snapshots()) == 1
+
+def test_times_never_go_backwards(store):
+    (_, first), (_, second) = catalogs(1, 2)
+    store.append(first, 500.0)
+    store.append(second, 400.0)
+    assert store.snapshots()["time"].tolist() == [500.0, 500.0]
+    assert store.as_of(500.0) == prices(second)
+
+def test_a_torn_write_is_ignored_and_repaired(store):
+    (at, first), (later, second) = catalogs(2, 2)
+    store.append(first, at)
+    with open(store.records_path, "ab") as f:
+        f.write(b"\x01" * (history.RECORD.itemsize + 3))  # A writer that died before its snapshot
+    assert store.as_of(at) == prices(first)
+    store.append(second, later)
+    assert store.as_of(at) == prices(first) and store.as_of(later) == prices(second)
+
+def test_series_matches_as_of(store):
+    snapshots = catalogs(3, 12)
+    for at, catalog in snapshots:
+        store.append(catalog, at)
+    ids = sorted({m for _, catalog in snapshots for m in catalog})
+    series = store.series(ids)
+    assert series["times"] == [at for at, _ in snapshots]
+    for i, (at, catalog) in enumerate(snapshots):
+        for m in ids:
+            expected = prices(catalog).get(m, (None, None))
+            assert (series["models"][m]["price_input"][i], series["models"][m]["price_output"][i]) == expected
+    with pytest.raises(ValueError, match="No price history for: nope"):
+        store.series(["nope"])
+
+@pytest.mark.parametrize("seed", range(3))
+def test_reprice_integrates_cost_over_each_stretch(store, seed):
+    snapshots = catalogs(seed, 15)
+    for at, catalog in snapshots:
+        store.append(catalog, at)
+    scenario = Scenario(input_tokens=3000, output_tokens=700, daily_users=250, cache_hit_rate=0.4,
+                        scale="growth", complexity="medium")
+    start, end = snapshots[2][0] - 30.0, snapshots[-1][0] + 5000.0
+    per_second = scenario.monthly_requests / (DAYS_PER_MONTH * 86400)
+    expected, covered = {}, {}
+    for (at, catalog), (following, _) in zip(snapshots, [*snapshots[1:], (end, None)]):
+        frm, upto = max(at, start), min(following, end)
+        for m, spec in catalog.items():
+            if upto > frm:
+                expected[m] = expected.get(m, 0.0) + calculate(spec, scenario).cost_per_request * per_second * (upto - frm)
+                covered[m] = covered.get(m, 0.0) + (upto - frm)
+    costs = store.reprice(scenario, start, end)
+    assert set(costs) == set(expected)
+    for m, cost in costs.items():
+        assert cost["cost"] == pytest.approx(expected[m])
+        assert cost["coverage"] == pytest.approx(covered[m] / (end - start))
+
+def test_reprice_needs_a_window(store):
+    with pytest.raises(ValueError, match="end must be after start"):
+        store.reprice(Scenario(), 10.0, 10.0)
+    assert store.reprice(Scenario(), 0.0, 10.0) == {}
@@ -0,0 +1,82 @@
+"""Incremental LiteLLM feed parsing across chunk boundaries, and catalog snapshots."""
+import json
+import random
+import time
+import pytest
+import models
+from catalog import get_catalog
+from models import JSONObjectStream, ModelSpec, get_catalog_snapshot, get_catalog_version
+
+DOCUMENT = json.dumps({
+    "gpt-4o": {"input_cost_per_token": 2.5e-06, "output_cost_per_token": 1e-05, "max_tokens": 16384},
+    "sample_spec": {"note": "braces } and commas , inside \"strings\"", "list": [1, 2.5, -3e-7, {"x": None}]},
+    "count": 12345,
+    "ratio": -0.125,
+    "tiny": 1.5e-06,
+    "flag": True,
+    "off": False,
+    "none": None,
+    "unicode": "café ✓",
+}, indent=1)
+
+def parse(chunks):
+    stream = JSONObjectStream()
+    entries = []
+    for chunk in chunks:
+        entries += stream.feed(chunk)
+    return entries + stream.feed("", final=True)
+
+def expected():
+    return list(json.loads(DOCUMENT).items())
+
+def test_whole_document():
+    assert parse([DOCUMENT]) == expected()
+
+@pytest.mark.parametrize("split", range(1, len(DOCUMENT)))
+def test_every_split_point(split):
+    assert parse([DOCUMENT[:split], DOCUMENT[split:]]) == expected()
+
+def test_one_character_at_a_time():
+    assert parse(list(DOCUMENT)) == expected()
+
+def test_random_chunkings():
+    rng = random.Random(7)
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(1, len(DOCUMENT)), rng.randint(1, 12)))
+        assert parse([DOCUMENT[a:b] for a, b in zip([0, *cuts], [*cuts, len(DOCUMENT)])]) == expected()
+
+@pytest.mark.parametrize("chunks, value", [
+    (['{"a": 1.', '5}'], 1.5),
+    (['{"a": 1.5e', '-06}'], 1.5e-06),
+    (['{"a": 12', '34}'], 1234),
+    (['{"a": -', '7}'], -7),
+    (['{"a": tr', 'ue}'], True),
+    (['{"a": 1.5', '}'], 1.5),
+])
+def test_numbers_and_literals_split_across_chunks(chunks, value):
+    assert parse(chunks) == [("a", value)]
+
+def test_entries_are_returned_as_soon_as_they_complete():
+    stream = JSONObjectStream()
+    assert stream.feed('{"a": {"b": 1}, "c": 2') == [("a", {"b": 1})]
+    assert stream.feed(', "d"') == [("c", 2)]
+    assert stream.feed(': 3}') == [("d", 3)]
+
+@pytest.mark.parametrize("document", ['{"a": 1', '{"a": {"b": 1}', '{"a"', ''])
+def test_truncated_input_is_an_error(document):
+    with pytest.raises(ValueError, match="Truncated"):
+        parse([document])
+
+def test_malformed_separator_is_an_error():
+    with pytest.raises(ValueError, match="Expected ','"):
+        parse(['{"a": 1 "b": 2}'])
+
+def test_catalog_snapshot_pairs_version_with_models(default_catalog):
+    version, specs = get_catalog_snapshot()
+    assert specs is default_catalog and version == get_catalog_version()
+    repriced = {**default_catalog, "extra": ModelSpec("Extra", "Other", 1000, 100, 1.0, 2.0)}
+    models._set_models(repriced, time.time())
+    new_version, new_specs = get_catalog_snapshot()
+    assert new_version != version and new_specs is repriced
+    catalog = get_catalog()
+    assert (catalog.version, catalog.models) == (new_version, repriced)
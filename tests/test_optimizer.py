@@ -0,0 +1,81 @@
+"""Branch-and-bound stacks against enumerating every stack, and constraint parsing."""
+import itertools
+import math
+import pytest
+from calculator import Scenario
+from catalog import build_catalog, scenario_costs
+from models import ModelSpec
+from optimizer import Constraints, constraints_from_dict, optimize
+from platforms import ScaleCategory, ComplexityLevel, get_all_platforms
+
+CATALOG = build_catalog({f"m{i}": ModelSpec(f"M{i}", ("Anthropic", "OpenAI", "Other")[i % 3], 8000 * (1 + i % 4),
+                                            4096 * (1 + i % 2), 0.1 * (i % 5), 0.3 * (i % 7)) for i in range(12)})
+
+def every_stack(scenario: Scenario, constraints: Constraints) -> list:
+    """(total, fixed) of every stack within the constraints, cheapest first."""
+    _, monthly = scenario_costs(CATALOG, scenario)
+    models = [float(monthly[r]) for r in range(len(CATALOG))
+              if CATALOG.context_window[r] >= constraints.min_context_window
+              and CATALOG.max_output[r] >= constraints.min_max_output]
+    groups = []
+    for category, platforms in get_all_platforms().items():
+        if category in constraints.skip:
+            continue
+        required = constraints.require.get(category)
+        options = [(p.estimated_monthly_base + p.estimated_per_request * scenario.monthly_requests, p.estimated_monthly_base)
+                   for key, p in platforms.items()
+                   if (key == required if required is not None else key not in constraints.exclude and (
+                       not constraints.fit
+                       or p.fits(ScaleCategory(scenario.scale), ComplexityLevel(scenario.complexity))))]
+        if options:
+            groups.append(options)
+    stacks = []
+    for picks in itertools.product(*groups):
+        fixed = sum(f for _, f in picks)
+        for model in models:
+            total = sum(c for c, _ in picks) + model
+            if total <= constraints.budget and fixed <= constraints.max_fixed_cost:
+                stacks.append((total, fixed))
+    return sorted(stacks)
+
+@pytest.mark.parametrize("k", [1, 3, 20])
+@pytest.mark.parametrize("scenario", [
+    Scenario(),
+    Scenario(input_tokens=4000, daily_users=5000, scale="enterprise", complexity="high"),
+    Scenario(daily_users=20000, requests_per_user=40, scale="scale", complexity="medium"),
+])
+@pytest.mark.parametrize("constraints", [
+    Constraints(),
+    Constraints(fit=False),
+    Constraints(fit=False, max_fixed_cost=100),
+    Constraints(skip=("cicd", "observability"), exclude=("langchain", "pinecone"), min_context_window=16000),
+    Constraints(require={"vector_stores": "pgvector"}, fit=False, budget=2000),
+])
+def test_cheapest_stacks_match_enumeration(k, scenario, constraints):
+    expected = every_stack(scenario, constraints)[:k]
+    stacks = optimize(CATALOG, scenario, constraints, k).stacks
+    assert [s.total for s in stacks] == pytest.approx([total for total, _ in expected])
+    assert all(s.fixed <= constraints.max_fixed_cost and s.total <= constraints.budget for s in stacks)
+    assert len({s.options for s in stacks}) == len(stacks)
+
+def test_nothing_under_budget():
+    assert optimize(CATALOG, Scenario(daily_users=100000), Constraints(budget=-1), 3).stacks == []
+
+@pytest.mark.parametrize("data, message", [
+    ({"fit": "false"}, "fit must be true or false"),
+    ({"fit": 0}, "fit must be true or false"),
+    ({"skip": "cicd"}, "skip must be a list of strings"),
+    ({"exclude": "pinecone"}, "exclude must be a list of strings"),
+    ({"skip": ["cicd", 3]}, "skip must be a list of strings"),
+    ({"skip": ["cicd", "deploys"]}, "Unknown categories: deploys"),
+    ({"require": {"vector_stores": 1}}, "require must map categories to platform keys"),
+    ({"budget": "lots"}, "must be numbers"),
+])
+def test_constraints_from_dict_rejects(data, message):
+    with pytest.raises(ValueError, match=message):
+        constraints_from_dict(data)
+
+def test_constraints_from_dict():
+    constraints = constraints_from_dict({"fit": False, "skip": ["cicd"], "exclude": ["pinecone"], "budget": 500})
+    assert (constraints.fit, constraints.skip, constraints.exclude, constraints.budget) == (False, ("cicd",), ("pinecone",), 500)
+    assert constraints_from_dict({}).max_fixed_cost == math.inf
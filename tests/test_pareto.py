@@ -0,0 +1,47 @@
+"""Staircase Pareto frontier against pairwise brute force."""
+import numpy as np
+import pytest
+from catalog import build_catalog
+from models import ModelSpec
+from pareto import dominated_by, pareto_frontier
+
+def dominates(a, b) -> bool:
+    """a costs no more and has at least as much context and output as b, and is better somewhere."""
+    return a[0] <= b[0] and a[1] >= b[1] and a[2] >= b[2] and a != b
+
+def random_points(seed: int, n: int):
+    rng = np.random.default_rng(seed)
+    # Coarse values, so ties and exact duplicates are common
+    cost = rng.choice([0.0, 0.5, 1.0, 2.0, 4.0], n)
+    context = rng.choice([8000, 32000, 128000, 200000], n)
+    output = rng.choice([4096, 8192, 16384], n)
+    return cost, context, output
+
+def brute_force(cost, context, output) -> list:
+    points = list(zip(cost.tolist(), context.tolist(), output.tolist()))
+    rows = [i for i, p in enumerate(points) if not any(dominates(q, p) for q in points)]
+    return sorted(rows, key=lambda i: (cost[i], -context[i], -output[i], i))
+
+@pytest.mark.parametrize("seed", range(30))
+def test_frontier_matches_brute_force(seed):
+    cost, context, output = random_points(seed, 1 + seed * 5)
+    assert pareto_frontier(cost, context, output).tolist() == brute_force(cost, context, output)
+
+def test_identical_rows_are_all_kept():
+    cost, context, output = np.array([1.0, 1.0, 2.0]), np.array([1000, 1000, 1000]), np.array([10, 10, 10])
+    assert pareto_frontier(cost, context, output).tolist() == [0, 1]
+
+def test_empty_catalog():
+    assert pareto_frontier(np.zeros(0), np.zeros(0, np.int64), np.zeros(0, np.int64)).tolist() == []
+
+@pytest.mark.parametrize("seed", range(10))
+def test_dominated_by_matches_brute_force(seed):
+    cost, context, output = random_points(seed, 40)
+    catalog = build_catalog({f"m{i}": ModelSpec(f"M{i}", "P", int(context[i]), int(output[i]), cost[i], 0.0)
+                             for i in range(len(cost))})
+    frontier = pareto_frontier(cost, catalog.context_window, catalog.max_output)
+    points = list(zip(cost.tolist(), context.tolist(), output.tolist()))
+    for row in range(len(cost)):
+        expected = [f for f in frontier.tolist() if dominates(points[f], points[row])]
+        assert dominated_by(catalog, cost, frontier, row).tolist() == expected
+        assert (row in frontier) == (not expected)
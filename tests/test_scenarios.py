@@ -0,0 +1,118 @@
+"""Saved scenarios: CRUD, keyset paging, deltas and re-pricing on catalog changes."""
+from dataclasses import replace
+import time
+import pytest
+import models
+import scenarios
+from calculator import calculate, scenario_from_dict
+from catalog import get_catalog
+from scenarios import ScenarioStore
+
+@pytest.fixture
+def store(tmp_path, default_catalog):
+    store = ScenarioStore(tmp_path / "scenarios.db")
+    yield store
+    store.close()
+
+def model_ids(catalog, count: int) -> list:
+    return list(catalog)[:count]
+
+def test_create_get_update_delete(store, default_catalog):
+    first, second = model_ids(default_catalog, 2)
+    row = store.create({"owner": " team ", "model": first, "tags": ["b", "a", " a ", ""], "daily_users": 400,
+                        "scale": "growth"})
+    expected = calculate(default_catalog[first], scenario_from_dict({"daily_users": 400, "scale": "growth"}))
+    assert (row["owner"], row["name"], row["tags"]) == ("team", first, ["a", "b"])
+    assert (row["monthly_cost"], row["total_monthly_cost"]) == (expected.monthly_cost, expected.total_monthly_cost)
+    assert row["catalog_version"] == get_catalog().version
+    assert store.get(row["id"]) == row
+
+    updated = store.update(row["id"], {"model": second, "name": "Renamed", "tags": ["c"], "input_tokens": 50})
+    assert (updated["model"], updated["name"], updated["tags"]) == (second, "Renamed", ["c"])
+    assert updated["scenario"]["daily_users"] == 400 and updated["scenario"]["input_tokens"] == 50
+    expected = calculate(default_catalog[second], scenario_from_dict(updated["scenario"]))
+    assert updated["cost_per_request"] == expected.cost_per_request
+    with pytest.raises(ValueError, match="owner cannot be changed"):
+        store.update(row["id"], {"owner": "someone else"})
+
+    assert store.delete(row["id"]) and not store.delete(row["id"])
+    assert store.get(row["id"]) is None and store.update(row["id"], {"name": "x"}) is None
+
+def test_unknown_model_is_saved_unpriced(store):
+    row = store.create({"owner": "o", "model": "not-in-catalog"})
+    assert row["monthly_cost"] is None and row["cost_per_request"] is None
+
+@pytest.mark.parametrize("data, message", [
+    ({"model": "m"}, "owner is required"),
+    ({"owner": "o"}, "model is required"),
+    ({"owner": "o", "model": "m", "tags": "a,b"}, "tags must be a list of strings"),
+    ({"owner": "o", "model": "m", "scale": "huge"}, "scale must be one of"),
+])
+def test_create_rejects(store, data, message):
+    with pytest.raises(ValueError, match=message):
+        store.create(data)
+
+def test_ids_out_of_range(store):
+    assert store.get(-1) is None and store.get(scenarios.SCENARIO_MAX_ID + 1) is None
+    assert not store.delete(scenarios.SCENARIO_MAX_ID + 1)
+
+def test_keyset_pages_cover_every_row_once(store, default_catalog):
+    first, second = model_ids(default_catalog, 2)
+    ids = [store.create({"owner": ("a", "b")[i % 2], "model": (first, second)[i % 3 == 0],
+                         "tags": ["even"] if i % 2 == 0 else []})["id"] for i in range(23)]
+    for filters in ({}, {"owner": "a"}, {"model": second}, {"tag": "even"}, {"owner": "b", "tag": "even"}):
+        pages, before = [], None
+        while True:
+            page = store.list(limit=5, before=before, **filters)
+            pages += [r["id"] for r in page["scenarios"]]
+            if page["next"] is None:
+                break
+            before = page["next"]
+        rows = [store.get(i) for i in ids]
+        expected = [r["id"] for r in rows
+                    if all(r[k] == v for k, v in filters.items() if k != "tag")
+                    and ("tag" not in filters or filters["tag"] in r["tags"])]
+        assert pages == sorted(expected, reverse=True)
+
+def test_delta_against_baseline(store, default_catalog):
+    ids = model_ids(default_catalog, 4)
+    rows = [store.create({"owner": "o", "model": m, "daily_users": 100 * (i + 1)}) for i, m in enumerate(ids)]
+    store.create({"owner": "o", "model": "gone"})
+    delta = store.delta(owner="o", limit=3)
+    assert delta["baseline"]["id"] == rows[0]["id"] and delta["count"] == 5
+    assert [r["id"] for r in delta["scenarios"]] == [r["id"] for r in rows[:3]]
+    for row in delta["scenarios"]:
+        assert row["delta_monthly"] == pytest.approx(row["monthly_cost"] - rows[0]["monthly_cost"])
+    priced = sorted(rows, key=lambda r: r["monthly_cost"])
+    assert delta["cheapest"]["id"] == priced[0]["id"] and delta["most_expensive"]["id"] == priced[-1]["id"]
+
+    against = store.delta(owner="o", baseline=rows[2]["id"], limit=10)
+    assert against["scenarios"][2]["delta_monthly"] == 0 and against["scenarios"][4]["delta_monthly"] is None
+    with pytest.raises(ValueError, match="Unknown baseline scenario"):
+        store.delta(owner="o", baseline=10 ** 9)
+    assert store.delta(owner="nobody") is None
+
+def test_reevaluate_reprices_changed_models_in_batches(store, default_catalog, monkeypatch):
+    monkeypatch.setattr(scenarios, "SCENARIO_BATCH_SIZE", 3)
+    changed, same = model_ids(default_catalog, 2)
+    rows = [store.create({"owner": "o", "model": (changed, same)[i % 2], "input_tokens": 1000 + i}) for i in range(10)]
+    repriced = {**default_catalog, changed: replace(default_catalog[changed],
+                                                    price_input=default_catalog[changed].price_input * 2 + 1)}
+    models._set_models(repriced, time.time())
+    catalog = get_catalog()
+
+    assert store.reevaluate([changed]) == 5
+    for row in rows:
+        now = store.get(row["id"])
+        expected = calculate(repriced[row["model"]], scenario_from_dict(row["scenario"])).monthly_cost
+        assert now["monthly_cost"] == pytest.approx(expected)
+        assert now["catalog_version"] == (catalog.version if row["model"] == changed else row["catalog_version"])
+    assert store.reevaluate() == 10
+    assert {store.get(r["id"])["catalog_version"] for r in rows} == {catalog.version}
+
+def test_delete_owner(store, default_catalog):
+    model = model_ids(default_catalog, 1)[0]
+    for owner in ("a", "a", "b"):
+        store.create({"owner": owner, "model": model})
+    assert store.delete_owner("a") == 2
+    assert [r["owner"] for r in store.list()["scenarios"]] == ["b"]
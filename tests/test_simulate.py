@@ -0,0 +1,24 @@
+"""Monte Carlo results do not depend on how chunks are split across workers."""
+import pytest
+import simulate
+from catalog import build_catalog
+from models import ModelSpec
+from simulate import Distribution
+
+CATALOG = build_catalog({f"m{i}": ModelSpec(f"M{i}", f"P{i % 3}", 128000, 4096, 0.1 + i, 0.4 + 2 * i) for i in range(10)})
+DISTRIBUTIONS = {"input_tokens": Distribution("lognormal", (1000.0, 1.0)), "cache_hit_rate": Distribution("beta", (2.0, 5.0))}
+
+@pytest.fixture(scope="module")
+def pool():
+    yield
+    simulate.shutdown_pool()
+
+@pytest.mark.parametrize("samples", [1, simulate.SIM_CHUNK * 3 + 1, simulate.SIM_CHUNK * (simulate.SIM_SUM_GROUPS + 5)])
+def test_same_seed_same_results_for_any_worker_count(pool, samples):
+    runs = [simulate.simulate(CATALOG, DISTRIBUTIONS, samples=samples, seed=5, workers=w) for w in (1, 2, 3)]
+    assert runs[1] == runs[0] and runs[2] == runs[0]
+
+def test_percentiles_are_ordered_within_the_observed_range():
+    for m in simulate.simulate(CATALOG, DISTRIBUTIONS, samples=20000, seed=1, workers=1)["models"]:
+        assert m["min"] <= m["p50"] <= m["p90"] <= m["p99"] <= m["max"]
+        assert m["min"] <= m["mean"] <= m["max"]